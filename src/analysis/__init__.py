@@ -0,0 +1,25 @@
+from .review_analysis import analyze_reviews, summarize_trustpilot_reviews, summarize_google_maps_places
+from .job_analysis import analyze_jobs, parse_salary
+from .dedup import PageDeduplicator
+from .citations import CitationIndex
+from .field_extraction import FieldExtractor, classify_social_url
+from .change_detection import content_hash, diff_signals
+from .competitor_analysis import domain_of, pick_competitors, build_competitor_profile, compare_competitors
+
+__all__ = [
+    'analyze_reviews',
+    'summarize_trustpilot_reviews',
+    'summarize_google_maps_places',
+    'analyze_jobs',
+    'parse_salary',
+    'PageDeduplicator',
+    'CitationIndex',
+    'domain_of',
+    'pick_competitors',
+    'build_competitor_profile',
+    'compare_competitors',
+    'content_hash',
+    'diff_signals',
+    'FieldExtractor',
+    'classify_social_url'
+]
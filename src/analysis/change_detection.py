@@ -0,0 +1,58 @@
+import hashlib
+import re
+from typing import Any, Dict, List, Optional
+
+from ..models import ChangeThresholds
+
+# Digits, dates and whitespace change on many homepages without the content changing
+VOLATILE_PATTERN = re.compile(r"\d+|\s+")
+
+def content_hash(markdown: str) -> str:
+    """Hash page content, ignoring numbers and whitespace so counters and dates do not register as changes."""
+    normalized = VOLATILE_PATTERN.sub(" ", (markdown or "").lower()).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+def _relative_change(previous: Optional[float], current: Optional[float]) -> Optional[float]:
+    if not previous or current is None:
+        return None
+    return (current - previous) / previous
+
+def diff_signals(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    thresholds: Optional[ChangeThresholds] = None,
+) -> List[Dict[str, Any]]:
+    """Compare freshly collected monitoring signals with the baseline of the last report.
+
+    Signals that could not be collected (None) are never reported as changes.
+
+    Args:
+        baseline: Signals stored when the last report was generated.
+        current: Freshly collected signals.
+        thresholds: How much each signal has to move to count as a change.
+
+    Returns:
+        A list of changes, each with signal, previous, current and delta.
+    """
+    thresholds = thresholds or ChangeThresholds()
+    changes = []
+
+    if thresholds.homepage and baseline.get("homepage_hash") and current.get("homepage_hash") \
+            and baseline["homepage_hash"] != current["homepage_hash"]:
+        changes.append({"signal": "homepage", "previous": baseline["homepage_hash"], "current": current["homepage_hash"], "delta": None})
+
+    if current.get("news_urls") is not None and baseline.get("news_urls") is not None:
+        new_urls = sorted(set(current["news_urls"]) - set(baseline["news_urls"]))
+        if len(new_urls) >= thresholds.min_new_news:
+            changes.append({"signal": "news", "previous": len(baseline["news_urls"]), "current": len(current["news_urls"]), "delta": len(new_urls), "new_urls": new_urls})
+
+    for signal, limit in (("job_count", thresholds.jobs_change), ("visits", thresholds.visits_change)):
+        change = _relative_change(baseline.get(signal), current.get(signal))
+        if change is not None and abs(change) >= limit:
+            changes.append({"signal": signal, "previous": baseline[signal], "current": current[signal], "delta": round(change, 3)})
+
+    previous_rating, current_rating = baseline.get("trustpilot_rating"), current.get("trustpilot_rating")
+    if previous_rating is not None and current_rating is not None and abs(current_rating - previous_rating) >= thresholds.rating_change:
+        changes.append({"signal": "trustpilot_rating", "previous": previous_rating, "current": current_rating, "delta": round(current_rating - previous_rating, 2)})
+
+    return changes
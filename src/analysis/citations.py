@@ -0,0 +1,161 @@
+import re
+from typing import Any, Dict, List, Optional
+
+from .dedup import canonical_url
+from ..models.response_model import ADDITIONAL_SOURCES_TITLE
+
+MARKDOWN_LINK_PATTERN = re.compile(r"\[([^\]]*)\]\((https?://[^)\s]+)\)")
+HEADING_PATTERN = re.compile(r"^(#+)\s+(.+)$", re.MULTILINE)
+SOURCES_HEADING_PATTERN = re.compile(r"^(#+)\s+.*\b(sources|citations|references)\b.*$", re.IGNORECASE | re.MULTILINE)
+
+SOURCES_SECTION_TITLE = "Sources & Citations"
+
+# Item fields that hold a URL worth citing, in order of preference
+URL_FIELDS = ("url", "reviewUrl", "link", "website")
+
+# Canonical page for tools whose items do not carry their own URL
+ARGUMENT_URLS = {
+    "crawl_website": lambda args: args.get("url"),
+    "crawl_key_pages": lambda args: args.get("url"),
+    "get_linkedin_company_profile": lambda args: args.get("linkedin_company_url"),
+    "get_indeed_jobs": lambda args: args.get("indeed_company_url"),
+    "get_similarweb_results": lambda args: f"https://www.similarweb.com/website/{args['website']}/" if args.get("website") else None,
+    "get_trustpilot_reviews": lambda args: f"https://www.trustpilot.com/review/{args['company_domain']}" if args.get("company_domain") else None,
+}
+
+SOURCE_LABELS = {
+    "crawl_website": "Company website",
+    "crawl_key_pages": "Company website",
+    "search_google": "Web search",
+    "search_google_maps": "Google Maps",
+    "get_linkedin_company_profile": "LinkedIn",
+    "get_indeed_jobs": "Indeed",
+    "get_similarweb_results": "Similarweb",
+    "get_trustpilot_reviews": "Trustpilot",
+}
+
+class CitationIndex:
+    """Index of every URL actually returned by a tool during the run.
+
+    The index is filled from the run's EvidenceRecorder and is used to give the model a
+    ready-made citation list, to check that links in the report point to fetched pages,
+    and to generate the Sources & Citations section.
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, Dict[str, str]] = {}
+        self._processed_calls = 0
+
+    def add(self, url: Optional[str], title: str = "", source: str = "") -> None:
+        if not url or not isinstance(url, str) or not url.startswith(("http://", "https://")):
+            return
+        key = canonical_url(url)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.entries[key] = {"url": url, "title": title or url, "source": source}
+        elif title and entry["title"] == entry["url"]:
+            entry["title"] = title
+
+    def _add_item(self, item: Any, source: str) -> None:
+        if not isinstance(item, dict):
+            return
+        title = str(item.get("title") or item.get("positionName") or item.get("reviewHeadline") or item.get("name") or "")
+        for field in URL_FIELDS:
+            if item.get(field):
+                self.add(item[field], title, source)
+                break
+        for alternate in item.get("alternate_urls", []) or []:
+            self.add(alternate, title, source)
+
+    def update_from_evidence(self, evidence) -> None:
+        """Index the calls recorded since the last update."""
+        for call in evidence.calls[self._processed_calls:]:
+            source = SOURCE_LABELS.get(call["tool"], call["tool"])
+            argument_url = ARGUMENT_URLS.get(call["tool"], lambda args: None)(call["arguments"])
+            items = [evidence.blobs[digest] for digest in call["items"]]
+            if argument_url:
+                title = ""
+                if call["tool"] in ("get_linkedin_company_profile", "get_similarweb_results") and items:
+                    title = f"{items[0].get('name') or ''} on {source}".strip()
+                self.add(argument_url, title, source)
+            for item in items:
+                self._add_item(item, source)
+        self._processed_calls = len(evidence.calls)
+
+    def __contains__(self, url: str) -> bool:
+        return canonical_url(url) in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def as_list(self, max_entries: Optional[int] = None) -> List[Dict[str, str]]:
+        entries = list(self.entries.values())
+        return entries[:max_entries] if max_entries else entries
+
+    def unfetched_links(self, report: str) -> List[str]:
+        """Return links in the report body that were not returned by any tool."""
+        body = strip_sources_section(report)
+        unfetched = []
+        for _, url in MARKDOWN_LINK_PATTERN.findall(body):
+            if url not in self and url not in unfetched:
+                unfetched.append(url)
+        return unfetched
+
+    def render_sources_section(self, report: str, level: int = 2) -> str:
+        """Render the sources section, listing links cited in the report first and then other fetched sources."""
+        cited = []
+        for _, url in MARKDOWN_LINK_PATTERN.findall(strip_sources_section(report)):
+            key = canonical_url(url)
+            if key in self.entries and key not in cited:
+                cited.append(key)
+        remaining = [key for key in self.entries if key not in cited]
+
+        lines = [f"{'#' * level} {SOURCES_SECTION_TITLE}", ""]
+        if cited:
+            lines += [f"{'#' * (level + 1)} Cited in this report", ""]
+            lines += [self._format_entry(i, key) for i, key in enumerate(cited, start=1)]
+            lines.append("")
+        if remaining:
+            lines += [f"{'#' * (level + 1)} {ADDITIONAL_SOURCES_TITLE}", ""]
+            lines += [self._format_entry(i, key) for i, key in enumerate(remaining, start=len(cited) + 1)]
+            lines.append("")
+        return "\n".join(lines).rstrip() + "\n"
+
+    def _format_entry(self, number: int, key: str) -> str:
+        entry = self.entries[key]
+        title = entry["title"].replace("[", "(").replace("]", ")").strip() or entry["url"]
+        suffix = f" - *{entry['source']}*" if entry["source"] else ""
+        return f"{number}. [{title}]({entry['url']}){suffix}"
+
+    def apply_sources_section(self, report: str) -> str:
+        """Replace the report's sources section (or append one) with the generated list of fetched sources."""
+        if not self.entries:
+            return report
+        match = SOURCES_HEADING_PATTERN.search(report)
+        if match:
+            level = len(match.group(1))
+            end = len(report)
+            for heading in HEADING_PATTERN.finditer(report, match.end()):
+                if len(heading.group(1)) <= level:
+                    end = heading.start()
+                    break
+            rest = report[end:]
+            return report[:match.start()] + self.render_sources_section(report, level) + ("\n" + rest if rest else "")
+        return report.rstrip() + "\n\n" + self.render_sources_section(report, _main_section_level(report))
+
+def strip_sources_section(report: str) -> str:
+    """Return the report without its sources section, so only in-text citations are considered."""
+    match = SOURCES_HEADING_PATTERN.search(report)
+    if not match:
+        return report
+    level = len(match.group(1))
+    for heading in HEADING_PATTERN.finditer(report, match.end()):
+        if len(heading.group(1)) <= level:
+            return report[:match.start()] + report[heading.start():]
+    return report[:match.start()]
+
+def _main_section_level(report: str) -> int:
+    """The heading level used for the report's major sections (the smallest level used more than once)."""
+    levels = [len(m.group(1)) for m in HEADING_PATTERN.finditer(report)]
+    repeated = sorted(level for level in set(levels) if levels.count(level) > 1)
+    return repeated[0] if repeated else 2
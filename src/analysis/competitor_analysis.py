@@ -0,0 +1,138 @@
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+def domain_of(url: str) -> str:
+    """Reduce a URL or domain to its bare host name, e.g. "https://www.apify.com/store" -> "apify.com"."""
+    url = (url or "").strip().lower()
+    host = urlsplit(url if "//" in url else f"//{url}").hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+def pick_competitors(similarweb: Dict[str, Any], max_competitors: int) -> List[str]:
+    """Take the domains of the most similar sites from a Similarweb result, most visited first."""
+    competitors = sorted(
+        similarweb.get("topSimilarityCompetitors") or [],
+        key=lambda c: c.get("visitsTotalCount") or 0,
+        reverse=True,
+    )
+    domains = [domain_of(c.get("domain", "")) for c in competitors]
+    return list(dict.fromkeys(d for d in domains if d))[:max_competitors]
+
+def _first_number(*values: Any) -> Optional[float]:
+    for value in values:
+        if isinstance(value, (int, float)) and value > 0:
+            return float(value)
+    return None
+
+def build_competitor_profile(
+    domain: str,
+    similarweb: Dict[str, Any],
+    linkedin: Dict[str, Any],
+    places: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Combine the Similarweb, LinkedIn and Google Maps results of one company into comparable metrics.
+
+    Args:
+        domain: The company's website domain.
+        similarweb: Result of get_similarweb_results, may be empty.
+        linkedin: Result of get_linkedin_company_profile, may be empty.
+        places: Results of search_google_maps, may be empty.
+
+    Returns:
+        A dictionary with name, domain, visits, global_rank, employees_min, employees_max,
+        revenue_min, founded_year, headquarters, rating and reviews_count (None when unknown).
+    """
+    similarweb, linkedin = similarweb or {}, linkedin or {}
+    place = places[0] if places else {}
+
+    employees = _first_number(linkedin.get("employees"))
+    employees_min = employees or _first_number(similarweb.get("companyEmployeesMin"))
+    employees_max = employees or _first_number(similarweb.get("companyEmployeesMax"))
+    headquarters = ", ".join(p for p in (
+        similarweb.get("companyHeadquarterCity"),
+        similarweb.get("companyHeadquarterCountryCode"),
+    ) if p)
+
+    return {
+        "name": similarweb.get("companyName") or linkedin.get("name") or similarweb.get("name") or place.get("title") or domain,
+        "domain": domain,
+        "visits": _first_number(similarweb.get("totalVisits")),
+        "global_rank": _first_number(similarweb.get("globalRank")),
+        "employees_min": employees_min,
+        "employees_max": employees_max,
+        "revenue_min": _first_number(similarweb.get("companyAnnualRevenueMin")),
+        "founded_year": _first_number(similarweb.get("companyYearFounded")),
+        "headquarters": headquarters or None,
+        "rating": _first_number(place.get("totalScore")),
+        "reviews_count": _first_number(place.get("reviewsCount")),
+    }
+
+def _format_number(value: Optional[float]) -> str:
+    if value is None:
+        return "n/a"
+    for divisor, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if value >= divisor:
+            return f"{value / divisor:.1f}{suffix}"
+    return f"{value:.0f}"
+
+def _format_range(low: Optional[float], high: Optional[float], prefix: str = "") -> str:
+    if low is None and high is None:
+        return "n/a"
+    if high is None or low == high:
+        return f"{prefix}{_format_number(low or high)}" + ("+" if high is None else "")
+    return f"{prefix}{_format_number(low)}-{prefix}{_format_number(high)}"
+
+def compare_competitors(target: Dict[str, Any], competitors: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Compare a company's profile with its competitors' profiles.
+
+    Args:
+        target: Profile of the researched company, from build_competitor_profile.
+        competitors: Profiles of its competitors.
+
+    Returns:
+        A dictionary containing:
+        - profiles: All profiles, target first, each with traffic_share (share of the set's visits),
+          visits_vs_target and employees_vs_target (ratios to the target) and traffic_rank
+        - leaders: Name of the company leading on visits, employees and rating
+        - table_markdown: A ready-made markdown comparison table
+    """
+    profiles = [{**target, "is_target": True}] + [{**c, "is_target": False} for c in competitors]
+    total_visits = sum(p["visits"] or 0 for p in profiles)
+    by_visits = sorted(profiles, key=lambda p: p["visits"] or 0, reverse=True)
+    for rank, profile in enumerate(by_visits, 1):
+        profile["traffic_rank"] = rank if profile["visits"] else None
+
+    for profile in profiles:
+        profile["traffic_share"] = round(profile["visits"] / total_visits, 3) if profile["visits"] and total_visits else None
+        profile["visits_vs_target"] = round(profile["visits"] / target["visits"], 2) if profile["visits"] and target.get("visits") else None
+        employees, target_employees = profile["employees_max"] or profile["employees_min"], target.get("employees_max") or target.get("employees_min")
+        profile["employees_vs_target"] = round(employees / target_employees, 2) if employees and target_employees else None
+
+    def leader(key: str) -> Optional[str]:
+        known = [p for p in profiles if p.get(key)]
+        return max(known, key=lambda p: p[key])["name"] if known else None
+
+    rows = [
+        "| Company | Website | Visits | Traffic Share | Global Rank | Employees | Revenue (min) | Founded | Headquarters | Maps Rating |",
+        "|---|---|---|---|---|---|---|---|---|---|",
+    ]
+    for p in profiles:
+        name = f"**{p['name']}**" if p["is_target"] else p["name"]
+        share = f"{p['traffic_share']:.0%}" if p["traffic_share"] is not None else "n/a"
+        rank = f"#{p['global_rank']:,.0f}" if p["global_rank"] else "n/a"
+        rating = f"{p['rating']:.1f} ({_format_number(p['reviews_count'])})" if p["rating"] else "n/a"
+        founded = f"{p['founded_year']:.0f}" if p["founded_year"] else "n/a"
+        rows.append(
+            f"| {name} | {p['domain']} | {_format_number(p['visits'])} | {share} | {rank} "
+            f"| {_format_range(p['employees_min'], p['employees_max'])} | {_format_range(p['revenue_min'], None, '$')} "
+            f"| {founded} | {p['headquarters'] or 'n/a'} | {rating} |"
+        )
+
+    return {
+        "profiles": profiles,
+        "leaders": {
+            "visits": leader("visits"),
+            "employees": leader("employees_max"),
+            "rating": leader("rating"),
+        },
+        "table_markdown": "\n".join(rows),
+    }
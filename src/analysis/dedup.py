@@ -0,0 +1,125 @@
+import asyncio
+import heapq
+import random
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+# Mersenne prime used as the modulus of the MinHash permutations
+MERSENNE_PRIME = (1 << 61) - 1
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Signatures are computed over the shingles with the smallest hashes, so long pages cost no more
+# than this many shingles. Identical shingles hash the same on every page, so the sample stays
+# consistent across pages.
+MAX_SHINGLES = 2000
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL enough to catch trivially identical pages (fragment, trailing slash, case)."""
+    url = url.split("#", 1)[0].strip()
+    if url.endswith("/"):
+        url = url[:-1]
+    return url.lower()
+
+class PageDeduplicator:
+    """Detect near-duplicate pages across everything gathered during a run.
+
+    Pages are fingerprinted with MinHash signatures over word shingles and bucketed with
+    locality-sensitive hashing, so each new page is only compared with likely duplicates.
+    The first page of a cluster is kept as its representative; later members are collapsed
+    into a short stub pointing at it and their URLs are recorded as alternates. A page is never
+    collapsed into an earlier copy of itself (same URL).
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, bands: int = 16, shingle_size: int = 5):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = random.Random(1)
+        self._permutations = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME)) for _ in range(num_perm)
+        ]
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[str]] = {}
+        self._signatures: Dict[str, List[int]] = {}
+        self._representatives: Dict[str, Dict[str, Any]] = {}
+        self.duplicates_removed = 0
+
+    def _signature(self, text: str) -> List[int]:
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        size = self.shingle_size
+        if len(tokens) <= size:
+            shingles = {" ".join(tokens)}
+        else:
+            shingles = {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+        hashes = {zlib.crc32(s.encode("utf-8")) for s in shingles}
+        if len(hashes) > MAX_SHINGLES:
+            hashes = heapq.nsmallest(MAX_SHINGLES, hashes)
+        return [min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in self._permutations]
+
+    def _band_keys(self, signature: List[int]) -> List[Tuple[int, Tuple[int, ...]]]:
+        return [(band, tuple(signature[band * self.rows:(band + 1) * self.rows])) for band in range(self.bands)]
+
+    def _find_duplicate(self, url: str, signature: List[int]) -> Optional[str]:
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates.update(self._buckets.get(key, []))
+        # The same page returned again by a later tool is kept in full
+        candidates.discard(url)
+        best_url, best_similarity = None, 0.0
+        for candidate in candidates:
+            other = self._signatures[candidate]
+            similarity = sum(1 for x, y in zip(signature, other) if x == y) / len(signature)
+            if similarity > best_similarity:
+                best_url, best_similarity = candidate, similarity
+        return best_url if best_similarity >= self.threshold else None
+
+    async def filter_pages(self, pages: List[Dict[str, Any]], content_key: str = "markdown") -> List[Dict[str, Any]]:
+        """Return the pages with near-duplicates of earlier pages collapsed into stubs.
+
+        The signatures are computed in a worker thread, so long crawls do not block the event loop.
+
+        Args:
+            pages: Pages with at least url and content_key fields.
+            content_key: The field holding the page text.
+
+        Returns:
+            The pages in their original order. Representatives gain an alternate_urls list when
+            duplicates are found in the same batch; duplicates become {url, title, duplicate_of}.
+        """
+        texts = [page.get(content_key) or "" for page in pages]
+        signatures = await asyncio.to_thread(lambda: [self._signature(text) if text.strip() else None for text in texts])
+
+        filtered = []
+        for page, signature in zip(pages, signatures):
+            url = canonical_url(page.get("url") or "")
+            if signature is None:
+                filtered.append(page)
+                continue
+
+            duplicate_of = self._find_duplicate(url, signature)
+            if duplicate_of is not None:
+                representative = self._representatives[duplicate_of]
+                if page.get("url") and page["url"] != representative.get("url"):
+                    alternates = representative.setdefault("alternate_urls", [])
+                    if page["url"] not in alternates:
+                        alternates.append(page["url"])
+                self.duplicates_removed += 1
+                filtered.append({
+                    "url": page.get("url", ""),
+                    "title": page.get("title", ""),
+                    "duplicate_of": representative.get("url", ""),
+                })
+                continue
+
+            page = dict(page)
+            if url not in self._representatives:
+                for key in self._band_keys(signature):
+                    self._buckets.setdefault(key, []).append(url)
+            self._representatives[url] = page
+            self._signatures[url] = signature
+            filtered.append(page)
+
+        return filtered
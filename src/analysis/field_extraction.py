@@ -0,0 +1,260 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .competitor_analysis import domain_of
+
+URL_PATTERN = re.compile(r"https?://[^\s<>\"'()\[\]]+")
+EMAIL_PATTERN = re.compile(r"(?:mailto:)?\b([a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,})\b", re.IGNORECASE)
+TEL_LINK_PATTERN = re.compile(r"tel:([+\d][\d\s().%-]{6,}\d)", re.IGNORECASE)
+LABELED_PHONE_PATTERN = re.compile(r"\b(?:phone|tel|telephone|call us|call)\b\s*[:.]?\s*(\+?\d[\d\s().-]{6,}\d)", re.IGNORECASE)
+
+# Addresses that show up in page markup but never belong to the company
+EMAIL_BLOCKLIST = re.compile(r"(example\.|sentry|wixpress|domain\.com|email\.com|\.(png|jpe?g|gif|svg|webp)$)", re.IGNORECASE)
+
+# Social profile hosts, and the path prefixes that identify a profile (None = any first path segment)
+SOCIAL_HOSTS = {
+    "facebook": (("facebook.com", "fb.com"), None),
+    "instagram": (("instagram.com",), None),
+    "twitter": (("twitter.com", "x.com"), None),
+    "linkedin": (("linkedin.com",), ("company", "school", "showcase")),
+    "youtube": (("youtube.com",), ("channel", "c", "user", "@")),
+    "tiktok": (("tiktok.com",), ("@",)),
+    "pinterest": (("pinterest.com",), None),
+    "reddit": (("reddit.com",), ("r", "user")),
+    "github": (("github.com",), None),
+    "indeed": (("indeed.com",), ("cmp",)),
+}
+
+# First path segments that are pages of the platform itself, not a profile
+NON_PROFILE_SEGMENTS = frozenset("""
+share sharer sharer.php intent home login signup search hashtag explore watch events groups pages
+dialog plugins policies privacy legal about help settings tr p posts status i jobs feed pin
+""".split())
+
+SOCIAL_FIELDS = tuple(SOCIAL_HOSTS)
+FIELDS = ("phone", "email", "address") + SOCIAL_FIELDS
+
+# Words of company names that say nothing about which company a result is about
+GENERIC_NAME_WORDS = frozenset("inc llc ltd gmbh corp corporation company the and group holdings plc limited".split())
+
+# How much a single sighting of a value counts, by where it was seen
+WEIGHT_STRUCTURED = 0.9
+WEIGHT_TOOL_ARGUMENT = 0.5
+WEIGHT_OWN_SITE = 0.6
+WEIGHT_OTHER_PAGE = 0.25
+
+def classify_social_url(url: str) -> Optional[Tuple[str, str]]:
+    """Classify a URL as a social profile.
+
+    Returns:
+        The field name and the normalized profile URL, or None if the URL is not a profile.
+    """
+    parts = urlsplit(url.strip().rstrip(".,;"))
+    host = (parts.hostname or "").lower()
+    for prefix in ("www.", "m.", "mobile.", "uk.", "de.", "fr."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    segments = [s for s in parts.path.split("/") if s]
+    for field, (hosts, prefixes) in SOCIAL_HOSTS.items():
+        if host not in hosts or not segments:
+            continue
+        first = segments[0].lower()
+        if prefixes is None:
+            if first in NON_PROFILE_SEGMENTS or first.endswith((".php", ".html")):
+                return None
+            path = segments[:1]
+        elif "@" in prefixes and first.startswith("@"):
+            path = segments[:1]
+        elif first in prefixes and len(segments) > 1:
+            path = segments[:2]
+        else:
+            return None
+        return field, f"https://www.{hosts[0]}/{'/'.join(path)}"
+    return None
+
+def normalize_phone(phone: str) -> str:
+    """Reduce a phone number to its digits (keeping a leading +) for comparison."""
+    phone = phone.replace("%20", " ")
+    digits = re.sub(r"\D", "", phone)
+    return ("+" if phone.strip().startswith("+") else "") + digits
+
+def _normalize(field: str, value: str) -> str:
+    if field == "phone":
+        return normalize_phone(value)
+    if field in SOCIAL_FIELDS:
+        classified = classify_social_url(value)
+        return classified[1].lower() if classified else value.strip().lower().rstrip("/")
+    return " ".join(value.lower().split())
+
+class FieldExtractor:
+    """Extract contact details and social profile URLs from every tool output of a run.
+
+    Each candidate value collects weighted sightings: structured fields of Google Maps or LinkedIn
+    results count most, then tel:/mailto: links and profile links on the company's own website,
+    then mentions on other pages. The sightings combine into a confidence between 0 and 1, and the
+    URLs they were found on are kept as provenance. Calls recorded for a competitor are skipped,
+    and structured fields are only taken from results whose name or website matches the company.
+    """
+
+    def __init__(self, company_name: str = ""):
+        words = set(re.findall(r"[a-z0-9]+", company_name.lower()))
+        self.company_tokens = {t for t in words if len(t) > 2}
+        self.name_words = (self.company_tokens - GENERIC_NAME_WORDS) or words
+        self.company_domains: set = set()
+        self.candidates: Dict[str, Dict[str, Dict[str, Any]]] = {field: {} for field in FIELDS}
+        self._processed_calls = 0
+
+    def add(self, field: str, value: Any, weight: float, source: str = "") -> None:
+        """Record one sighting of a field value."""
+        if not value or not isinstance(value, str):
+            return
+        value = value.strip()
+        if field == "phone":
+            digits = len(normalize_phone(value).lstrip("+"))
+            if not 7 <= digits <= 15:
+                return
+            value = " ".join(value.replace("%20", " ").split())
+        elif field in SOCIAL_FIELDS:
+            classified = classify_social_url(value)
+            if not classified or classified[0] != field:
+                return
+            value = classified[1]
+        key = _normalize(field, value)
+        candidate = self.candidates[field].setdefault(key, {"value": value, "weight": 0.0, "miss": 1.0, "sources": []})
+        candidate["miss"] *= 1 - weight
+        if weight > candidate["weight"]:
+            # Show the value as written by the most reliable source
+            candidate["value"], candidate["weight"] = value, weight
+        if source and source not in candidate["sources"]:
+            candidate["sources"].append(source)
+
+    def _scan_text(self, text: str, source: str, own_site: bool) -> None:
+        weight = WEIGHT_OWN_SITE if own_site else WEIGHT_OTHER_PAGE
+        for url in URL_PATTERN.findall(text):
+            classified = classify_social_url(url)
+            if classified:
+                self.add(classified[0], classified[1], weight, source)
+        for email in EMAIL_PATTERN.findall(text):
+            if not EMAIL_BLOCKLIST.search(email):
+                self.add("email", email.lower(), weight, source)
+        for phone in TEL_LINK_PATTERN.findall(text):
+            self.add("phone", phone, weight, source)
+        for phone in LABELED_PHONE_PATTERN.findall(text):
+            self.add("phone", phone, weight / 2, source)
+
+    def _matches_company(self, name: Any, website: Any) -> bool:
+        """Whether a Google Maps place or LinkedIn profile is about the researched company."""
+        if website and isinstance(website, str) and domain_of(website) in self.company_domains:
+            return True
+        words = set(re.findall(r"[a-z0-9]+", str(name or "").lower()))
+        return bool(self.name_words) and bool(self.name_words & words)
+
+    def _scan_item(self, tool: str, item: Dict[str, Any]) -> None:
+        source = str(item.get("url") or item.get("website") or "")
+        if tool == "search_google_maps":
+            source = f"Google Maps: {item.get('title', '')}"
+            if self._matches_company(item.get("title"), item.get("website")):
+                self.add("phone", item.get("phone"), WEIGHT_STRUCTURED, source)
+                self.add("address", item.get("address"), WEIGHT_STRUCTURED, source)
+        elif tool == "get_linkedin_company_profile":
+            source = "LinkedIn profile"
+            address = item.get("address")
+            if isinstance(address, dict):
+                address = ", ".join(str(v) for v in address.values() if v and isinstance(v, (str, int)))
+            if self._matches_company(item.get("name"), item.get("website")):
+                self.add("address", address, WEIGHT_STRUCTURED * 0.8, source)
+
+        text = item.get("markdown") or item.get("description") or ""
+        if isinstance(text, str) and text:
+            own_site = tool in ("crawl_website", "crawl_key_pages") or domain_of(source) in self.company_domains
+            self._scan_text(text, source, own_site)
+
+    def update_from_evidence(self, evidence) -> None:
+        """Scan the calls recorded since the last update."""
+        new_calls = [call for call in evidence.calls[self._processed_calls:] if not call.get("purpose")]
+        for call in new_calls:
+            if call["tool"] in ("crawl_website", "crawl_key_pages"):
+                self.company_domains.add(domain_of(call["arguments"].get("url", "")))
+        for call in new_calls:
+            tool, arguments = call["tool"], call["arguments"]
+            items = [evidence.blobs[digest] for digest in call["items"]]
+            if tool == "get_linkedin_company_profile" and items:
+                self.add("linkedin", arguments.get("linkedin_company_url"), WEIGHT_TOOL_ARGUMENT, "LinkedIn profile")
+            if tool == "get_indeed_jobs" and items:
+                self.add("indeed", arguments.get("indeed_company_url"), WEIGHT_TOOL_ARGUMENT, "Indeed")
+            for item in items:
+                if isinstance(item, dict):
+                    self._scan_item(tool, item)
+        self._processed_calls = len(evidence.calls)
+
+    def _confidence(self, field: str, candidate: Dict[str, Any]) -> float:
+        confidence = 1 - candidate["miss"]
+        value = candidate["value"].lower()
+        if field == "email" and self.company_domains:
+            # Addresses on the company's own domain are far more likely to be the company's
+            confidence *= 1.0 if any(value.endswith("@" + d) or value.endswith("." + d) for d in self.company_domains) else 0.5
+        elif field in SOCIAL_FIELDS and self.company_tokens:
+            handle = urlsplit(value).path.lower()
+            confidence *= 1.0 if any(t in handle for t in self.company_tokens) else 0.6
+        return round(min(confidence, 0.99), 2)
+
+    def facts(self, min_confidence: float = 0.0) -> Dict[str, Dict[str, Any]]:
+        """Return the best value of every field that was found.
+
+        Returns:
+            A dictionary mapping field names to their value, confidence, sources (up to 3 URLs or
+            source names the value was seen on) and alternatives (other candidate values).
+        """
+        facts = {}
+        for field in FIELDS:
+            ranked = sorted(
+                ((self._confidence(field, c), c) for c in self.candidates[field].values()),
+                key=lambda pair: pair[0], reverse=True,
+            )
+            if not ranked or ranked[0][0] < min_confidence:
+                continue
+            confidence, best = ranked[0]
+            facts[field] = {
+                "value": best["value"],
+                "confidence": confidence,
+                "sources": best["sources"][:3],
+                "alternatives": [c["value"] for _, c in ranked[1:4]],
+            }
+        return facts
+
+    def supports(self, field: str, value: str) -> bool:
+        """Whether a value was seen in any tool output."""
+        return bool(value) and _normalize(field, value) in self.candidates[field]
+
+    def apply(self, result: Any, min_confidence: float = 0.6, override_confidence: float = 0.85) -> List[Dict[str, Any]]:
+        """Fill empty fields of a result and replace values no tool output supports.
+
+        Args:
+            result: A ResponseModel (or any object with the extracted fields as attributes).
+            min_confidence: Minimum confidence for filling an empty field.
+            override_confidence: Minimum confidence for replacing an unsupported value.
+
+        Returns:
+            The changes made, each with field, previous, value and confidence.
+        """
+        changes = []
+        for field, fact in self.facts(min_confidence).items():
+            current = getattr(result, field, None) or ""
+            if current and (self.supports(field, current) or fact["confidence"] < override_confidence):
+                continue
+            if _normalize(field, current) == _normalize(field, fact["value"]):
+                continue
+            setattr(result, field, fact["value"])
+            changes.append({"field": field, "previous": current, "value": fact["value"], "confidence": fact["confidence"]})
+        return changes
+
+    def provenance(self, data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Return confidence and sources for the fields of a result dictionary that were seen in tool outputs."""
+        provenance = {}
+        for field in FIELDS:
+            value = data.get(field)
+            candidate = self.candidates[field].get(_normalize(field, value)) if value else None
+            if candidate:
+                provenance[field] = {"confidence": self._confidence(field, candidate), "sources": candidate["sources"][:3]}
+        return provenance
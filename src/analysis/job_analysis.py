@@ -0,0 +1,241 @@
+import re
+from collections import Counter
+from statistics import median
+from typing import Any, Dict, List, Optional, Tuple
+
+# Multipliers that convert a salary quoted per period into an annual figure
+ANNUAL_MULTIPLIERS = {
+    "hour": 2080,
+    "day": 260,
+    "week": 52,
+    "month": 12,
+    "year": 1,
+}
+
+CURRENCY_SYMBOLS = {"$": "USD", "£": "GBP", "€": "EUR", "₹": "INR", "¥": "JPY"}
+
+CURRENCY_CODE_PATTERN = re.compile(r"\b(USD|GBP|EUR|INR|JPY|CAD|AUD|CHF)\b")
+
+SALARY_AMOUNT_PATTERN = re.compile(r"([$£€₹¥])?\s*(\d[\d.,]*\d|\d)\s*([kK](?!\w))?")
+# Groups of exactly three digits after a separator, as in "3.000" or "50,000"
+THOUSANDS_GROUPS_PATTERN = re.compile(r"^\d{1,3}(?:[.,]\d{3})+$")
+SALARY_PERIOD_PATTERN = re.compile(r"\b(?:an?|per)\s+(hour|day|week|month|year)\b", re.IGNORECASE)
+OPEN_RANGE_PATTERN = re.compile(r"^\s*(?:from|starting\s+(?:at|from)|at\s+least|min(?:imum)?\.?)\b", re.IGNORECASE)
+POSTED_DAYS_PATTERN = re.compile(r"(\d+)(\+?)\s*(day|hour|minute)", re.IGNORECASE)
+US_STATE_ZIP_PATTERN = re.compile(r"\s+\d{5}(?:-\d{4})?$")
+
+# Checked in order, the first matching function wins. Keywords are regular expressions matched
+# as whole words, so "contest" does not count as "test" nor "html" as "ml".
+FUNCTION_KEYWORDS = [
+    ("Data & Analytics", ("data", "analytics", "analysts?", "machine learning", "ml", "scientists?", "bi")),
+    ("Engineering", (r"engineer\w*", "developers?", "software", "devops", "sre", "architects?", "programmers?", "qa", r"test(?:er|ers|ing)?")),
+    ("Product", (r"products?",)),
+    ("Design", (r"design\w*", "ux", "ui")),
+    ("Sales", ("sales", "account executive", "account manager", "business development", "sdr", "bdr")),
+    ("Marketing", ("marketing", "growth", "seo", "content", r"brand\w*", "communications", "pr")),
+    ("Customer Success & Support", ("support", "customer success", "customer service", "customer experience", "help desk")),
+    ("Finance & Legal", (r"financ\w*", "accountants?", "accounting", "controller", "legal", r"counsel\w*", "paralegal", "tax")),
+    ("People & HR", (r"recruit\w*", "talent", "hr", "human resources", "people")),
+    ("Operations", ("operations", "logistics", "supply chain", "warehouse", "drivers?", "technicians?", "associate")),
+]
+
+# Checked in order, the first matching seniority wins. Directors and VPs come before the C-level
+# titles, so "Director of Sales" is not read as an executive.
+SENIORITY_KEYWORDS = [
+    ("Director", ("directors?",)),
+    ("Executive", ("vp", "svp", "evp", "vice president", "head of")),
+    ("Executive", ("chief", "ceo", "cto", "cfo", "coo", "cmo", "cio", "cpo")),
+    ("Manager", ("managers?",)),
+    ("Lead / Principal", ("lead", "principal", "staff")),
+    ("Senior", ("senior", r"sr\.?", "iii")),
+    ("Junior", ("junior", r"jr\.?", "entry", "graduate", "associate")),
+    ("Intern", ("interns?", "internship", r"apprentice\w*", "trainee")),
+]
+
+def _compile(keywords: List[Tuple[str, Tuple[str, ...]]]) -> List[Tuple[str, "re.Pattern"]]:
+    return [(label, re.compile(r"\b(?:" + "|".join(needles) + r")(?!\w)", re.IGNORECASE)) for label, needles in keywords]
+
+FUNCTION_PATTERNS = _compile(FUNCTION_KEYWORDS)
+SENIORITY_PATTERNS = _compile(SENIORITY_KEYWORDS)
+
+def _classify(title: str, patterns: List[Tuple[str, "re.Pattern"]], default: str) -> str:
+    for label, pattern in patterns:
+        if pattern.search(title):
+            return label
+    return default
+
+def _parse_amount(number: str) -> float:
+    """Parse an amount written with either "," or "." as the thousands separator ("50,000", "3.000,50")."""
+    if "," in number and "." in number:
+        # The separator that comes last is the decimal mark
+        decimal_mark = "," if number.rfind(",") > number.rfind(".") else "."
+        thousands_mark = "." if decimal_mark == "," else ","
+        return float(number.replace(thousands_mark, "").replace(decimal_mark, "."))
+    if THOUSANDS_GROUPS_PATTERN.match(number):
+        return float(number.replace(",", "").replace(".", ""))
+    return float(number.replace(",", "."))
+
+def parse_salary(salary: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Parse an Indeed salary string into an annualized numeric range.
+
+    Args:
+        salary: Salary text such as "$50,000 - $70,000 a year" or "From $25 an hour".
+
+    Returns:
+        A dictionary with currency, period, min and max (as quoted) and annual_min/annual_max,
+        or None if no amount could be parsed. The missing bound of "up to" and "from" ranges is None.
+    """
+    if not salary or not isinstance(salary, str):
+        return None
+
+    period_match = SALARY_PERIOD_PATTERN.search(salary)
+    code_match = CURRENCY_CODE_PATTERN.search(salary)
+    matches = SALARY_AMOUNT_PATTERN.findall(salary)
+    # Only numbers quoted with a currency count when there are any, so "401(k)" is not a salary
+    if any(symbol for symbol, _, _ in matches):
+        matches = [m for m in matches if m[0]]
+    elif not period_match and not code_match:
+        return None
+
+    amounts = []
+    for _, number, thousands in matches:
+        value = _parse_amount(number)
+        amounts.append(value * 1000 if thousands else value)
+    if not amounts:
+        return None
+
+    period = period_match.group(1).lower() if period_match else "year"
+    currency = next((code for symbol, code in CURRENCY_SYMBOLS.items() if symbol in salary), code_match.group(1) if code_match else "")
+
+    low, high = min(amounts), max(amounts)
+    if salary.lower().lstrip().startswith("up to"):
+        low = None
+    elif OPEN_RANGE_PATTERN.match(salary) and len(amounts) == 1:
+        high = None
+
+    multiplier = ANNUAL_MULTIPLIERS[period]
+    return {
+        "currency": currency,
+        "period": period,
+        "min": low,
+        "max": high,
+        "annual_min": round(low * multiplier) if low is not None else None,
+        "annual_max": round(high * multiplier) if high is not None else None,
+    }
+
+def normalize_job_type(job_type: Any) -> List[str]:
+    """Normalize Indeed jobType values (string or list) into a list of canonical labels."""
+    if not job_type:
+        return []
+    values = job_type if isinstance(job_type, list) else re.split(r"[,/]", str(job_type))
+    normalized = []
+    for value in values:
+        label = str(value).strip().lower().replace("_", "-").replace(" ", "-")
+        if label:
+            normalized.append(label.capitalize())
+    return normalized
+
+def normalize_location(location: Optional[str]) -> Dict[str, Any]:
+    """Split an Indeed location into a clean place name and a work arrangement."""
+    if not location:
+        return {"place": "Unknown", "arrangement": "Unknown"}
+
+    text = location.strip()
+    lowered = text.lower()
+    if lowered.startswith("hybrid"):
+        arrangement = "Hybrid"
+    elif "remote" in lowered:
+        arrangement = "Remote"
+    else:
+        arrangement = "On-site"
+
+    place = re.sub(r"^(hybrid\s+)?remote(\s+in)?\s*", "", text, flags=re.IGNORECASE)
+    place = re.sub(r"^hybrid\s+(work\s+)?in\s+", "", place, flags=re.IGNORECASE)
+    place = US_STATE_ZIP_PATTERN.sub("", place).strip(" ,") or ("Remote" if arrangement == "Remote" else "Unknown")
+    return {"place": place, "arrangement": arrangement}
+
+def parse_posted_days(posted_at: Optional[str]) -> Optional[int]:
+    """Convert Indeed's relative postedAt text ("3 days ago", "Just posted") into days since posting."""
+    if not posted_at or not isinstance(posted_at, str):
+        return None
+    lowered = posted_at.lower()
+    if "just" in lowered or "today" in lowered:
+        return 0
+    match = POSTED_DAYS_PATTERN.search(lowered)
+    if not match:
+        return None
+    if match.group(3) != "day":
+        return 0
+    # "30+ days ago" means older than 30 days
+    return int(match.group(1)) + (1 if match.group(2) else 0)
+
+def _truncate(text: Optional[str], max_length: int) -> str:
+    text = re.sub(r"\s+", " ", text or "").strip()
+    if len(text) <= max_length:
+        return text
+    return text[:max_length].rsplit(" ", 1)[0] + "..."
+
+def analyze_jobs(jobs: List[Dict[str, Any]], max_description_length: int = 300) -> Dict[str, Any]:
+    """Aggregate Indeed job listings into compact hiring statistics.
+
+    Args:
+        jobs: Job listings as returned by get_indeed_jobs.
+        max_description_length: Descriptions in the listing table are truncated to this many characters.
+
+    Returns:
+        A dictionary with opening counts by function, seniority, location, arrangement and job type,
+        salary statistics, posting recency and a compact table of the listings themselves.
+    """
+    listings = []
+    for job in jobs:
+        title = job.get("positionName") or ""
+        location = normalize_location(job.get("location"))
+        listings.append({
+            "title": title,
+            "function": _classify(title, FUNCTION_PATTERNS, "Other"),
+            "seniority": _classify(title, SENIORITY_PATTERNS, "Mid-level"),
+            "location": location["place"],
+            "arrangement": location["arrangement"],
+            "job_types": normalize_job_type(job.get("jobType")),
+            "salary": parse_salary(job.get("salary")),
+            "posted_days_ago": parse_posted_days(job.get("postedAt")),
+            "url": job.get("url") or "",
+            "description": _truncate(job.get("description"), max_description_length),
+        })
+
+    salaries = [l["salary"] for l in listings if l["salary"]]
+    currencies = Counter(s["currency"] for s in salaries if s["currency"])
+    main_currency = currencies.most_common(1)[0][0] if currencies else ""
+    comparable = [s for s in salaries if s["currency"] == main_currency]
+    annual_lows = [s["annual_min"] for s in comparable if s["annual_min"] is not None]
+    annual_highs = [s["annual_max"] for s in comparable if s["annual_max"] is not None]
+    midpoints = []
+    for s in comparable:
+        bounds = [b for b in (s["annual_min"], s["annual_max"]) if b is not None]
+        midpoints.append(sum(bounds) / len(bounds))
+
+    posted = [l["posted_days_ago"] for l in listings if l["posted_days_ago"] is not None]
+
+    return {
+        "total_openings": len(listings),
+        "by_function": dict(Counter(l["function"] for l in listings).most_common()),
+        "by_seniority": dict(Counter(l["seniority"] for l in listings).most_common()),
+        "by_location": dict(Counter(l["location"] for l in listings).most_common(10)),
+        "by_arrangement": dict(Counter(l["arrangement"] for l in listings).most_common()),
+        "by_job_type": dict(Counter(t for l in listings for t in l["job_types"]).most_common()),
+        "salary": {
+            "listings_with_salary": len(salaries),
+            "currency": main_currency,
+            "annual_min": min(annual_lows) if annual_lows else None,
+            "annual_max": max(annual_highs) if annual_highs else None,
+            "annual_median_midpoint": round(median(midpoints)) if midpoints else None,
+        },
+        "recency": {
+            "posted_last_7_days": sum(1 for d in posted if d <= 7),
+            "posted_last_30_days": sum(1 for d in posted if d <= 30),
+            "older_than_30_days": sum(1 for d in posted if d > 30),
+            "unknown": len(listings) - len(posted),
+            "median_days_since_posting": median(posted) if posted else None,
+        },
+        "listings": listings,
+    }
@@ -0,0 +1,165 @@
+import re
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Words that carry no signal when looking for recurring phrases in reviews
+STOPWORDS = frozenset("""
+a about after again all also am an and any are as at be because been before being but by can could
+did do does doing for from had has have having he her here him his how i if in into is it its just
+me more most my no not now of on once only or other our out over own same she so some such than that
+the their them then there these they this those through to too under until up very was we were what
+when where which while who why will with would you your yours im ive dont didnt its were theyre
+""".split())
+
+WORD_PATTERN = re.compile(r"[a-z][a-z']+")
+
+def _parse_date(value: Any) -> Optional[datetime]:
+    """Parse an ISO-like date string, returning None for anything unparseable."""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+def normalize_trustpilot_review(review: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a Trustpilot review onto the common review shape used by the analyzer."""
+    headline = review.get("reviewHeadline") or ""
+    body = review.get("reviewBody") or ""
+    return {
+        "rating": int(review.get("ratingValue") or 0),
+        "text": f"{headline}. {body}".strip(". ") if headline else body,
+        "date": _parse_date(review.get("datePublished")),
+        "verified": str(review.get("verificationLevel", "")).lower() not in ("", "not-verified", "none"),
+        "country": review.get("consumerCountryCode") or "",
+        "likes": int(review.get("likes") or 0),
+        "url": review.get("reviewUrl") or "",
+    }
+
+def normalize_google_maps_review(review: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a Google Maps review onto the common review shape used by the analyzer."""
+    return {
+        "rating": int(review.get("stars") or 0),
+        "text": review.get("text") or review.get("textTranslated") or "",
+        "date": _parse_date(review.get("publishedAtDate")),
+        "verified": bool(review.get("isLocalGuide")),
+        "country": "",
+        "likes": int(review.get("likesCount") or 0),
+        "url": review.get("reviewUrl") or "",
+    }
+
+def _top_phrases(texts: List[str], max_phrases: int) -> List[Dict[str, Any]]:
+    """Count bigrams and trigrams by the number of reviews they appear in."""
+    counts: Counter = Counter()
+    for text in texts:
+        words = [w for w in WORD_PATTERN.findall(text.lower()) if w not in STOPWORDS]
+        phrases = set()
+        for n in (2, 3):
+            for i in range(len(words) - n + 1):
+                phrases.add(" ".join(words[i:i + n]))
+        counts.update(phrases)
+
+    top = []
+    for phrase, count in counts.most_common():
+        if count < 2 or len(top) >= max_phrases:
+            break
+        # Skip bigrams that only ever appear inside an already selected trigram
+        if any(phrase in chosen["phrase"] and count <= chosen["reviews"] for chosen in top):
+            continue
+        top.append({"phrase": phrase, "reviews": count})
+    return top
+
+def _pick_quotes(reviews: List[Dict[str, Any]], max_quotes: int, max_quote_length: int) -> List[Dict[str, Any]]:
+    """Pick the most liked, sufficiently long review from the positive, negative and mixed buckets."""
+    buckets = {
+        "positive": [r for r in reviews if r["rating"] >= 4],
+        "negative": [r for r in reviews if 0 < r["rating"] <= 2],
+        "mixed": [r for r in reviews if r["rating"] == 3],
+    }
+    quotes = []
+    for sentiment, bucket in buckets.items():
+        candidates = [r for r in bucket if len(r["text"]) >= 40] or bucket
+        if not candidates:
+            continue
+        best = max(candidates, key=lambda r: (r["likes"], len(r["text"])))
+        text = best["text"]
+        if len(text) > max_quote_length:
+            text = text[:max_quote_length].rsplit(" ", 1)[0] + "..."
+        quotes.append({
+            "sentiment": sentiment,
+            "rating": best["rating"],
+            "date": best["date"].strftime("%Y-%m-%d") if best["date"] else "",
+            "text": text,
+            "url": best["url"],
+        })
+        if len(quotes) >= max_quotes:
+            break
+    return quotes
+
+def analyze_reviews(
+    reviews: List[Dict[str, Any]],
+    max_phrases: int = 10,
+    max_quotes: int = 3,
+    max_quote_length: int = 300,
+) -> Dict[str, Any]:
+    """Aggregate normalized reviews into compact statistics.
+
+    Args:
+        reviews: Reviews in the common shape produced by the normalize_* helpers.
+        max_phrases: Maximum number of recurring phrases to return.
+        max_quotes: Maximum number of representative quotes to return.
+        max_quote_length: Quotes longer than this are truncated.
+
+    Returns:
+        A dictionary with the review count, average rating, rating histogram, monthly trend,
+        verified share, country mix, top recurring phrases and a few representative quotes.
+    """
+    rated = [r for r in reviews if 1 <= r["rating"] <= 5]
+    histogram = Counter(r["rating"] for r in rated)
+
+    monthly = defaultdict(list)
+    for review in rated:
+        if review["date"]:
+            monthly[review["date"].strftime("%Y-%m")].append(review["rating"])
+    trend = [
+        {"month": month, "reviews": len(ratings), "average_rating": round(sum(ratings) / len(ratings), 2)}
+        for month, ratings in sorted(monthly.items())
+    ]
+
+    countries = Counter(r["country"].upper() for r in reviews if r["country"])
+    dates = [r["date"] for r in reviews if r["date"]]
+
+    return {
+        "review_count": len(reviews),
+        "average_rating": round(sum(r["rating"] for r in rated) / len(rated), 2) if rated else None,
+        "rating_histogram": {str(stars): histogram.get(stars, 0) for stars in range(5, 0, -1)},
+        "rating_shares": {str(stars): round(histogram.get(stars, 0) / len(rated), 3) for stars in range(5, 0, -1)} if rated else {},
+        "monthly_trend": trend,
+        "date_range": {
+            "from": min(dates).strftime("%Y-%m-%d"),
+            "to": max(dates).strftime("%Y-%m-%d"),
+        } if dates else {},
+        "verified_share": round(sum(1 for r in reviews if r["verified"]) / len(reviews), 3) if reviews else 0,
+        "country_mix": dict(countries.most_common(10)),
+        "top_phrases": _top_phrases([r["text"] for r in reviews if r["text"]], max_phrases),
+        "representative_quotes": _pick_quotes(rated, max_quotes, max_quote_length),
+    }
+
+def summarize_trustpilot_reviews(reviews: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+    """Summarize raw Trustpilot reviews as returned by get_trustpilot_reviews."""
+    return analyze_reviews([normalize_trustpilot_review(r) for r in reviews], **kwargs)
+
+def summarize_google_maps_places(places: List[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
+    """Replace the raw reviews of each Google Maps place with an aggregated summary.
+
+    The place-level totalScore, reviewsCount and reviewsDistribution are kept as they cover all reviews,
+    while the summary only covers the fetched sample.
+    """
+    summarized = []
+    for place in places:
+        place = dict(place)
+        raw_reviews = place.pop("reviews", None) or []
+        place["reviewsSummary"] = analyze_reviews([normalize_google_maps_review(r) for r in raw_reviews], **kwargs)
+        summarized.append(place)
+    return summarized
@@ -0,0 +1,12 @@
+from .local_apify import LocalApifyClient
+from .scripted_model import create_scripted_model, build_report
+from .harness import run_load_test, compare_reports, percentile
+
+__all__ = [
+    'LocalApifyClient',
+    'create_scripted_model',
+    'build_report',
+    'run_load_test',
+    'compare_reports',
+    'percentile'
+]
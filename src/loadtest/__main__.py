@@ -0,0 +1,70 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+
+# Add the parent directory to the path for absolute imports
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from apify import Actor
+
+from src.loadtest import compare_reports, run_load_test
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load-test the standby endpoint against a local Apify stand-in and a scripted model.")
+    parser.add_argument("--levels", type=int, nargs="+", default=[10, 50, 200], help="Concurrency levels to test")
+    parser.add_argument("--requests", type=int, default=None, help="Requests per level (default: twice the concurrency)")
+    parser.add_argument("--think-secs", type=float, default=1.0, help="Simulated duration of one model request")
+    parser.add_argument("--actor-latency-secs", type=float, default=1.0, help="Simulated start-up time of one scraper run")
+    parser.add_argument("--actor-failure-rate", type=float, default=0.0, help="Share of scraper runs that fail")
+    parser.add_argument("--report-retries", type=int, default=0, help="Report retries allowed per request")
+    parser.add_argument("--max-running", type=int, default=3, help="Research jobs the standby server runs at the same time")
+    parser.add_argument("--max-queued", type=int, default=20, help="Research jobs queued before requests are answered with 429")
+    parser.add_argument("--distinct-companies", type=int, default=None, help="Spread each level's requests over this many companies (default: all different)")
+    parser.add_argument("--label", default="", help="Name of the build under test")
+    parser.add_argument("--output", default="loadtest-report.json", help="Where to write the JSON report")
+    parser.add_argument("--baseline", default=None, help="Earlier JSON report to compare with")
+    parser.add_argument("--verbose", action="store_true", help="Keep the pipeline's info logs")
+    return parser.parse_args()
+
+async def main() -> None:
+    args = parse_args()
+    async with Actor:
+        if not args.verbose:
+            # Per-request logs of hundreds of concurrent runs would skew the event-loop lag
+            logging.getLogger(Actor.log.name).setLevel(logging.WARNING)
+            logging.getLogger("httpx").setLevel(logging.WARNING)
+        report = await run_load_test(
+            levels=args.levels,
+            requests_per_level=args.requests,
+            think_secs=args.think_secs,
+            actor_latency_secs=args.actor_latency_secs,
+            actor_failure_rate=args.actor_failure_rate,
+            report_retries=args.report_retries,
+            max_running=args.max_running,
+            max_queued=args.max_queued,
+            distinct_companies=args.distinct_companies,
+            label=args.label,
+        )
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["comparison"] = compare_reports(json.load(f), report)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{'concurrency':>11} {'ok':>5} {'failed':>6} {'req/s':>7} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'lag ms':>7} {'rss MB':>7} {'queue':>5} {'jobs':>5}")
+    for level in report["levels"]:
+        latency = level["latency_seconds"]
+        print(f"{level['concurrency']:>11} {level['succeeded']:>5} {level['failed']:>6} {level['throughput_rps']:>7.2f} "
+              f"{latency['p50']:>7.2f} {latency['p95']:>7.2f} {latency['p99']:>7.2f} {level['event_loop_lag_ms']['max']:>7.1f} "
+              f"{level['peak_rss_mb']:>7.1f} {level['max_queue_depth']:>5} {level['max_running_jobs']:>5}")
+    for entry in report.get("comparison", []):
+        changes = ", ".join(f"{name} {value['change']:+.1%}" for name, value in entry.items() if isinstance(value, dict) and value["change"] is not None)
+        print(f"vs baseline at concurrency {entry['concurrency']}: {changes}")
+    print(f"Standby scheduler: {report['scheduler']}")
+    print(f"Report written to {args.output}")
+
+asyncio.run(main())
@@ -0,0 +1,252 @@
+import asyncio
+import math
+import resource
+import socket
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+from apify import Actor
+
+from ..models import RetryPolicy
+from ..research import research_company
+from ..standby import READINESS_PROBE_HEADER, StandbyScheduler, create_research_handler, serve_standby
+from ..utils import ActorProfiles, BatchingApifyClient, CircuitBreakerRegistry, ToolBudget, ToolCostModel
+from .local_apify import LocalApifyClient
+from .scripted_model import create_scripted_model
+
+def percentile(values: Sequence[float], share: float) -> float:
+    """Nearest-rank percentile (share between 0 and 1) of a list of values, 0 if it is empty."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(max(math.ceil(share * len(ordered)) - 1, 0), len(ordered) - 1)]
+
+def _rss_mb() -> float:
+    """Current resident memory of the process in MB (peak memory where /proc is not available)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize() / 1e6
+    except OSError:
+        return _peak_rss_mb()
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux but in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+class _Sampler:
+    """Samples queued and running research jobs, running scraper calls, event-loop lag and memory at a fixed interval."""
+
+    def __init__(self, interval: float, scheduler: StandbyScheduler, apify: LocalApifyClient):
+        self.interval = interval
+        self._scheduler = scheduler
+        self._apify = apify
+        self.timeline: List[Dict[str, float]] = []
+        self._started = time.monotonic()
+
+    async def run(self) -> None:
+        while True:
+            before = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(time.monotonic() - before - self.interval, 0.0)
+            self.timeline.append({
+                "t": round(time.monotonic() - self._started, 2),
+                "queue_depth": self._scheduler.queued,
+                "running_jobs": self._scheduler.running,
+                "actor_runs": self._apify.running,
+                "event_loop_lag_ms": round(lag * 1000, 1),
+                "rss_mb": round(_rss_mb(), 1),
+            })
+
+async def _run_level(url: str, concurrency: int, requests: int, sampler: _Sampler, offset: int, distinct_companies: Optional[int]) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(http: httpx.AsyncClient, index: int) -> None:
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                company = offset + (index % distinct_companies if distinct_companies else index)
+                response = await http.get(url, params={"company_name": f"Load Test Company {company}"})
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.monotonic() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    sampler.timeline.clear()
+    sampler_task = asyncio.create_task(sampler.run())
+    started = time.monotonic()
+    try:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=0)
+        async with httpx.AsyncClient(timeout=None, limits=limits) as http:
+            await asyncio.gather(*(send(http, i) for i in range(requests)))
+    finally:
+        sampler_task.cancel()
+    wall_seconds = time.monotonic() - started
+
+    lags = [sample["event_loop_lag_ms"] for sample in sampler.timeline]
+    succeeded = statuses.get("200", 0)
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "succeeded": succeeded,
+        "failed": requests - succeeded,
+        "status_counts": statuses,
+        "wall_seconds": round(wall_seconds, 2),
+        "throughput_rps": round(succeeded / wall_seconds, 3) if wall_seconds else 0.0,
+        "latency_seconds": {
+            "p50": round(percentile(latencies, 0.50), 3),
+            "p95": round(percentile(latencies, 0.95), 3),
+            "p99": round(percentile(latencies, 0.99), 3),
+            "max": round(max(latencies, default=0.0), 3),
+        },
+        "event_loop_lag_ms": {
+            "p50": percentile(lags, 0.50),
+            "p99": percentile(lags, 0.99),
+            "max": max(lags, default=0.0),
+        },
+        "max_queue_depth": max((sample["queue_depth"] for sample in sampler.timeline), default=0),
+        "max_running_jobs": max((sample["running_jobs"] for sample in sampler.timeline), default=0),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "timeline": list(sampler.timeline),
+    }
+
+async def run_load_test(
+    levels: Sequence[int] = (10, 50, 200),
+    requests_per_level: Optional[int] = None,
+    think_secs: float = 1.0,
+    actor_latency_secs: float = 1.0,
+    actor_failure_rate: float = 0.0,
+    report_retries: int = 0,
+    max_running: int = 3,
+    max_queued: int = 20,
+    distinct_companies: Optional[int] = None,
+    sample_interval: float = 0.25,
+    label: str = "",
+) -> Dict[str, Any]:
+    """Load-test the standby HTTP entry point against the local Apify stand-in and the scripted model.
+
+    The standby server, the research pipeline (circuit breakers, actor profiles, batching, budgets, spill store)
+    and the load generator run in this process. Scrapers and the model are simulated, so the
+    results measure the service's own overhead and concurrency behavior. Must run inside the
+    Actor context.
+
+    Args:
+        levels: Numbers of concurrent requests to test, one after another.
+        requests_per_level: Requests sent per level (default: twice the concurrency).
+        think_secs: Simulated duration of one model request.
+        actor_latency_secs: Simulated start-up time of one scraper run.
+        actor_failure_rate: Share of scraper runs that fail.
+        report_retries: Report retries allowed per request.
+        max_running: Research jobs the standby scheduler runs at the same time.
+        max_queued: Research jobs the standby scheduler queues before answering 429.
+        distinct_companies: Companies each level's requests are spread over, so repeats are
+            coalesced or cached (default: every request asks for a different company).
+        sample_interval: Seconds between timeline samples.
+        label: Name of the build under test, stored in the report.
+
+    Returns:
+        A machine-readable report with settings and, per level, throughput, latency percentiles,
+        event-loop lag, peak memory, maximum queued and running jobs and the sampled timeline.
+    """
+    apify = LocalApifyClient(latency_secs=actor_latency_secs, failure_rate=actor_failure_rate)
+    breakers = CircuitBreakerRegistry()
+    costs = ToolCostModel()
+    profiles = ActorProfiles(costs)
+    client = BatchingApifyClient(profiles.wrap(breakers.guard(apify)))
+    model = create_scripted_model(think_secs)
+    scheduler = StandbyScheduler(max_running, max_queued)
+
+    async def research(company_name: str, additional_context: Optional[str] = None, competitor_count: Optional[int] = None) -> Dict[str, Any]:
+        return await research_company(
+            client, company_name, additional_context, RetryPolicy(max_retries=report_retries), None, competitor_count or 0,
+            breakers, True, None, False, ToolBudget(costs, 900, 20_000_000), 40_000, model,
+        )
+
+    port = _free_port()
+    server = asyncio.create_task(serve_standby(create_research_handler(research, scheduler), port, "127.0.0.1"))
+    url = f"http://127.0.0.1:{port}/"
+    try:
+        async with httpx.AsyncClient() as http:
+            for _ in range(100):
+                try:
+                    await http.get(url, headers={READINESS_PROBE_HEADER: "1"})
+                    break
+                except httpx.HTTPError:
+                    await asyncio.sleep(0.05)
+
+        sampler = _Sampler(sample_interval, scheduler, apify)
+        results = []
+        offset = 0
+        for concurrency in levels:
+            requests = requests_per_level or concurrency * 2
+            Actor.log.info(f"Load test: {requests} requests at concurrency {concurrency}")
+            results.append(await _run_level(url, concurrency, requests, sampler, offset, distinct_companies))
+            offset += requests
+    finally:
+        server.cancel()
+
+    return {
+        "label": label,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "settings": {
+            "levels": list(levels),
+            "requests_per_level": requests_per_level,
+            "think_secs": think_secs,
+            "actor_latency_secs": actor_latency_secs,
+            "actor_failure_rate": actor_failure_rate,
+            "report_retries": report_retries,
+            "max_running": max_running,
+            "max_queued": max_queued,
+            "distinct_companies": distinct_companies,
+        },
+        "actor_calls": apify.stats,
+        "batching": client.stats,
+        "actor_profiles": profiles.stats(),
+        "scheduler": scheduler.stats(),
+        "levels": results,
+    }
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Compare throughput, latency and memory of two load-test reports, level by level.
+
+    Returns:
+        One entry per concurrency level found in both reports, with the baseline and current
+        values and the relative change of each metric.
+    """
+    def metrics(level: Dict[str, Any]) -> Dict[str, float]:
+        return {
+            "throughput_rps": level["throughput_rps"],
+            "p50_seconds": level["latency_seconds"]["p50"],
+            "p95_seconds": level["latency_seconds"]["p95"],
+            "p99_seconds": level["latency_seconds"]["p99"],
+            "max_event_loop_lag_ms": level["event_loop_lag_ms"]["max"],
+            "peak_rss_mb": level["peak_rss_mb"],
+        }
+
+    previous = {level["concurrency"]: metrics(level) for level in baseline.get("levels", [])}
+    comparison = []
+    for level in current.get("levels", []):
+        old = previous.get(level["concurrency"])
+        if old is None:
+            continue
+        new = metrics(level)
+        comparison.append({
+            "concurrency": level["concurrency"],
+            **{name: {
+                "baseline": old[name],
+                "current": new[name],
+                "change": round((new[name] - old[name]) / old[name], 3) if old[name] else None,
+            } for name in new},
+        })
+    return comparison
@@ -0,0 +1,172 @@
+import asyncio
+import random
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+def _slug(value: str) -> str:
+    return "".join(c for c in value.lower() if c.isalnum())[:30] or "company"
+
+def _page(url: str, title: str, paragraphs: int = 6) -> Dict[str, Any]:
+    domain = url.split("/")[2].replace("www.", "")
+    text = "\n\n".join(
+        f"{title} grew revenue by {12 + i}% in {2020 + i % 5} and serves {1000 * (i + 1):,} customers in {10 + i} countries. "
+        f"Contact us at hello@{domain} or call +1 415 555 01{i:02d}."
+        for i in range(paragraphs)
+    )
+    return {"url": url, "metadata": {"url": url, "title": title}, "markdown": f"# {title}\n\n{text}"}
+
+def _crawler_items(run_input: Dict[str, Any]) -> List[Dict[str, Any]]:
+    start = run_input["startUrls"][0]["url"].rstrip("/")
+    count = max(int(run_input.get("maxCrawlPages", 1)), 1)
+    urls = list(dict.fromkeys([u["url"] for u in run_input["startUrls"]] + [f"{start}/page-{i}" for i in range(count)]))
+    return [_page(url, f"Page {i} of {start}") for i, url in enumerate(urls[:count])]
+
+def _search_items(run_input: Dict[str, Any]) -> List[Dict[str, Any]]:
+    slug = _slug(run_input["query"])
+    urls = [
+        f"https://www.linkedin.com/company/{slug}/",
+        f"https://www.indeed.com/cmp/{slug}",
+        f"https://news.example.org/{slug}/funding",
+        f"https://blog.example.net/{slug}-review",
+    ] + [f"https://www.example{i}.com/{slug}" for i in range(20)]
+    return [_page(url, f"Result {i} for {run_input['query']}", 3) for i, url in enumerate(urls[:int(run_input.get("maxResults", 10))])]
+
+def _maps_items(run_input: Dict[str, Any]) -> List[Dict[str, Any]]:
+    items = []
+    for query in run_input["searchStringsArray"]:
+        items.append({
+            "searchString": query,
+            "title": query,
+            "address": "1 Market St, San Francisco, CA 94105",
+            "website": f"https://www.{_slug(query)}.com",
+            "phone": "+1 415-555-0100",
+            "totalScore": 4.4,
+            "reviewsCount": 321,
+            "reviews": [{"text": f"Great service number {i}", "stars": 4 + i % 2, "publishAt": "2 months ago"} for i in range(int(run_input.get("maxReviews", 0)))],
+        })
+    return items
+
+def _linkedin_items(run_input: Dict[str, Any]) -> List[Dict[str, Any]]:
+    slug = run_input["linkedinUrls"][0].rstrip("/").split("/")[-1]
+    return [{"data": [{"result": {
+        "name": slug.title(),
+        "description": f"{slug.title()} builds software.",
+        "industry": "Software Development",
+        "numberOfEmployees": 250,
+        "website": f"https://www.{slug}.com",
+        "specialties": [{"value": "Automation"}, {"value": "Data"}],
+        "address": {"city": "San Francisco", "country": "US"},
+    }}]}]
+
+def _indeed_items(run_input: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{
+        "positionName": ["Software Engineer", "Account Executive", "Product Manager"][i % 3],
+        "jobType": ["Full-time"],
+        "location": "Remote",
+        "salary": f"${100 + i},000 - ${140 + i},000 a year",
+        "url": f"https://www.indeed.com/viewjob?jk={i:08d}",
+        "postedAt": f"{i + 1} days ago",
+        "description": "Join our growing team. " * 20,
+    } for i in range(int(run_input.get("maxItemsPerSearch", 10)))]
+
+def _trustpilot_items(run_input: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{
+        "reviewUrl": f"https://www.trustpilot.com/reviews/{i}",
+        "datePublished": f"2026-0{1 + i % 9}-15",
+        "reviewHeadline": "Solid product",
+        "reviewBody": "Reliable, fast support and fair pricing. " * 3,
+        "ratingValue": 3 + i % 3,
+        "consumerCountryCode": "US",
+    } for i in range(int(run_input.get("count", 10)))]
+
+def _similarweb_items(run_input: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{
+        "url": website,
+        "name": website,
+        "companyName": website.split(".")[0].title(),
+        "globalRank": 25_000,
+        "companyYearFounded": 2015,
+        "companyEmployeesMin": 201,
+        "companyEmployeesMax": 500,
+        "totalVisits": 1_200_000,
+        "similarSites": [{"domain": f"competitor{i}.com", "affinity": 0.9 - i / 10} for i in range(5)],
+    } for website in run_input["websites"]]
+
+# Canned dataset items per actor, shaped like the real scrapers' output
+ACTOR_ITEMS: Dict[str, Callable[[Dict[str, Any]], List[Dict[str, Any]]]] = {
+    "apify/website-content-crawler": _crawler_items,
+    "apify/rag-web-browser": _search_items,
+    "compass/crawler-google-places": _maps_items,
+    "icypeas_official/linkedin-company-scraper": _linkedin_items,
+    "misceres/indeed-scraper": _indeed_items,
+    "nikita-sviridenko/trustpilot-reviews-scraper": _trustpilot_items,
+    "tri_angle/similarweb-scraper": _similarweb_items,
+}
+
+class _ListPage:
+    def __init__(self, items: List[Dict[str, Any]]):
+        self.items = items
+        self.count = self.total = len(items)
+        self.offset = 0
+
+class _LocalDataset:
+    def __init__(self, items: List[Dict[str, Any]]):
+        self._items = items
+
+    async def list_items(self, **kwargs) -> _ListPage:
+        return _ListPage(self._items)
+
+class _LocalRun:
+    async def abort(self) -> Dict[str, Any]:
+        return {"status": "ABORTED"}
+
+class _LocalActor:
+    def __init__(self, apify: "LocalApifyClient", actor_id: str):
+        self._apify = apify
+        self._actor_id = actor_id
+
+    async def call(self, run_input: Optional[Dict[str, Any]] = None, memory_mbytes: Optional[int] = None, **kwargs) -> Dict[str, Any]:
+        return await self._apify.run_actor(self._actor_id, run_input or {}, memory_mbytes or 1024)
+
+class LocalApifyClient:
+    """Stand-in for the Apify client that answers actor calls with canned items after a simulated run time.
+
+    Run time is latency_secs plus per_item_secs for every item at 1024 MB (scaled down with more
+    memory, like Apify CPU), with jitter, and a share of calls
+    fails (failure_rate), so the circuit breakers, batching and budgets see realistic traffic.
+    """
+
+    def __init__(self, latency_secs: float = 1.0, per_item_secs: float = 0.05, jitter: float = 0.3, failure_rate: float = 0.0, seed: int = 0):
+        self.latency_secs = latency_secs
+        self.per_item_secs = per_item_secs
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._datasets: Dict[str, List[Dict[str, Any]]] = {}
+        self.running = 0
+        self.stats = {"calls": 0, "failures": 0}
+
+    def actor(self, actor_id: str) -> _LocalActor:
+        return _LocalActor(self, actor_id)
+
+    def dataset(self, dataset_id: str) -> _LocalDataset:
+        return _LocalDataset(self._datasets.pop(dataset_id, []))
+
+    def run(self, run_id: str) -> _LocalRun:
+        return _LocalRun()
+
+    async def run_actor(self, actor_id: str, run_input: Dict[str, Any], memory_mbytes: int = 1024) -> Dict[str, Any]:
+        items = ACTOR_ITEMS[actor_id](run_input) if actor_id in ACTOR_ITEMS else []
+        seconds = (self.latency_secs + self.per_item_secs * len(items) * 1024 / memory_mbytes) * (1 + self._random.uniform(-self.jitter, self.jitter))
+        self.stats["calls"] += 1
+        self.running += 1
+        try:
+            await asyncio.sleep(max(seconds, 0))
+        finally:
+            self.running -= 1
+        run_id = uuid.uuid4().hex
+        if self._random.random() < self.failure_rate:
+            self.stats["failures"] += 1
+            return {"id": run_id, "status": "FAILED", "defaultDatasetId": ""}
+        self._datasets[run_id] = items
+        return {"id": run_id, "status": "SUCCEEDED", "defaultDatasetId": run_id, "stats": {"runTimeSecs": seconds}}
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import re
+from typing import List
+
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, ToolCallPart, ToolReturnPart, UserPromptPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+URL_IN_TEXT = re.compile(r"https?://[^\s\"'()\[\]<>]+")
+
+REPORT_SECTIONS = [
+    "Executive Summary", "Company Overview", "Business Model and Revenue Streams", "Products and Services",
+    "Market Analysis", "Competitive Landscape", "Financial Performance", "Leadership and Organizational Structure",
+    "Company Culture", "Technology and Innovation", "Marketing and Sales Strategy", "Recent News and Developments",
+    "Industry Trends", "Job Listings", "Risk Assessment", "Future Outlook",
+]
+
+def _slug(value: str) -> str:
+    return "".join(c for c in value.lower() if c.isalnum())[:30] or "company"
+
+def build_report(company_name: str, urls: List[str]) -> str:
+    """Write a report that passes the report validator, citing the given URLs."""
+    urls = urls or [f"https://www.{_slug(company_name)}.com"]
+    parts = []
+    for i, title in enumerate(REPORT_SECTIONS):
+        cite = lambda k: f"[source {k}]({urls[(i * 3 + k) % len(urls)]})"
+        parts.append(f"# {title}\n")
+        parts.append(
+            f"**{company_name}** reported {10 + i}% growth in {2020 + i % 6}, reaching ${20 + i} million in revenue "
+            f"according to {cite(0)}. The company serves {1000 * (i + 1):,} customers with a retention rate of {80 + i % 15}.5% "
+            f"and *expanded* into {3 + i} new markets {cite(1)}. " * 3
+        )
+        parts.append(f"\n## {title} Highlights\n")
+        parts.append("".join(
+            f"- **Metric {j}**: {j * 7 + i}% year over year, compared to an industry average of {j * 5}% {cite(2)}\n"
+            for j in range(1, 5)
+        ) + f"\nAnalysts expect *continued* momentum versus competitors over the next {2 + i % 3} years. " * 2)
+        parts.append(f"\n### {title} Details\n")
+        parts.append(f"The market share of {company_name} rose to {5 + i}.2% in {2024 - i % 3} {cite(0)}.\n\n")
+    return "\n".join(parts)
+
+def create_scripted_model(think_secs: float = 1.0) -> FunctionModel:
+    """Create a model that researches with a fixed set of tool calls and then submits a templated report.
+
+    The first turn calls the search, crawl, Google Maps, LinkedIn, Indeed, Similarweb and Trustpilot
+    tools in parallel; every later turn (including report retries) submits the report. Each turn
+    waits think_secs to stand in for model latency.
+
+    Args:
+        think_secs: Simulated duration of one model request.
+
+    Returns:
+        A FunctionModel to pass as the research agent's model.
+    """
+    async def respond(messages: List[ModelMessage], info: AgentInfo) -> ModelResponse:
+        await asyncio.sleep(think_secs)
+        company_name = next(
+            (part.content for message in messages if isinstance(message, ModelRequest)
+             for part in message.parts if isinstance(part, UserPromptPart) and isinstance(part.content, str)),
+            "Company",
+        )
+        slug = _slug(company_name)
+        tools = {tool.name for tool in info.function_tools}
+
+        if not any(isinstance(message, ModelResponse) for message in messages):
+            calls = [
+                ("tool_search_google", {"query": f"{company_name} company", "max_results": 5}),
+                ("tool_crawl_website", {"url": f"https://www.{slug}.com", "max_crawl_depth": 1, "max_crawl_pages": 5}),
+                ("tool_search_google_maps", {"query": company_name, "max_reviews": 10}),
+                ("tool_get_linkedin_company_profile", {"linkedin_company_url": f"https://www.linkedin.com/company/{slug}/"}),
+                ("tool_get_indeed_jobs", {"indeed_company_url": f"https://www.indeed.com/cmp/{slug}", "max_items_per_search": 10}),
+                ("tool_get_similarweb_results", {"website": f"{slug}.com"}),
+                ("tool_get_trustpilot_reviews", {"company_domain": f"{slug}.com", "max_reviews": 10}),
+            ]
+            return ModelResponse(parts=[ToolCallPart(name, args, f"call-{i}") for i, (name, args) in enumerate(calls) if name in tools])
+
+        urls = []
+        for message in messages:
+            if isinstance(message, ModelRequest):
+                for part in message.parts:
+                    if isinstance(part, ToolReturnPart):
+                        urls.extend(URL_IN_TEXT.findall(json.dumps(part.content, default=str)))
+        urls = list(dict.fromkeys(url.rstrip(".,;\\") for url in urls))
+        result = {
+            "name": company_name,
+            "description": f"{company_name} builds software for data automation.",
+            "industries": ["Software"],
+            "annual_revenue": 35_000_000,
+            "employees": 250,
+            "funding": "Series B, $40 million",
+            "key_personnel": [{"name": "Jane Doe", "role": "CEO"}],
+            "founded_year": 2015,
+            "website": f"https://www.{slug}.com",
+            "competitors": ["competitor0.com", "competitor1.com"],
+            "recent_news": [{"headline": f"{company_name} raises funding", "date": "2026-01-15", "link": f"https://news.example.org/{slug}/funding"}],
+            "job_openings": [{"title": "Software Engineer", "description": "Backend role", "link": "https://www.indeed.com/viewjob?jk=00000000"}],
+            "report": build_report(company_name, urls),
+        }
+        return ModelResponse(parts=[ToolCallPart(info.result_tools[0].name, result, "call-result")])
+
+    return FunctionModel(respond, model_name="scripted")
@@ -1,23 +1,14 @@
-from typing import Any, Dict, List, Union
-from datetime import datetime, timezone
+import asyncio
+from typing import Any, Dict
 from apify import Actor
-from pydantic_ai import Agent
-from pydantic_ai.models.gemini import GeminiModel
 from dotenv import load_dotenv
 
-from .models import ResponseModel
-from .utils import fetch_api_key
-from .validators import validate_company_report
-from .prompts import get_company_research_prompt
-from .tools import (
-    crawl_website,
-    search_google,
-    search_google_maps,
-    get_linkedin_company_profile,
-    get_indeed_jobs,
-    get_trustpilot_reviews,
-    get_similarweb_results
-)
+from .models import RetryPolicy, ChangeThresholds
+from .utils import fetch_api_key, SharedHttpPool, CircuitBreakerRegistry, BatchingApifyClient, ToolBudget, ToolCostModel, ActorProfiles
+from .research import research_company
+from .storage import PageContentStore, ColumnarExporter
+from .monitor import monitor_company
+from .standby import serve_standby, create_research_handler, StandbyScheduler
 
 load_dotenv()
 
@@ -29,334 +20,138 @@ async def main() -> None:
     if not apify_api_key:
         await Actor.exit()
 
-    input = await Actor.get_input()
-    company_name = input.get('company_name')
-    additional_context = input.get('additional_context')
-
-    current_date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-
+    input = await Actor.get_input() or {}
+    retry_policy = RetryPolicy(
+        max_retries=input.get('max_report_retries', 3),
+        max_tokens=input.get('max_retry_tokens', 0),
+        min_gain=input.get('min_retry_gain_percent', 2) / 100,
+    )
+
+    # One pooled transport for all Apify API and model requests of this process
+    http_pool = SharedHttpPool(
+        max_connections=input.get('http_max_connections', 100),
+        max_keepalive_connections=input.get('http_max_keepalive_connections', 20),
+        http2=input.get('http2', False),
+    )
     client = Actor.new_client(token=apify_api_key)
-
-    try:
-        model = GeminiModel('gemini-2.0-flash', provider='google-gla')
-
-        # Get system prompt from prompts module
-        system_prompt = get_company_research_prompt(company_name, additional_context, current_date)
-
-        agent = Agent(
-            model=model,
-            result_type=ResponseModel,
-            system_prompt=system_prompt
+    http_pool.attach_apify_client(client)
+
+    # Degraded scrapers are skipped instantly by every run of this process (and by runs started during the cooldown)
+    breakers = CircuitBreakerRegistry(
+        failure_threshold=input.get('breaker_failure_threshold', 3),
+        cooldown_seconds=input.get('breaker_cooldown_secs', 300),
+        wait_secs=input.get('actor_timeout_secs', 300),
+    )
+    await breakers.load()
+    client = breakers.guard(client)
+
+    # Tool call sizes are clamped to per-tool limits and each run's evidence budget, using cost curves learned from past runs
+    costs = ToolCostModel()
+    await costs.load()
+
+    # Memory and timeout of every scraper run follow its job size, using run times learned from past runs
+    profiles = ActorProfiles(
+        costs,
+        target_secs=input.get('actor_target_secs', 120),
+        max_wait_secs=input.get('actor_timeout_secs', 300),
+        memory_overrides=input.get('actor_memory_mbytes') or {},
+        wait_overrides=input.get('actor_wait_secs') or {},
+    )
+    client = profiles.wrap(client)
+
+    # Concurrent Google Maps and Similarweb calls share one actor run per batch window
+    batching_client = None
+    if input.get('batch_window_ms', 300) > 0:
+        client = batching_client = BatchingApifyClient(client, input.get('batch_window_ms', 300) / 1000, input.get('max_batch_size', 10))
+    # Separate client so the model provider's API key header stays off Apify requests
+    model_http_client = http_pool.client(timeout=600)
+
+    # Pages fetched by the crawler or the search browser are reused by both for page_cache_hours
+    pages = PageContentStore(input.get('page_cache_hours', 24) * 3600) if input.get('page_cache_hours', 24) > 0 else None
+
+    # Batch results are also buffered and written in bulk as columnar tables for analytics
+    exporter = None
+    if input.get('export_format', 'off') != 'off' and Actor.config.meta_origin != 'STANDBY':
+        exporter = ColumnarExporter(input['export_format'], input.get('export_part_size', 500))
+
+    async def research(company_name: str, additional_context: str = None, competitor_count: int = None) -> Dict[str, Any]:
+        if competitor_count is None:
+            competitor_count = input.get('competitor_count', 0)
+        data = await research_company(
+            client, company_name, additional_context, retry_policy, model_http_client, competitor_count,
+            breakers, input.get('source_failover', True), pages, input.get('plan_mode', False),
+            ToolBudget(costs, input.get('evidence_budget_secs', 900), int(input.get('evidence_budget_mb', 20) * 1e6)),
+            input.get('spill_threshold_kb', 40) * 1000,
         )
+        if exporter is not None:
+            await exporter.add(data)
+        Actor.log.info(f"HTTP pool: {http_pool.stats()}")
+        return data
 
-        # Register the result validator
-        agent.result_validator(validate_company_report)
-
-        # Register all the tools
-        @agent.tool_plain
-        async def tool_crawl_website(url: str, max_crawl_depth: int = 1, max_crawl_pages: int = 10) -> Dict[str, Union[List[Dict[str, str]], str]]:
-            """Crawl a website and return the content.
-
-            Args:
-                client: The Apify client for making API calls.
-                url: The URL of the website to crawl.
-                max_crawl_depth: Maximum depth of links to follow (0 = only start URLs).
-                max_crawl_pages: Maximum number of pages to crawl.
-
-            Returns:
-                A list of dictionaries containing url, title, and markdown content for each crawled page.
-            """
-            if not url:
-                return {"error": "URL is required"}
-
-            try:
-                results = await crawl_website(client, url, max_crawl_depth, max_crawl_pages)
-                
-                # Charge per result
-                if results:
-                    await Actor.charge(event_name='result-item', count=len(results))
-                
-                return {"results": results}
-            except Exception as e:
-                Actor.log.error(f"Error crawling website: {str(e)}")
-                return {"error": str(e)}
-
-        @agent.tool_plain
-        async def tool_search_google(query: str, max_results: int = 10) -> Dict[str, Union[List[Dict[str, str]], str]]:
-            """Get Google search results.
-
-            Args:
-                client: The Apify client for making API calls.
-                query: The search query. Can be:
-                    - Simple keywords: "san francisco weather"
-                    - Specific URL: "https://www.cnn.com"
-                    - Advanced operators: "function calling site:openai.com"
-                max_results: Maximum number of top organic search results to fetch (default: 10).
-                            If query is a URL, this parameter is ignored.
-
-            Returns:
-                A list of dictionaries containing url, title, and markdown content for each result.
-            """
-            if not query:
-                return {"error": "Query is required"}
-
-            try:
-                search_results = await search_google(client, query, max_results)
-                
-                # Charge per result
-                if search_results:
-                    await Actor.charge(event_name='result-item', count=len(search_results))
-                
-                return {"results": search_results}
-            except Exception as e:
-                Actor.log.error(f"Error searching Google: {str(e)}")
-                return {"error": str(e)}
-
-        @agent.tool_plain
-        async def tool_search_google_maps(query: str, max_reviews: int = 10) -> Dict[str, Union[List[Dict[str, str]], str]]:
-            """Get Google Maps search results focused on company information.
-
-            Args:
-                client: The Apify client for making API calls.
-                query: The search query for finding a company/business on Google Maps.
-                    Examples:
-                    - Company name: "Apify"
-                    - Company with location: "Microsoft Prague"
-                    - Office address: "1 Infinite Loop, Cupertino"
-                max_reviews: Maximum number of reviews to fetch per place (default: 10).
-
-            Returns:
-                A list of dictionaries containing essential company details:
-                - title: Company name
-                - description: Business description if available
-                - categoryName: Primary business category
-                - categories: List of all business categories
-                - address: Full address
-                - street: Street address
-                - city: City name
-                - postalCode: Postal/ZIP code
-                - countryCode: Two-letter country code
-                - website: Company website URL
-                - phone: Contact phone number
-                - location: Dict with lat/lng coordinates
-                - totalScore: Average rating (0-5)
-                - reviewsCount: Total number of reviews
-                - reviewsDistribution: Breakdown of ratings by star count
-                - reviews: List of relevant reviews containing:
-                    - text: Review content (if not null)
-                    - stars: Rating given (1-5)
-                    - publishAt: When review was posted
-                - additionalInfo: Additional business attributes and amenities
-            """
-            if not query:
-                return {"error": "Query is required"}
-
-            try:
-                search_results = await search_google_maps(client, query, max_reviews)
-                
-                # Charge per result
-                if search_results:
-                    await Actor.charge(event_name='result-item', count=len(search_results))
-                
-                return {"results": search_results}
-            except Exception as e:
-                Actor.log.error(f"Error searching Google Maps: {str(e)}")
-                return {"error": str(e)}
-
-        @agent.tool_plain
-        async def tool_get_linkedin_company_profile(linkedin_company_url: str) -> Dict[str, Union[Dict[str, str], str]]:
-            """Get LinkedIn company profile.
-
-            Args:
-                client: The Apify client for making API calls.
-                linkedin_company_url: The LinkedIn company URL. E.g. https://www.linkedin.com/company/apple/
-
-            Returns:
-                A dictionary containing company details:
-                - name: Company name
-                - description: Company description
-                - industry: Industry
-                - employees: Number of employees
-                - website: Company website
-                - specialties: List of specialties
-                - address: Company address details
-            """
-            if not linkedin_company_url:
-                return {"error": "LinkedIn company URL is required"}
-
-            try:
-                profile = await get_linkedin_company_profile(client, linkedin_company_url)
-                
-                # Charge for successful profile retrieval
-                if profile and not profile.get("error"):
-                    await Actor.charge(event_name='result-item', count=1)
-                    
-                return {"result": profile}
-            except Exception as e:
-                Actor.log.error(f"Error getting LinkedIn profile: {str(e)}")
-                return {"error": str(e)}
-
-        @agent.tool_plain
-        async def tool_get_indeed_jobs(indeed_company_url: str, max_items_per_search: int = 10) -> Dict[str, Union[List[Dict[str, str]], str]]:
-            """Get job listings from an Indeed.com company page URL.
-
-            Args:
-                client: The Apify client for making API calls.
-                indeed_company_url: The Indeed.com URL to fetch job listings from. Must be in format indeed.com/cmp/company-name. Do not use a search url.
-                max_items_per_search: Maximum number of job listings to fetch (default: 10)
-            
-            Returns:
-                A list of dictionaries containing job details such as position name, job type, location, etc.
-            """
-            if not indeed_company_url:
-                return {"error": "Indeed company URL is required"}
-
-            try:
-                job_listings = await get_indeed_jobs(client, indeed_company_url, max_items_per_search)
-                
-                # Charge per result
-                if job_listings:
-                    await Actor.charge(event_name='result-item', count=len(job_listings))
-                
-                return {"results": job_listings}
-            except Exception as e:
-                Actor.log.error(f"Error getting Indeed jobs: {str(e)}")
-                return {"error": str(e)}
-
-        @agent.tool_plain
-        async def tool_get_similarweb_results(website: str) -> Dict[str, Union[Dict[str, Any], str]]:
-            """Get analytics and company information from Similarweb for a website.
-
-            Args:
-                client: The Apify client for making API calls.
-                website: Website domain to analyze (e.g., "google.com")
-            
-            Returns:
-                Dictionary containing:
-                - name: Company name
-                - description: Company description
-                - globalRank: Global traffic rank
-                - categoryId: Industry category
-                - companyYearFounded: Year founded
-                - companyName: Legal name
-                - companyEmployeesMin/Max: Employee range
-                - companyAnnualRevenueMin: Minimum annual revenue
-                - companyHeadquarter details: Country code, state, city
-                - Traffic metrics: visits, duration, pages/visit, bounce rate
-                - Traffic sources and distribution
-                - Keywords and referrals
-                - Social network distribution
-                - Top countries by traffic
-                - Competitors and similar sites
-                - Demographics: age and gender distribution
-            """
-            if not website:
-                return {"error": "Website is required"}
-
-            try:
-                domain_stats = await get_similarweb_results(client, website)
-                
-                # Charge for successful stats retrieval
-                if domain_stats and not domain_stats.get("error"):
-                    await Actor.charge(event_name='result-item', count=1)
-                    
-                return {"result": domain_stats}
-            except Exception as e:
-                Actor.log.error(f"Error getting SimilarWeb stats: {str(e)}")
-                return {"error": str(e)}
-
-        @agent.tool_plain
-        async def tool_get_trustpilot_reviews(company_domain: str, max_reviews: int = 10) -> Dict[str, Union[List[Dict[str, str]], str]]:
-            """Get reviews from Trustpilot for a website.
-
-            Args:
-                client: The Apify client for making API calls.
-                company_domain: Domain name of the company (e.g., "apify.com")
-                max_reviews: Maximum number of reviews to return (default: 10)
-
-            Returns:
-                List of review objects with:
-                - reviewUrl: Unique review ID
-                - authorName: Name of reviewer
-                - datePublished: Review publish date
-                - reviewHeadline: Review title
-                - reviewBody: Full review text
-                - reviewLanguage: Language code
-                - ratingValue: Rating (1-5)
-                - verificationLevel: Verification status
-                - numberOfReviews: Number of reviews by author
-                - consumerCountryCode: Reviewer country
-                - experienceDate: Date of experience
-                - likes: Number of likes
-            """
-            if not company_domain:
-                return {"error": "Company domain is required"}
-
+    try:
+        if Actor.config.meta_origin == 'STANDBY':
+            # Identical requests share one job and recent results are reused; bursts beyond the queue get 429s
+            scheduler = StandbyScheduler(
+                input.get('max_concurrency', 3),
+                input.get('standby_queue_size', 20),
+                input.get('standby_cache_minutes', 10) * 60,
+            )
             try:
-                reviews = await get_trustpilot_reviews(client, company_domain, max_reviews)
-                
-                # Charge per result
-                if reviews:
-                    await Actor.charge(event_name='result-item', count=len(reviews))
-                
-                return {"results": reviews}
-            except Exception as e:
-                Actor.log.error(f"Error getting Trustpilot reviews: {str(e)}")
-                return {"error": str(e)}
-
-        result = await agent.run(company_name)
-        
-        # Save full result to dataset
-        await Actor.push_data(result.data.model_dump())
-        
-        # Save report as markdown file in KV store
-        default_kv_store = await Actor.open_key_value_store()
-        sanitized_company_name = company_name.lower().replace(' ', '_').replace('.', '_').replace(',', '').replace('&', 'and')
-        report_filename = f"{sanitized_company_name}_report.md"
-        
-        # Log the saving operation
-        Actor.log.info(f"Saving report as markdown file: {report_filename}")
-        
-        # Create basic report header
-        report_header = [
-            f"# {company_name} Business Report",
-            "",
-            f"*Generated on: {current_date}*",
-            "",
-            "---",
-            ""
-        ]
-        
-        try:
-            # Get the report content from the result
-            report_content = result.data.report if hasattr(result.data, 'report') else str(result.data)
-            
-            # Combine header and content
-            enhanced_report = "\n".join(report_header) + report_content
-            
-        except Exception as e:
-            Actor.log.error(f"Error processing report: {str(e)}")
-            # Fallback to raw data if report processing fails
-            enhanced_report = f"# {company_name} Business Report\n\n*Generated on: {current_date}*\n\n---\n\n{str(result.data)}"
-        
-        # Save the report content to KV store with explicit content type
-        await default_kv_store.set_value(
-            report_filename,
-            enhanced_report,
-            content_type="text/markdown"
-        )
-        
-        # Charge for token usage from the result
-        usage = result.usage()
-        if usage and usage.total_tokens > 0:
-            await Actor.charge(event_name='llm-tokens', count=usage.total_tokens)
-            Actor.log.info(f"Charged for {usage.total_tokens} tokens")
-    except Exception as e:
-        Actor.log.error(f"An error occurred: {str(e)}")
-        raise
+                await serve_standby(create_research_handler(research, scheduler, input.get('competitor_count', 0)), Actor.config.web_server_port)
+            finally:
+                Actor.log.info(f"Standby scheduler: {scheduler.stats()}")
+        elif input.get('watchlist'):
+            if input.get('company_name') or input.get('company_names'):
+                Actor.log.error("Set either watchlist (monitoring) or company_name/company_names (research), not both")
+                return
+
+            # Only regenerate reports of watchlist companies whose signals changed
+            thresholds = ChangeThresholds(**(input.get('change_thresholds') or {}))
+            semaphore = asyncio.Semaphore(max(input.get('max_concurrency', 3), 1))
+
+            async def monitor_bounded(entry) -> None:
+                async with semaphore:
+                    try:
+                        await monitor_company(client, entry, research, thresholds)
+                    except Exception as e:
+                        Actor.log.error(f"Monitoring of {entry} failed: {str(e)}")
+
+            await asyncio.gather(*(monitor_bounded(entry) for entry in input['watchlist']))
+        else:
+            company_names = [input.get('company_name')] + list(input.get('company_names') or [])
+            company_names = list(dict.fromkeys(name for name in company_names if name))
+            if not company_names:
+                Actor.log.error("Either company_name or company_names is required")
+                return
+
+            # Research the companies of a batch concurrently, sharing the connection pool
+            semaphore = asyncio.Semaphore(max(input.get('max_concurrency', 3), 1))
+
+            async def research_bounded(company_name: str) -> None:
+                async with semaphore:
+                    try:
+                        await research(company_name, input.get('additional_context'))
+                    except Exception as e:
+                        if len(company_names) == 1:
+                            raise
+                        Actor.log.error(f"Research of {company_name} failed: {str(e)}")
+
+            await asyncio.gather(*(research_bounded(name) for name in company_names))
     finally:
+        if exporter is not None:
+            await exporter.close()
+            Actor.log.info(f"Columnar export: {exporter.stats}")
+        Actor.log.info(f"HTTP pool: {http_pool.stats()}")
+        Actor.log.info(f"Circuit breakers: {breakers.stats()}")
+        Actor.log.info(f"Tool cost curves: {costs.stats()}")
+        Actor.log.info(f"Actor profiles: {profiles.stats()}")
+        if pages is not None:
+            Actor.log.info(f"Page store: {pages.stats}")
+        if batching_client is not None:
+            Actor.log.info(f"Actor call batching: {batching_client.stats}")
+        await model_http_client.aclose()
+        await http_pool.close()
         await Actor.exit()
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main())
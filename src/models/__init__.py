@@ -1,5 +1,5 @@
-from .base_models import NewsItem, KeyPerson, JobOpening, ReportSection, ReportMetrics
-from .response_model import ResponseModel
+from .base_models import NewsItem, KeyPerson, JobOpening, ReportSection, ReportMetrics, RetryPolicy, ChangeThresholds, PlanArgument, PlannedToolCall
+from .response_model import ResponseModel, analyze_report_structure
 
 __all__ = [
     'NewsItem',
@@ -7,5 +7,10 @@ __all__ = [
     'JobOpening',
     'ReportSection',
     'ReportMetrics',
-    'ResponseModel'
+    'RetryPolicy',
+    'ChangeThresholds',
+    'PlanArgument',
+    'PlannedToolCall',
+    'ResponseModel',
+    'analyze_report_structure'
 ] 
\ No newline at end of file
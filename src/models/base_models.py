@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 
 class NewsItem(BaseModel):
     headline: str = Field(description="The headline of the news article")
@@ -26,4 +26,28 @@ class ReportMetrics(BaseModel):
     shallow_sections: list[str] = Field(description="Sections with limited content", default_factory=list)
     missing_sections: list[str] = Field(description="Required sections missing from the report", default_factory=list)
     data_point_count: int = Field(description="Number of numeric data points found", default=0)
-    sources_count: int = Field(description="Number of sources cited", default=0) 
\ No newline at end of file
+    sources_count: int = Field(description="Number of sources cited", default=0)
+
+class RetryPolicy(BaseModel):
+    max_retries: int = Field(description="Maximum number of report retries requested from the model", default=3)
+    max_tokens: int = Field(description="Stop retrying once the run has used this many tokens (0 = no limit)", default=0)
+    min_gain: float = Field(description="Accept the report once a retry improves the quality score by less than this", default=0.02)
+
+class ChangeThresholds(BaseModel):
+    min_new_news: int = Field(description="Number of new news URLs that counts as a change", default=2)
+    jobs_change: float = Field(description="Relative change of the open job count that counts as a change", default=0.2)
+    rating_change: float = Field(description="Absolute change of the average Trustpilot rating that counts as a change", default=0.3)
+    visits_change: float = Field(description="Relative change of the Similarweb visits that counts as a change", default=0.25)
+    homepage: bool = Field(description="Whether a changed homepage counts as a change", default=True)
+
+class PlanArgument(BaseModel):
+    name: str = Field(description="Name of the tool argument")
+    value: Optional[str] = Field(description="Literal value of the argument (lists as comma-separated values)", default=None)
+    from_step: Optional[str] = Field(description="ID of an earlier step whose output provides the value", default=None)
+    match: Optional[str] = Field(description="Use the first URL in the earlier step's output containing this text, e.g. 'linkedin.com/company'", default=None)
+    field: Optional[str] = Field(description="Use the first value of this field in the earlier step's output, e.g. 'website'", default=None)
+
+class PlannedToolCall(BaseModel):
+    id: str = Field(description="Unique ID of the step, referenced by later steps")
+    tool: str = Field(description="Name of the tool without the tool_ prefix, e.g. 'search_google'")
+    arguments: List[PlanArgument] = Field(description="Arguments of the tool call", default_factory=list)
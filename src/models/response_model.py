@@ -1,9 +1,107 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime, timezone
 import re
 from .base_models import NewsItem, KeyPerson, JobOpening, ReportSection, ReportMetrics
 
+# Heading of the generated list of fetched but uncited sources, which does not count as citations
+ADDITIONAL_SOURCES_TITLE = "Additional sources consulted"
+
+def _without_additional_sources(v: str) -> str:
+    """Return the report without the generated list of sources it does not cite."""
+    match = re.search(rf'^(#+)\s+{re.escape(ADDITIONAL_SOURCES_TITLE)}\s*$', v, re.MULTILINE)
+    if not match:
+        return v
+    level = len(match.group(1))
+    for heading in re.finditer(r'^(#+)\s+.+$', v[match.end():], re.MULTILINE):
+        if len(heading.group(1)) <= level:
+            return v[:match.start()] + v[match.end() + heading.start():]
+    return v[:match.start()]
+
+def analyze_report_structure(v: str) -> Tuple[ReportMetrics, List[ReportSection]]:
+    """Parse a markdown report into sections and compute its quality metrics.
+
+    Sources listed under the generated "Additional sources consulted" heading were fetched but not
+    cited, so they are left out of sources_count.
+    """
+    # Extract report metrics
+    metrics = ReportMetrics(
+        total_length=len(v),
+        sections_count=0,
+        data_point_count=0,
+        sources_count=0
+    )
+    
+    # Parse sections with improved heading detection
+    sections = []
+    headings_pattern = re.compile(r'^(#+)\s+(.+)$', re.MULTILINE)
+    headings_matches = list(headings_pattern.finditer(v))
+    
+    # If no headings found, return early with warning
+    if not headings_matches:
+        metrics.sections_count = 0
+        metrics.missing_sections = ["No proper headings found in the report"]
+        return metrics, []
+        
+    # Build sections list with improved content analysis
+    metrics.sections_count = len(headings_matches)
+    
+    for i, match in enumerate(headings_matches):
+        level = len(match.group(1))
+        title = match.group(2)
+        start_pos = match.end()
+        
+        # Find end of this section (next heading of same or higher level, or end of text)
+        end_pos = len(v)
+        for j in range(i+1, len(headings_matches)):
+            next_level = len(headings_matches[j].group(1))
+            next_pos = headings_matches[j].start()
+            # Only consider it the end if it's a heading of the same or higher level
+            if next_level <= level:
+                end_pos = next_pos
+                break
+            
+        content = v[start_pos:end_pos].strip()
+        section = ReportSection(title=title, content=content, level=level)
+        sections.append(section)
+        
+        # Check for shallow sections with stricter requirements based on level
+        if level == 1 and len(content) < 800:
+            metrics.shallow_sections.append(title)
+        elif level == 2 and len(content) < 500:
+            metrics.shallow_sections.append(f"{title} (subsection)")
+    
+    # Count data points with more comprehensive patterns
+    data_points = re.findall(r'\d+%|\$\d+|\d+M|\d+B|\d+K|\d+ million|\d+ billion|\d+\.\d+|approx\w* \d+|\d{4}(?:-\d{2}){2}|\b\d{1,3}(?:,\d{3})+\b', v, re.IGNORECASE)
+    metrics.data_point_count = len(data_points)
+    
+    # Count sources with more comprehensive patterns
+    cited = _without_additional_sources(v)
+    sources = re.findall(r'\[.*?\]\(.*?\)', cited) + re.findall(r'Source:.*?[\.,]', cited, re.IGNORECASE) + re.findall(r'According to .*?[\.,]', cited, re.IGNORECASE) + re.findall(r'cited by .*?[\.,]', cited, re.IGNORECASE)
+    metrics.sources_count = len(sources)
+    
+    # Check for missing required sections with more comprehensive matching
+    required_sections = [
+        "executive summary", "company overview", "business model", "revenue streams",
+        "products", "services", "market analysis", "competitive landscape", 
+        "financial", "leadership", "organizational structure", "company culture", 
+        "technology", "innovation", "marketing", "sales strategy", 
+        "recent news", "developments", "industry trends", "future outlook",
+        "risk assessment", "sources", "citations"
+    ]
+    
+    found_sections = set()
+    for section in sections:
+        section_title_lower = section.title.lower()
+        for required in required_sections:
+            if required in section_title_lower or any(req_part in section_title_lower for req_part in required.split()):
+                found_sections.add(required)
+                break
+    
+    metrics.missing_sections = [s for s in required_sections if s not in found_sections]
+    
+    return metrics, sections
+
 class ResponseModel(BaseModel):
     name: str = Field(title="Company Name", description="The trade name of the company")
     description: str = Field(title="Description", description="A concise summary of the company (one to two sentences)")
@@ -116,86 +214,10 @@ class ResponseModel(BaseModel):
         if not v:
             return v
             
-        values = info.data
-            
-        # Extract report metrics
-        metrics = ReportMetrics(
-            total_length=len(v),
-            sections_count=0,
-            data_point_count=0,
-            sources_count=0
-        )
-        
-        # Parse sections with improved heading detection
-        sections = []
-        headings_pattern = re.compile(r'^(#+)\s+(.+)$', re.MULTILINE)
-        headings_matches = list(headings_pattern.finditer(v))
-        
-        # If no headings found, return early with warning
-        if not headings_matches:
-            metrics.sections_count = 0
-            metrics.missing_sections = ["No proper headings found in the report"]
-            values['report_metrics'] = metrics
-            values['report_sections'] = []
-            return v
-            
-        # Build sections list with improved content analysis
-        metrics.sections_count = len(headings_matches)
-        
-        for i, match in enumerate(headings_matches):
-            level = len(match.group(1))
-            title = match.group(2)
-            start_pos = match.end()
-            
-            # Find end of this section (next heading of same or higher level, or end of text)
-            end_pos = len(v)
-            for j in range(i+1, len(headings_matches)):
-                next_level = len(headings_matches[j].group(1))
-                next_pos = headings_matches[j].start()
-                # Only consider it the end if it's a heading of the same or higher level
-                if next_level <= level:
-                    end_pos = next_pos
-                    break
-                
-            content = v[start_pos:end_pos].strip()
-            section = ReportSection(title=title, content=content, level=level)
-            sections.append(section)
-            
-            # Check for shallow sections with stricter requirements based on level
-            if level == 1 and len(content) < 800:
-                metrics.shallow_sections.append(title)
-            elif level == 2 and len(content) < 500:
-                metrics.shallow_sections.append(f"{title} (subsection)")
-        
-        # Count data points with more comprehensive patterns
-        data_points = re.findall(r'\d+%|\$\d+|\d+M|\d+B|\d+K|\d+ million|\d+ billion|\d+\.\d+|approx\w* \d+|\d{4}(?:-\d{2}){2}|\b\d{1,3}(?:,\d{3})+\b', v, re.IGNORECASE)
-        metrics.data_point_count = len(data_points)
-        
-        # Count sources with more comprehensive patterns
-        sources = re.findall(r'\[.*?\]\(.*?\)', v) + re.findall(r'Source:.*?[\.,]', v, re.IGNORECASE) + re.findall(r'According to .*?[\.,]', v, re.IGNORECASE) + re.findall(r'cited by .*?[\.,]', v, re.IGNORECASE)
-        metrics.sources_count = len(sources)
-        
-        # Check for missing required sections with more comprehensive matching
-        required_sections = [
-            "executive summary", "company overview", "business model", "revenue streams",
-            "products", "services", "market analysis", "competitive landscape", 
-            "financial", "leadership", "organizational structure", "company culture", 
-            "technology", "innovation", "marketing", "sales strategy", 
-            "recent news", "developments", "industry trends", "future outlook",
-            "risk assessment", "sources", "citations"
-        ]
-        
-        found_sections = set()
-        for section in sections:
-            section_title_lower = section.title.lower()
-            for required in required_sections:
-                if required in section_title_lower or any(req_part in section_title_lower for req_part in required.split()):
-                    found_sections.add(required)
-                    break
-        
-        metrics.missing_sections = [s for s in required_sections if s not in found_sections]
-        
+        metrics, sections = analyze_report_structure(v)
+
         # Store metrics and sections in values
+        values = info.data
         values['report_metrics'] = metrics
         values['report_sections'] = sections
         
@@ -0,0 +1,76 @@
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+from apify import Actor
+
+from .models import ChangeThresholds
+from .analysis.change_detection import diff_signals
+from .storage import load_fingerprint, save_fingerprint, CHANGE_FEED_DATASET_NAME
+from .tools import collect_signals
+
+async def monitor_company(
+    client,
+    entry: Union[str, Dict[str, Any]],
+    research: Callable[[str, Optional[str]], Awaitable[Dict[str, Any]]],
+    thresholds: Optional[ChangeThresholds] = None,
+) -> Dict[str, Any]:
+    """Check a watchlist company for changes and only regenerate its report when its signals moved.
+
+    The first check of a company always generates a report, which becomes the baseline. Later checks
+    compare cheap signals (homepage, news, job count, Trustpilot rating, visits) with that baseline
+    and skip the model entirely when nothing crossed a threshold. Every check is appended to the
+    change feed dataset.
+
+    Args:
+        client: The Apify client for making API calls.
+        entry: A company name, or a dictionary with company_name and optionally website,
+            indeed_url and additional_context.
+        research: Coroutine that researches a company and returns its result.
+        thresholds: How much each signal has to move to regenerate the report.
+
+    Returns:
+        The change feed item.
+    """
+    entry = {"company_name": entry} if isinstance(entry, str) else entry
+    company_name = entry["company_name"]
+    fingerprint = await load_fingerprint(company_name)
+    website = entry.get("website") or (fingerprint or {}).get("website")
+    indeed_url = entry.get("indeed_url") or (fingerprint or {}).get("indeed_url")
+
+    signals = None
+    if website or fingerprint is not None:
+        signals = await collect_signals(client, company_name, website, indeed_url)
+        if signals["result_count"]:
+            await Actor.charge(event_name='result-item', count=signals["result_count"])
+
+    if fingerprint is None:
+        status, changes = "baseline", []
+    else:
+        changes = diff_signals(fingerprint["signals"], signals, thresholds)
+        status = "changed" if changes else "unchanged"
+    Actor.log.info(f"{company_name}: {status}" + (f" ({', '.join(c['signal'] for c in changes)})" if changes else ""))
+
+    report = None
+    if status != "unchanged":
+        report = await research(company_name, entry.get("additional_context"))
+        website = website or report.get("website")
+        indeed_url = indeed_url or report.get("indeed")
+        if signals is None:
+            # The website was only learned from the report
+            signals = await collect_signals(client, company_name, website, indeed_url)
+            if signals["result_count"]:
+                await Actor.charge(event_name='result-item', count=signals["result_count"])
+
+    stored = await save_fingerprint(company_name, signals, fingerprint, report, website, indeed_url)
+
+    item = {
+        "company": company_name,
+        "checked_at": datetime.now(timezone.utc).isoformat(),
+        "status": status,
+        "changes": changes,
+        "signals": {k: v for k, v in signals.items() if k != "result_count"},
+        "report_regenerated": report is not None,
+        "last_report_at": stored["last_report_at"],
+    }
+    feed = await Actor.open_dataset(name=CHANGE_FEED_DATASET_NAME)
+    await feed.push_data(item)
+    return item
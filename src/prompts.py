@@ -1,5 +1,16 @@
-def get_company_research_prompt(company_name: str, additional_context: str, current_date: str) -> str:
+def get_company_research_prompt(company_name: str, additional_context: str, current_date: str, competitor_count: int = 0, plan_mode: bool = False) -> str:
     additional_context_section = f"\nADDITIONAL CONTEXT: {additional_context}" if additional_context else ""
+    competitor_section = f"""
+    COMPETITOR BENCHMARK: Identify the company's {competitor_count} most important competitors and call the competitor
+    comparison tool once with their websites. Include its comparison table in the COMPETITIVE LANDSCAPE section and
+    discuss the differences it shows.
+    """ if competitor_count > 0 else ""
+    plan_section = """
+    RESEARCH PLAN: Start by calling the research plan tool ONCE with every tool call you need (usually 10-20 steps).
+    Chain dependent calls inside the plan, e.g. search for the company's LinkedIn page and feed the first
+    linkedin.com/company URL of that step into the LinkedIn tool. Only make individual tool calls afterwards
+    to fill gaps the plan left, then write the report.
+    """ if plan_mode else ""
     
     return f"""
     You are a professional business research analyst specializing in creating EXTREMELY COMPREHENSIVE and DETAILED company reports.
@@ -27,11 +38,13 @@ def get_company_research_prompt(company_name: str, additional_context: str, curr
         - RECENT NEWS & DEVELOPMENTS (key announcements, product launches, strategic moves)
         - INDUSTRY TRENDS & FUTURE OUTLOOK (where the company is heading, challenges and opportunities)
         - RISK ASSESSMENT (thorough analysis of business, operational, market and financial risks)
-        - SOURCES & CITATIONS (comprehensive list of all information sources)
+        - SOURCES & CITATIONS (generated automatically from the pages fetched by the research tools)
     
     3. DATA POINTS: Your analysis MUST include at least 30 specific quantitative data points (percentages, figures, statistics, dates).
     
     4. SOURCES: You MUST cite at least 15 distinct sources throughout your report, with proper attribution.
+       Cite sources inline as markdown links to URLs returned by the research tools (use the citation list tool to get them).
+       Do not invent URLs: links that no tool returned will be rejected.
     
     5. DEPTH: Each major section MUST contain multiple paragraphs with detailed analysis, not just surface-level information.
     
@@ -64,6 +77,7 @@ def get_company_research_prompt(company_name: str, additional_context: str, curr
 
     INSTRUCTIONS:
     You have access to these research tools, use them to gather comprehensive data before writing your report:
+        - Targeted crawling of a company website's key pages (About, Team, Pricing, Careers, Investors, Contact)
         - Web crawling to extract content from company websites
         - Google search to find relevant information
         - Google Maps to find company locations and reviews
@@ -71,6 +85,10 @@ def get_company_research_prompt(company_name: str, additional_context: str, curr
         - Indeed to find job listings
         - SimilarWeb to get website analytics
         - Trustpilot to get customer reviews
+        - A citation list of every source URL fetched so far (call it before writing the report)
+        - Known fields: phone, email, address and social profile URLs already extracted from the gathered data
+        - A competitor comparison that benchmarks traffic, employees, revenue and ratings (when enabled)
+        - A page reader for large crawl and search results, which come back as a manifest of page handles and previews
 
     You can make up to 8 concurrent tool calls to gather data efficiently.
     Each tool call must have unique parameters - do not repeat identical calls.
@@ -78,5 +96,5 @@ def get_company_research_prompt(company_name: str, additional_context: str, curr
     Make your tool calls as impactful as possible to gather the most relevant data.
     
     Before submitting, verify your report includes ALL required sections and meets or exceeds ALL length, data point, and citation requirements.
-    {additional_context_section}
+    {plan_section}{competitor_section}{additional_context_section}
     """ 
\ No newline at end of file
@@ -0,0 +1,9 @@
+from .golden_set import pin_golden_set, run_golden_case, run_golden_set, diff_golden_reports, DEFAULT_TOLERANCES
+
+__all__ = [
+    'pin_golden_set',
+    'run_golden_case',
+    'run_golden_set',
+    'diff_golden_reports',
+    'DEFAULT_TOLERANCES'
+]
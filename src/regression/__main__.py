@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+# Add the parent directory to the path for absolute imports
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from apify import Actor
+from dotenv import load_dotenv
+
+from src.models import RetryPolicy
+from src.loadtest import create_scripted_model
+from src.regression import diff_golden_reports, pin_golden_set, run_golden_set
+
+load_dotenv()
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Golden set regression suite: replay recorded evidence offline and track report quality against latency and tokens.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pin = commands.add_parser("pin", help="Pin companies to their newest evidence bundle")
+    pin.add_argument("companies", nargs="+", help="Company names with a recorded evidence bundle")
+    pin.add_argument("--cases", default="golden_set.json", help="Where to write the golden set")
+
+    run = commands.add_parser("run", help="Replay the golden set and diff it against the baseline")
+    run.add_argument("--cases", default="golden_set.json", help="Golden set file written by the pin command")
+    run.add_argument("--baseline", default="golden_baseline.json", help="Stored baseline report to diff against")
+    run.add_argument("--output", default="golden_report.json", help="Where to write the report of this run")
+    run.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    run.add_argument("--max-report-retries", type=int, default=3, help="Report retries allowed per company")
+    run.add_argument("--scripted", action="store_true", help="Use the scripted model instead of Gemini (checks the pipeline, not the model)")
+    run.add_argument("--label", default="", help="Name of the build under test")
+    return parser.parse_args()
+
+async def main() -> int:
+    args = parse_args()
+    async with Actor:
+        if args.command == "pin":
+            cases = await pin_golden_set(args.companies)
+            with open(args.cases, "w") as f:
+                json.dump(cases, f, indent=2)
+            print(f"Pinned {len(cases)} of {len(args.companies)} companies to {args.cases}")
+            return 0
+
+        with open(args.cases) as f:
+            cases = json.load(f)
+        report = await run_golden_set(
+            cases,
+            RetryPolicy(max_retries=args.max_report_retries),
+            create_scripted_model(think_secs=0) if args.scripted else None,
+            args.label,
+        )
+
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline) as f:
+            report["diff"] = diff_golden_reports(json.load(f), report)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+
+    print(f"{'company':<30} {'score':>6} {'length':>7} {'sections':>8} {'data':>5} {'sources':>7} {'secs':>7} {'tokens':>8} {'retries':>7}")
+    for case in report["cases"]:
+        if "error" in case:
+            print(f"{case['company']:<30} error: {case['error']}")
+            continue
+        metrics = case["report_metrics"]
+        print(f"{case['company']:<30} {case['quality_score']:>6.3f} {metrics['total_length']:>7} {metrics['sections_count']:>8} "
+              f"{metrics['data_point_count']:>5} {metrics['sources_count']:>7} {case['wall_seconds']:>7.1f} {case['total_tokens']:>8} {case['retries']:>7}")
+    print(f"Summary: {report['summary']}")
+
+    diff = report.get("diff")
+    if diff is None:
+        print(f"Report written to {args.output}" + (f", stored as baseline {args.baseline}" if args.update_baseline else ""))
+        return 0
+    for regression in diff["regressions"]:
+        print(f"REGRESSION {regression}")
+    print(f"{'Passed' if diff['passed'] else 'Failed'} against {args.baseline}; report written to {args.output}")
+    return 0 if diff["passed"] else 1
+
+sys.exit(asyncio.run(main()))
@@ -0,0 +1,157 @@
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from apify import Actor
+from pydantic_ai.models import Model
+
+from ..models import RetryPolicy, analyze_report_structure
+from ..research import research_company
+from ..storage import EvidenceRecorder, list_evidence_bundles, load_evidence_bundle
+from ..validators import report_quality_score
+
+# How much worse a case may get before the diff flags it as a regression
+DEFAULT_TOLERANCES = {
+    "quality_score": 0.02,
+    "wall_seconds": 0.25,
+    "total_tokens": 0.2,
+    "retries": 0,
+}
+
+async def pin_golden_set(companies: List[str]) -> List[Dict[str, str]]:
+    """Pin each company to its newest evidence bundle, so later runs replay exactly the same evidence.
+
+    Returns:
+        The golden set cases ({company, bundle_key, additional_context}) of the companies that have a bundle.
+    """
+    cases = []
+    for company in companies:
+        bundles = await list_evidence_bundles(company)
+        if not bundles:
+            Actor.log.warning(f"No evidence bundle recorded for {company}, leaving it out of the golden set")
+            continue
+        cases.append({
+            "company": company,
+            "bundle_key": bundles[0]["bundle_key"],
+            "additional_context": bundles[0].get("additional_context", ""),
+        })
+    return cases
+
+async def run_golden_case(case: Dict[str, str], retry_policy: Optional[RetryPolicy] = None, agent_model: Optional[Model] = None) -> Dict[str, Any]:
+    """Research one golden set company offline, answering every tool call from its recorded evidence.
+
+    Returns:
+        The case's report metrics and quality score, wall time, token counts, retries and tool calls,
+        or an error if the bundle is missing or the run failed.
+    """
+    result = {"company": case["company"], "bundle_key": case["bundle_key"]}
+    bundle = await load_evidence_bundle(case["bundle_key"])
+    if bundle is None:
+        return {**result, "error": f"Evidence bundle {case['bundle_key']} not found"}
+
+    replay = EvidenceRecorder()
+    for call in bundle["calls"]:
+        replay.record(call["tool"], call["arguments"], call["output"], call.get("purpose"), call.get("requested_arguments"))
+
+    run_info: Dict[str, Any] = {}
+    started = time.monotonic()
+    try:
+        data = await research_company(
+            None, case["company"], case.get("additional_context") or None, retry_policy,
+            agent_model=agent_model, replay=replay, run_info=run_info,
+        )
+    except Exception as e:
+        Actor.log.error(f"Golden set case {case['company']} failed: {str(e)}")
+        return {**result, "error": str(e), "wall_seconds": round(time.monotonic() - started, 2)}
+
+    metrics, _ = analyze_report_structure(data["report"])
+    return {
+        **result,
+        "wall_seconds": round(time.monotonic() - started, 2),
+        "requests": run_info.get("requests", 0),
+        "request_tokens": run_info.get("request_tokens", 0),
+        "response_tokens": run_info.get("response_tokens", 0),
+        "total_tokens": run_info.get("total_tokens", 0),
+        "retries": max(len(run_info.get("report_attempts", [])) - 1, 0),
+        "tool_calls": run_info.get("tool_calls", 0),
+        "recorded_calls": len(bundle["calls"]),
+        "quality_score": round(report_quality_score(metrics), 4),
+        "report_metrics": metrics.model_dump(),
+    }
+
+async def run_golden_set(
+    cases: List[Dict[str, str]],
+    retry_policy: Optional[RetryPolicy] = None,
+    agent_model: Optional[Model] = None,
+    label: str = "",
+) -> Dict[str, Any]:
+    """Run every golden set case one after another, so wall times are comparable between runs.
+
+    Returns:
+        A report with the label, the per-case results and their totals.
+    """
+    results = []
+    for case in cases:
+        Actor.log.info(f"Golden set: replaying {case['company']} ({case['bundle_key']})")
+        results.append(await run_golden_case(case, retry_policy, agent_model))
+
+    completed = [r for r in results if "error" not in r]
+    return {
+        "label": label,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "cases": results,
+        "summary": {
+            "cases": len(results),
+            "failed": len(results) - len(completed),
+            "mean_quality_score": round(sum(r["quality_score"] for r in completed) / len(completed), 4) if completed else 0.0,
+            "total_wall_seconds": round(sum(r["wall_seconds"] for r in completed), 2),
+            "total_tokens": sum(r["total_tokens"] for r in completed),
+            "total_retries": sum(r["retries"] for r in completed),
+        },
+    }
+
+def diff_golden_reports(baseline: Dict[str, Any], current: Dict[str, Any], tolerances: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """Diff a golden set run against a stored baseline, case by case.
+
+    Quality is compared by score and by sections that became missing or shallow; cost by wall
+    time, tokens and retries. Changes beyond the tolerances (relative for wall time and tokens,
+    absolute for score and retries) are flagged as regressions.
+
+    Returns:
+        The per-case changes, the regressions and whether the run passes.
+    """
+    tolerances = {**DEFAULT_TOLERANCES, **(tolerances or {})}
+    previous = {case["company"]: case for case in baseline.get("cases", []) if "error" not in case}
+    cases, regressions = [], []
+    for case in current.get("cases", []):
+        old = previous.get(case["company"])
+        if "error" in case:
+            regressions.append(f"{case['company']}: {case['error']}")
+            continue
+        if old is None:
+            continue
+
+        metrics, old_metrics = case["report_metrics"], old["report_metrics"]
+        entry = {
+            "company": case["company"],
+            "quality_score": round(case["quality_score"] - old["quality_score"], 4),
+            "wall_seconds": round(case["wall_seconds"] - old["wall_seconds"], 2),
+            "total_tokens": case["total_tokens"] - old["total_tokens"],
+            "retries": case["retries"] - old["retries"],
+            **{key: metrics[key] - old_metrics[key] for key in ("total_length", "sections_count", "data_point_count", "sources_count")},
+            "newly_missing_sections": sorted(set(metrics["missing_sections"]) - set(old_metrics["missing_sections"])),
+            "newly_shallow_sections": sorted(set(metrics["shallow_sections"]) - set(old_metrics["shallow_sections"])),
+        }
+        cases.append(entry)
+
+        if entry["quality_score"] < -tolerances["quality_score"]:
+            regressions.append(f"{case['company']}: quality score {old['quality_score']} -> {case['quality_score']}")
+        if entry["newly_missing_sections"]:
+            regressions.append(f"{case['company']}: sections now missing: {', '.join(entry['newly_missing_sections'])}")
+        for key in ("wall_seconds", "total_tokens"):
+            if old[key] and (case[key] - old[key]) / old[key] > tolerances[key]:
+                regressions.append(f"{case['company']}: {key} {old[key]} -> {case[key]}")
+        if entry["retries"] > tolerances["retries"]:
+            regressions.append(f"{case['company']}: retries {old['retries']} -> {case['retries']}")
+
+    return {"cases": cases, "regressions": regressions, "passed": not regressions}
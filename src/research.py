@@ -0,0 +1,788 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+from datetime import datetime, timezone
+from apify import Actor
+from httpx import AsyncClient
+from pydantic_ai import Agent
+from pydantic_ai.models import Model
+from pydantic_ai.providers.google_gla import GoogleGLAProvider
+
+from .models import ResponseModel, RetryPolicy, PlannedToolCall
+from .utils import CompactingModel, CachingGeminiModel, CircuitBreakerRegistry, SourceUnavailableError, ToolBudget, TOOL_LIMITS, execute_plan
+from .validators import create_report_validator
+from .prompts import get_company_research_prompt
+from .analysis import (
+    summarize_trustpilot_reviews,
+    summarize_google_maps_places,
+    analyze_jobs,
+    PageDeduplicator,
+    CitationIndex,
+    FieldExtractor,
+    domain_of,
+    pick_competitors,
+    build_competitor_profile,
+    compare_competitors
+)
+from .storage import EvidenceRecorder, RunCheckpoint, PageContentStore, SpillStore, checkpoint_key, pop_store_hits
+from .tools import (
+    crawl_website,
+    crawl_key_pages,
+    search_google,
+    search_google_maps,
+    get_linkedin_company_profile,
+    get_indeed_jobs,
+    get_trustpilot_reviews,
+    get_similarweb_results
+)
+
+# Apify actor behind each tool, used to skip tools whose circuit breaker is open
+TOOL_ACTORS = {
+    "crawl_website": "apify/website-content-crawler",
+    "crawl_key_pages": "apify/website-content-crawler",
+    "search_google": "apify/rag-web-browser",
+    "search_google_maps": "compass/crawler-google-places",
+    "get_linkedin_company_profile": "icypeas_official/linkedin-company-scraper",
+    "get_indeed_jobs": "misceres/indeed-scraper",
+    "get_trustpilot_reviews": "nikita-sviridenko/trustpilot-reviews-scraper",
+    "get_similarweb_results": "tri_angle/similarweb-scraper",
+}
+
+async def research_company(
+    client,
+    company_name: str,
+    additional_context: Optional[str] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    model_http_client: Optional[AsyncClient] = None,
+    competitor_count: int = 0,
+    breakers: Optional[CircuitBreakerRegistry] = None,
+    source_failover: bool = True,
+    pages: Optional[PageContentStore] = None,
+    plan_mode: bool = False,
+    budget: Optional[ToolBudget] = None,
+    spill_threshold: int = 40_000,
+    agent_model: Optional[Model] = None,
+    replay: Optional[EvidenceRecorder] = None,
+    run_info: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Research one company with the agent and store its dataset item, markdown report and evidence bundle.
+
+    Args:
+        client: The Apify client for making API calls.
+        company_name: The name of the company to research.
+        additional_context: Optional focus areas for the research.
+        retry_policy: Limits on report improvement retries.
+        model_http_client: Optional HTTP client (e.g. from the shared pool) for the model requests.
+        competitor_count: Number of competitors to benchmark with lightweight tool bundles (0 = off).
+        breakers: Circuit breakers of the Apify actors, shared with the other runs of the process.
+        source_failover: Whether to fall back to Google search when LinkedIn or Similarweb is unavailable.
+        pages: Page content store shared by the crawler and the search browser.
+        plan_mode: Whether the model submits its research as one plan that is executed locally.
+        budget: Evidence budget of this run; without one, tool arguments are only clamped to the tool limits.
+        spill_threshold: Page results with more markdown characters are returned as a manifest to read by handle (0 = never).
+        agent_model: Model to use instead of Gemini, e.g. a scripted model for load tests.
+        replay: Recorded evidence to answer tool calls from instead of calling the scrapers. Calls
+            that were not recorded fail, and no new evidence bundle is saved.
+        run_info: Optional dictionary that is filled with the run's token usage, report attempts and tool call count.
+
+    Returns:
+        The structured research result.
+    """
+    retry_policy = retry_policy or RetryPolicy()
+    budget = budget or ToolBudget()
+    current_date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    sanitized_company_name = company_name.lower().replace(' ', '_').replace('.', '_').replace(',', '').replace('&', 'and')
+
+    # Collapses near-duplicate pages across all crawl and search results of this run
+    deduplicator = PageDeduplicator()
+
+    # Keeps every tool input and output of this run so it can be stored as an evidence bundle
+    evidence = EvidenceRecorder()
+
+    # Every URL returned by a tool, used to build the report's sources section
+    citations = CitationIndex()
+
+    # Contact details and social profile URLs found in the tool outputs, with confidence and provenance
+    fields = FieldExtractor(company_name)
+
+    # Large page results stay out of the conversation until the model reads them by handle
+    spill = SpillStore(inline_limit=spill_threshold) if spill_threshold > 0 else None
+
+    # Completed tool calls and the message history survive migrations and restarts through the checkpoint
+    checkpoint = RunCheckpoint(evidence, key=checkpoint_key(company_name, additional_context, competitor_count))
+    resumed = await checkpoint.load()
+    checkpoint.register_events()
+
+    async def run_tool(tool_name: str, arguments: Dict[str, Any], fetch, purpose: Optional[str] = None, requested: Optional[Dict[str, Any]] = None) -> Tuple[Any, int]:
+        """Return the output of a tool call, reusing the result of an identical completed call.
+
+        The purpose (e.g. "competitor") is recorded with the evidence of calls that are not about the
+        company itself, and requested holds the arguments the model asked for before the budget clamped them.
+
+        Returns:
+            The tool output and the number of freshly fetched result items to charge: 0 when the
+            call was reused or replayed, and pages served from the page store are not counted.
+        """
+        output = evidence.lookup(tool_name, arguments)
+        if output is not None:
+            Actor.log.info(f"Reusing completed {tool_name} call for {arguments}")
+            budget.release(tool_name, arguments)
+            return output, 0
+        if replay is not None:
+            budget.release(tool_name, arguments)
+            output = replay.replay_lookup(tool_name, arguments, requested, TOOL_LIMITS.get(tool_name, {}))
+            if output is None:
+                raise RuntimeError(f"No recorded {tool_name} call for {arguments} in the replayed evidence")
+            evidence.record(tool_name, arguments, output, purpose, requested)
+            return output, 0
+        try:
+            budget.check()
+            if breakers is not None and tool_name in TOOL_ACTORS:
+                # Fails in milliseconds while the source is degraded
+                breakers.reject_if_open(TOOL_ACTORS[tool_name])
+            started = time.monotonic()
+            output = await fetch()
+        except Exception:
+            budget.release(tool_name, arguments)
+            raise
+        fetched, stored = pop_store_hits(output)
+        if stored and not fetched:
+            # Nothing was scraped: no cost to learn from and nothing to charge
+            budget.release(tool_name, arguments)
+        else:
+            # Pages partly served from the store would skew the cost curve, so only the spend is recorded
+            budget.record(tool_name, arguments, time.monotonic() - started, fetched, observe=not stored)
+        evidence.record(tool_name, arguments, output, purpose, requested)
+        return output, len(fetched) if isinstance(output, list) else int(bool(output))
+
+    async def page_results(results: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Deduplicate page results and spill them to the store if they are too large to return inline."""
+        filtered = await deduplicator.filter_pages(results)
+        if spill is None:
+            return {"results": filtered}
+        return await spill.spill(filtered)
+
+    async def failover_search(error: SourceUnavailableError, query: str) -> Dict[str, Any]:
+        """Answer a call to an unavailable source with Google search results, or with the error."""
+        if not source_failover:
+            return {"error": str(error)}
+        Actor.log.warning(f"{error.actor_id} is unavailable, falling back to Google search: {query}")
+        try:
+            results, fresh = await run_tool("search_google", {"query": query, "max_results": 3}, lambda: search_google(client, query, 3, pages))
+            if fresh and results:
+                await Actor.charge(event_name='result-item', count=fresh)
+        except Exception as e:
+            return {"error": f"{str(error)} Fallback search failed: {str(e)}"}
+        return {"result": {
+            "source_unavailable": str(error),
+            "fallback": f"Google search results for: {query}",
+            "results": await deduplicator.filter_pages(results),
+        }}
+
+    gemini_model = None
+
+    try:
+        if agent_model is None:
+            # Cache the system prompt, tools and frozen conversation prefix on the provider side.
+            # Explicit context caching needs the versioned model name.
+            # Model requests go through the shared connection pool when one is given
+            provider = GoogleGLAProvider(http_client=model_http_client) if model_http_client else 'google-gla'
+            gemini_model = CachingGeminiModel('gemini-2.0-flash-001', provider=provider)
+
+        # Replace bulky tool returns with digests on report retries so retries do not replay all evidence
+        model = CompactingModel(agent_model or gemini_model)
+
+        # Get system prompt from prompts module
+        system_prompt = get_company_research_prompt(company_name, additional_context, current_date, competitor_count, plan_mode)
+
+        agent = Agent(
+            model=model,
+            result_type=ResponseModel,
+            system_prompt=system_prompt,
+            # The validator decides when to stop retrying, so give pydantic-ai one spare retry
+            result_retries=retry_policy.max_retries + 1
+        )
+
+        # Register the result validator
+        report_validator = create_report_validator(citations, evidence, retry_policy, fields)
+        agent.result_validator(report_validator)
+
+        # Register all the tools
+        @agent.tool_plain
+        async def tool_crawl_website(url: str, max_crawl_depth: int = 1, max_crawl_pages: int = 10) -> Dict[str, Union[List[Dict[str, str]], str]]:
+            """Crawl a website and return the content.
+
+            Args:
+                client: The Apify client for making API calls.
+                url: The URL of the website to crawl.
+                max_crawl_depth: Maximum depth of links to follow (0 = only start URLs).
+                max_crawl_pages: Maximum number of pages to crawl.
+
+            Returns:
+                A list of dictionaries containing url, title, and markdown content for each crawled page.
+                Near-duplicates of pages already returned in this run only contain url, title and duplicate_of.
+            """
+            if not url:
+                return {"error": "URL is required"}
+
+            try:
+                requested = {"url": url, "max_crawl_depth": max_crawl_depth, "max_crawl_pages": max_crawl_pages}
+                arguments = budget.clamp("crawl_website", requested)
+                results, fresh = await run_tool("crawl_website", arguments, lambda: crawl_website(client, url, arguments["max_crawl_depth"], arguments["max_crawl_pages"], pages), requested=requested)
+                
+                # Charge per result
+                if fresh and results:
+                    await Actor.charge(event_name='result-item', count=fresh)
+                
+                return await page_results(results)
+            except Exception as e:
+                Actor.log.error(f"Error crawling website: {str(e)}")
+                return {"error": str(e)}
+
+        @agent.tool_plain
+        async def tool_crawl_key_pages(url: str, max_pages: int = 10) -> Dict[str, Union[List[Dict[str, str]], str]]:
+            """Crawl the most informative pages of a company website instead of following links blindly.
+
+            Discovers URLs from the sitemap and homepage links, ranks them by path keywords
+            (about, team, leadership, pricing, careers, investors, contact, press, products, ...)
+            and crawls only the top ranked pages. Prefer this over tool_crawl_website for company websites.
+
+            Args:
+                url: The URL of the company website.
+                max_pages: Maximum number of pages to crawl (default: 10).
+
+            Returns:
+                A list of dictionaries containing url, title, and markdown content for each crawled page.
+                Near-duplicates of pages already returned in this run only contain url, title and duplicate_of.
+            """
+            if not url:
+                return {"error": "URL is required"}
+
+            try:
+                requested = {"url": url, "max_pages": max_pages}
+                arguments = budget.clamp("crawl_key_pages", requested)
+                results, fresh = await run_tool("crawl_key_pages", arguments, lambda: crawl_key_pages(client, url, arguments["max_pages"], pages), requested=requested)
+
+                # Charge per result
+                if fresh and results:
+                    await Actor.charge(event_name='result-item', count=fresh)
+
+                return await page_results(results)
+            except Exception as e:
+                Actor.log.error(f"Error crawling key pages: {str(e)}")
+                return {"error": str(e)}
+
+        @agent.tool_plain
+        async def tool_search_google(query: str, max_results: int = 10) -> Dict[str, Union[List[Dict[str, str]], str]]:
+            """Get Google search results.
+
+            Args:
+                client: The Apify client for making API calls.
+                query: The search query. Can be:
+                    - Simple keywords: "san francisco weather"
+                    - Specific URL: "https://www.cnn.com"
+                    - Advanced operators: "function calling site:openai.com"
+                max_results: Maximum number of top organic search results to fetch (default: 10).
+                            If query is a URL, this parameter is ignored.
+
+            Returns:
+                A list of dictionaries containing url, title, and markdown content for each result.
+                Near-duplicates of pages already returned in this run only contain url, title and duplicate_of.
+            """
+            if not query:
+                return {"error": "Query is required"}
+
+            try:
+                requested = {"query": query, "max_results": max_results}
+                arguments = budget.clamp("search_google", requested)
+                search_results, fresh = await run_tool("search_google", arguments, lambda: search_google(client, query, arguments["max_results"], pages), requested=requested)
+                
+                # Charge per result
+                if fresh and search_results:
+                    await Actor.charge(event_name='result-item', count=fresh)
+                
+                return await page_results(search_results)
+            except Exception as e:
+                Actor.log.error(f"Error searching Google: {str(e)}")
+                return {"error": str(e)}
+
+        @agent.tool_plain
+        async def tool_search_google_maps(query: str, max_reviews: int = 10) -> Dict[str, Union[List[Dict[str, str]], str]]:
+            """Get Google Maps search results focused on company information.
+
+            Args:
+                client: The Apify client for making API calls.
+                query: The search query for finding a company/business on Google Maps.
+                    Examples:
+                    - Company name: "Apify"
+                    - Company with location: "Microsoft Prague"
+                    - Office address: "1 Infinite Loop, Cupertino"
+                max_reviews: Maximum number of reviews to fetch per place (default: 10).
+
+            Returns:
+                A list of dictionaries containing essential company details:
+                - title: Company name
+                - description: Business description if available
+                - categoryName: Primary business category
+                - categories: List of all business categories
+                - address: Full address
+                - street: Street address
+                - city: City name
+                - postalCode: Postal/ZIP code
+                - countryCode: Two-letter country code
+                - website: Company website URL
+                - phone: Contact phone number
+                - location: Dict with lat/lng coordinates
+                - totalScore: Average rating (0-5)
+                - reviewsCount: Total number of reviews
+                - reviewsDistribution: Breakdown of ratings by star count
+                - reviewsSummary: Statistics computed over the fetched reviews:
+                    - average_rating, rating_histogram, rating_shares
+                    - monthly_trend: Review count and average rating per month
+                    - verified_share: Share of reviews written by local guides
+                    - top_phrases: Recurring phrases and the number of reviews mentioning them
+                    - representative_quotes: A few positive, negative and mixed review excerpts
+                - additionalInfo: Additional business attributes and amenities
+            """
+            if not query:
+                return {"error": "Query is required"}
+
+            try:
+                requested = {"query": query, "max_reviews": max_reviews}
+                arguments = budget.clamp("search_google_maps", requested)
+                search_results, fresh = await run_tool("search_google_maps", arguments, lambda: search_google_maps(client, query, arguments["max_reviews"]), requested=requested)
+                
+                # Charge per result
+                if fresh and search_results:
+                    await Actor.charge(event_name='result-item', count=len(search_results))
+                
+                # Aggregate reviews locally instead of handing every raw review to the model
+                return {"results": summarize_google_maps_places(search_results)}
+            except Exception as e:
+                Actor.log.error(f"Error searching Google Maps: {str(e)}")
+                return {"error": str(e)}
+
+        @agent.tool_plain
+        async def tool_get_linkedin_company_profile(linkedin_company_url: str) -> Dict[str, Union[Dict[str, str], str]]:
+            """Get LinkedIn company profile.
+
+            Args:
+                client: The Apify client for making API calls.
+                linkedin_company_url: The LinkedIn company URL. E.g. https://www.linkedin.com/company/apple/
+
+            Returns:
+                A dictionary containing company details:
+                - name: Company name
+                - description: Company description
+                - industry: Industry
+                - employees: Number of employees
+                - website: Company website
+                - specialties: List of specialties
+                - address: Company address details
+            """
+            if not linkedin_company_url:
+                return {"error": "LinkedIn company URL is required"}
+
+            try:
+                profile, fresh = await run_tool("get_linkedin_company_profile", {"linkedin_company_url": linkedin_company_url}, lambda: get_linkedin_company_profile(client, linkedin_company_url))
+                
+                # Charge for successful profile retrieval
+                if fresh and profile and not profile.get("error"):
+                    await Actor.charge(event_name='result-item', count=1)
+                    
+                return {"result": profile}
+            except SourceUnavailableError as e:
+                return await failover_search(e, f"site:linkedin.com/company {linkedin_company_url.rstrip('/').split('/')[-1]}")
+            except Exception as e:
+                Actor.log.error(f"Error getting LinkedIn profile: {str(e)}")
+                return {"error": str(e)}
+
+        @agent.tool_plain
+        async def tool_get_indeed_jobs(indeed_company_url: str, max_items_per_search: int = 10) -> Dict[str, Union[Dict[str, Any], str]]:
+            """Get job listings from an Indeed.com company page URL.
+
+            Args:
+                client: The Apify client for making API calls.
+                indeed_company_url: The Indeed.com URL to fetch job listings from. Must be in format indeed.com/cmp/company-name. Do not use a search url.
+                max_items_per_search: Maximum number of job listings to fetch (default: 10)
+            
+            Returns:
+                Hiring statistics computed over the fetched listings:
+                - total_openings: Number of listings analyzed
+                - by_function / by_seniority / by_location / by_arrangement / by_job_type: Opening counts
+                - salary: Currency and annualized min, max and median salary midpoint
+                - recency: Openings posted in the last 7 and 30 days and the median posting age
+                - listings: Title, function, seniority, location, job types, parsed salary,
+                  days since posting, URL and a truncated description for each listing
+            """
+            if not indeed_company_url:
+                return {"error": "Indeed company URL is required"}
+
+            try:
+                requested = {"indeed_company_url": indeed_company_url, "max_items_per_search": max_items_per_search}
+                arguments = budget.clamp("get_indeed_jobs", requested)
+                job_listings, fresh = await run_tool("get_indeed_jobs", arguments, lambda: get_indeed_jobs(client, indeed_company_url, arguments["max_items_per_search"]), requested=requested)
+                
+                # Charge per result
+                if fresh and job_listings:
+                    await Actor.charge(event_name='result-item', count=len(job_listings))
+                
+                # Aggregate listings locally instead of handing every full description to the model
+                return {"result": analyze_jobs(job_listings)}
+            except Exception as e:
+                Actor.log.error(f"Error getting Indeed jobs: {str(e)}")
+                return {"error": str(e)}
+
+        @agent.tool_plain
+        async def tool_get_similarweb_results(website: str) -> Dict[str, Union[Dict[str, Any], str]]:
+            """Get analytics and company information from Similarweb for a website.
+
+            Args:
+                client: The Apify client for making API calls.
+                website: Website domain to analyze (e.g., "google.com")
+            
+            Returns:
+                Dictionary containing:
+                - name: Company name
+                - description: Company description
+                - globalRank: Global traffic rank
+                - categoryId: Industry category
+                - companyYearFounded: Year founded
+                - companyName: Legal name
+                - companyEmployeesMin/Max: Employee range
+                - companyAnnualRevenueMin: Minimum annual revenue
+                - companyHeadquarter details: Country code, state, city
+                - Traffic metrics: visits, duration, pages/visit, bounce rate
+                - Traffic sources and distribution
+                - Keywords and referrals
+                - Social network distribution
+                - Top countries by traffic
+                - Competitors and similar sites
+                - Demographics: age and gender distribution
+            """
+            if not website:
+                return {"error": "Website is required"}
+
+            try:
+                domain_stats, fresh = await run_tool("get_similarweb_results", {"website": website}, lambda: get_similarweb_results(client, website))
+                
+                # Charge for successful stats retrieval
+                if fresh and domain_stats and not domain_stats.get("error"):
+                    await Actor.charge(event_name='result-item', count=1)
+                    
+                return {"result": domain_stats}
+            except SourceUnavailableError as e:
+                return await failover_search(e, f"{website} website traffic monthly visits")
+            except Exception as e:
+                Actor.log.error(f"Error getting SimilarWeb stats: {str(e)}")
+                return {"error": str(e)}
+
+        @agent.tool_plain
+        async def tool_get_trustpilot_reviews(company_domain: str, max_reviews: int = 10) -> Dict[str, Union[Dict[str, Any], str]]:
+            """Get reviews from Trustpilot for a website.
+
+            Args:
+                client: The Apify client for making API calls.
+                company_domain: Domain name of the company (e.g., "apify.com")
+                max_reviews: Maximum number of reviews to return (default: 10)
+
+            Returns:
+                Statistics computed over the fetched reviews:
+                - review_count: Number of reviews analyzed
+                - average_rating: Mean rating (1-5)
+                - rating_histogram / rating_shares: Review count and share per star rating
+                - monthly_trend: Review count and average rating per month
+                - date_range: Oldest and newest review date
+                - verified_share: Share of verified reviews
+                - country_mix: Review count per reviewer country
+                - top_phrases: Recurring phrases and the number of reviews mentioning them
+                - representative_quotes: A few positive, negative and mixed review excerpts with links
+            """
+            if not company_domain:
+                return {"error": "Company domain is required"}
+
+            try:
+                requested = {"company_domain": company_domain, "max_reviews": max_reviews}
+                arguments = budget.clamp("get_trustpilot_reviews", requested)
+                reviews, fresh = await run_tool("get_trustpilot_reviews", arguments, lambda: get_trustpilot_reviews(client, company_domain, arguments["max_reviews"]), requested=requested)
+                
+                # Charge per result
+                if fresh and reviews:
+                    await Actor.charge(event_name='result-item', count=len(reviews))
+                
+                # Aggregate reviews locally instead of handing every raw review to the model
+                return {"result": summarize_trustpilot_reviews(reviews)}
+            except Exception as e:
+                Actor.log.error(f"Error getting Trustpilot reviews: {str(e)}")
+                return {"error": str(e)}
+
+        async def fetch_charged(tool_name: str, arguments: Dict[str, Any], fetch, purpose: Optional[str] = None) -> Any:
+            """Run a tool call of a competitor bundle, charging fresh results and treating failures as empty."""
+            try:
+                output, fresh = await run_tool(tool_name, arguments, fetch, purpose)
+            except Exception as e:
+                Actor.log.error(f"Error in {tool_name} for {arguments}: {str(e)}")
+                return {}
+            count = len(output) if isinstance(output, list) else int(bool(output) and not output.get("error"))
+            if fresh and count:
+                await Actor.charge(event_name='result-item', count=count)
+            return output
+
+        async def fetch_competitor_bundle(domain: str, purpose: Optional[str] = "competitor") -> Dict[str, Any]:
+            """Fetch the Similarweb, LinkedIn and Google Maps results of one company and profile it.
+
+            Calls about a competitor are recorded with their purpose, so its contact details never
+            end up in the researched company's fields.
+            """
+            similarweb = await fetch_charged("get_similarweb_results", {"website": domain}, lambda: get_similarweb_results(client, domain), purpose)
+            name = similarweb.get("companyName") or similarweb.get("name") or domain
+            # LinkedIn company pages usually use the domain name as their slug; a miss just leaves the fields empty
+            linkedin_url = f"https://www.linkedin.com/company/{domain.split('.')[0]}/"
+            linkedin, places = await asyncio.gather(
+                fetch_charged("get_linkedin_company_profile", {"linkedin_company_url": linkedin_url}, lambda: get_linkedin_company_profile(client, linkedin_url), purpose),
+                fetch_charged("search_google_maps", {"query": name, "max_reviews": 0}, lambda: search_google_maps(client, name, 0), purpose),
+            )
+            return build_competitor_profile(domain, similarweb, linkedin, places or [])
+
+        if competitor_count > 0:
+            @agent.tool_plain
+            async def tool_compare_competitors(company_website: str, competitor_websites: Optional[List[str]] = None) -> Dict[str, Any]:
+                """Benchmark the company against its top competitors in one call.
+
+                Fetches Similarweb, LinkedIn and Google Maps data for the company and each competitor
+                concurrently and compares traffic, employees, revenue and ratings locally.
+
+                Args:
+                    company_website: Website of the researched company (e.g., "apify.com").
+                    competitor_websites: Websites of the competitors to compare. Leave empty to use
+                        the most similar sites according to Similarweb.
+
+                Returns:
+                    - profiles: Comparable metrics per company (visits, traffic share, global rank, employees,
+                      minimum revenue, founding year, headquarters, Google Maps rating) and ratios to the company
+                    - leaders: The company leading on visits, employees and rating
+                    - table_markdown: A ready-made comparison table to include in the Competitive Landscape section
+                """
+                target_domain = domain_of(company_website)
+                if not target_domain:
+                    return {"error": "Company website is required"}
+
+                try:
+                    domains = [domain_of(w) for w in competitor_websites or []]
+                    if not any(domains):
+                        target_similarweb = await fetch_charged("get_similarweb_results", {"website": target_domain}, lambda: get_similarweb_results(client, target_domain))
+                        domains = pick_competitors(target_similarweb, competitor_count)
+                    domains = [d for d in dict.fromkeys(domains) if d and d != target_domain][:competitor_count]
+                    if not domains:
+                        return {"error": "No competitors given and none found on Similarweb"}
+
+                    Actor.log.info(f"Comparing {target_domain} with {', '.join(domains)}")
+                    profiles = await asyncio.gather(fetch_competitor_bundle(target_domain, None), *(fetch_competitor_bundle(d) for d in domains))
+                    return compare_competitors(profiles[0], list(profiles[1:]))
+                except Exception as e:
+                    Actor.log.error(f"Error comparing competitors: {str(e)}")
+                    return {"error": str(e)}
+
+        @agent.tool_plain
+        async def tool_get_known_fields() -> Dict[str, Any]:
+            """Get the phone, email, address and social profile URLs found in all data gathered so far.
+
+            The values are extracted locally from crawled pages, search results, Google Maps and LinkedIn.
+            Use them for the structured fields instead of searching for them; values with a confidence of
+            0.6 or more are filled in automatically if you leave the field empty.
+
+            Returns:
+                For each field found: value, confidence (0-1), sources (where it was seen) and alternatives.
+            """
+            fields.update_from_evidence(evidence)
+            return {"result": fields.facts(min_confidence=0.3)}
+
+        @agent.tool_plain
+        async def tool_list_citations() -> Dict[str, Union[List[Dict[str, str]], str]]:
+            """List every source URL returned by the research tools so far.
+
+            Call this before writing the report and cite these URLs inline with markdown links.
+            The Sources & Citations section is generated automatically from this list.
+
+            Returns:
+                A list of dictionaries containing url, title and source (the tool that returned it).
+            """
+            citations.update_from_evidence(evidence)
+            return {"results": citations.as_list()}
+
+        if spill is not None:
+            @agent.tool_plain
+            async def tool_read_page(handle: str, offset: int = 0, max_chars: int = 20000) -> Dict[str, Any]:
+                """Read a page of a large crawl or search result that was returned as a manifest.
+
+                Args:
+                    handle: The page handle from the manifest (e.g. "p3fa92c07d1be").
+                    offset: Character offset to start reading at (default: 0).
+                    max_chars: Maximum number of characters to return (default: 20000).
+
+                Returns:
+                    url, title, the markdown of the requested range, offset, size (total characters) and
+                    next_offset (where to continue reading, or null at the end of the page).
+                """
+                return await spill.read(handle, offset, max_chars)
+
+        @agent.tool_plain
+        async def tool_recall_tool_result(tool_call_id: str) -> Dict[str, Any]:
+            """Get the full content of an earlier tool result that was compacted into a digest.
+
+            Args:
+                tool_call_id: The tool call ID mentioned in the digest note.
+
+            Returns:
+                The original tool result.
+            """
+            original = model.recall(tool_call_id)
+            if original is None:
+                return {"error": f"No compacted tool result with ID {tool_call_id}"}
+            return original
+
+        if plan_mode:
+            plan_tools = {
+                "crawl_website": tool_crawl_website,
+                "crawl_key_pages": tool_crawl_key_pages,
+                "search_google": tool_search_google,
+                "search_google_maps": tool_search_google_maps,
+                "get_linkedin_company_profile": tool_get_linkedin_company_profile,
+                "get_indeed_jobs": tool_get_indeed_jobs,
+                "get_similarweb_results": tool_get_similarweb_results,
+                "get_trustpilot_reviews": tool_get_trustpilot_reviews,
+            }
+            if competitor_count > 0:
+                plan_tools["compare_competitors"] = tool_compare_competitors
+
+            @agent.tool_plain
+            async def tool_execute_research_plan(steps: List[PlannedToolCall]) -> Dict[str, Any]:
+                """Run a whole research plan in one call, with as many tool calls in parallel as possible.
+
+                Each step names a tool (without the tool_ prefix) and its arguments. An argument can take
+                its value from the output of an earlier step: set from_step to that step's ID and either
+                match (use the first URL containing this text, e.g. "linkedin.com/company" or "indeed.com/cmp")
+                or field (use the first value of this field, e.g. "website"). Steps start as soon as the
+                steps they depend on are done.
+
+                Args:
+                    steps: The planned tool calls, in order. Steps can only depend on earlier steps.
+
+                Returns:
+                    The output of every step (or why it failed or was skipped), the total time taken and
+                    the highest number of tool calls that ran in parallel.
+                """
+                if not steps:
+                    return {"error": "The plan has no steps"}
+                return await execute_plan(steps, plan_tools)
+
+        if resumed and checkpoint.messages:
+            prompt = f"Continue researching {company_name} from where you left off, then submit the final result."
+            message_history = checkpoint.messages
+        else:
+            prompt, message_history = company_name, None
+
+        async with agent.iter(prompt, message_history=message_history) as agent_run:
+            async for node in agent_run:
+                # Checkpoint the conversation right before each model request
+                if Agent.is_model_request_node(node):
+                    await checkpoint.save(agent_run.ctx.state.message_history + [node.request])
+        result = agent_run.result
+        await checkpoint.clear()
+        Actor.log.info(f"Collapsed {deduplicator.duplicates_removed} near-duplicate pages")
+        Actor.log.info(f"History compaction saved ~{sum(s['tokens_saved'] for s in model.savings)} input tokens over {len(model.savings)} turns")
+        if gemini_model is not None:
+            Actor.log.info(f"Context cache usage: {gemini_model.cache_stats}")
+        Actor.log.info(f"Evidence budget: {budget.stats()}")
+        accepted = next((a for a in report_validator.attempts if a.get("accepted")), report_validator.attempts[-1] if report_validator.attempts else {})
+        Actor.log.info(f"Report accepted after {len(report_validator.attempts) - 1} retries: {accepted}")
+        
+        # Save full result to dataset
+        await Actor.push_data({**result.data.model_dump(), "field_provenance": fields.provenance(result.data.model_dump())})
+        
+        # Save report as markdown file in KV store
+        default_kv_store = await Actor.open_key_value_store()
+        report_filename = f"{sanitized_company_name}_report.md"
+        
+        # Log the saving operation
+        Actor.log.info(f"Saving report as markdown file: {report_filename}")
+        
+        # Create basic report header
+        report_header = [
+            f"# {company_name} Business Report",
+            "",
+            f"*Generated on: {current_date}*",
+            "",
+            "---",
+            ""
+        ]
+        
+        try:
+            # Get the report content from the result
+            report_content = result.data.report if hasattr(result.data, 'report') else str(result.data)
+            
+            # Combine header and content
+            enhanced_report = "\n".join(report_header) + report_content
+            
+        except Exception as e:
+            Actor.log.error(f"Error processing report: {str(e)}")
+            # Fallback to raw data if report processing fails
+            enhanced_report = f"# {company_name} Business Report\n\n*Generated on: {current_date}*\n\n---\n\n{str(result.data)}"
+        
+        # Save the report content to KV store with explicit content type
+        await default_kv_store.set_value(
+            report_filename,
+            enhanced_report,
+            content_type="text/markdown"
+        )
+        
+        # Charge for token usage from the result
+        usage = result.usage()
+        if usage and usage.total_tokens > 0:
+            await Actor.charge(event_name='llm-tokens', count=usage.total_tokens)
+            Actor.log.info(f"Charged for {usage.total_tokens} tokens")
+
+        if run_info is not None:
+            run_info.update({
+                "requests": usage.requests if usage else 0,
+                "request_tokens": (usage.request_tokens or 0) if usage else 0,
+                "response_tokens": (usage.response_tokens or 0) if usage else 0,
+                "total_tokens": (usage.total_tokens or 0) if usage else 0,
+                "report_attempts": list(report_validator.attempts),
+                "tool_calls": len(evidence.calls),
+            })
+
+        return result.data.model_dump()
+    except Exception as e:
+        Actor.log.error(f"An error occurred: {str(e)}")
+        # A failed conversation must not be resumed by the next request for the same company.
+        # Migrations and aborts don't end up here, so their checkpoint is kept for the restart.
+        try:
+            await checkpoint.clear()
+        except Exception as clear_error:
+            Actor.log.error(f"Error clearing checkpoint: {str(clear_error)}")
+        raise
+    finally:
+        checkpoint.unregister_events()
+
+        if gemini_model is not None:
+            await gemini_model.clear_caches()
+
+        if spill is not None:
+            Actor.log.info(f"Spilled page results: {spill.stats}")
+            await spill.clear()
+
+        # Later runs size their tool calls with the costs measured in this one
+        await budget.costs.save()
+
+        # Persist the gathered evidence even if the run failed, so it can be reused without re-scraping
+        if evidence.calls and replay is None:
+            try:
+                bundle_key = f"bundle-{sanitized_company_name}-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}"
+                await evidence.save(bundle_key, {
+                    "company": company_name,
+                    "additional_context": additional_context or "",
+                    "date": current_date,
+                })
+            except Exception as e:
+                Actor.log.error(f"Error saving evidence bundle: {str(e)}")
@@ -0,0 +1,308 @@
+import asyncio
+import heapq
+import itertools
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from apify import Actor
+
+# Header Apify sends with the readiness probes of standby containers
+READINESS_PROBE_HEADER = "x-apify-container-server-readiness-probe"
+
+# Largest request body accepted by the standby server
+MAX_BODY_BYTES = 1_000_000
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 429: "Too Many Requests", 500: "Internal Server Error"}
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Tuple[int, Dict[str, Any], Dict[str, str]]]]
+
+Research = Callable[[str, Optional[str], Optional[int]], Awaitable[Dict[str, Any]]]
+
+# Priority levels a request can ask for, and the share of the queue each may fill
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+QUEUE_SHARE = {"high": 1.0, "normal": 0.75, "low": 0.5}
+
+# Most competitors a request may benchmark, the maximum of competitor_count in the input schema
+MAX_COMPETITOR_COUNT = 10
+
+async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str], bytes]:
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    method, target, _ = request_line.split(" ", 2)
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0) or 0)
+    if length > MAX_BODY_BYTES:
+        raise OverflowError(f"Request body of {length} bytes is too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+def _write_response(writer: asyncio.StreamWriter, status: int, payload: Any, headers: Dict[str, str] = None) -> None:
+    body = payload if isinstance(payload, bytes) else json.dumps(payload, default=str).encode("utf-8")
+    lines = [
+        f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+        "Content-Type: application/json" if not isinstance(payload, bytes) else "Content-Type: text/plain",
+        f"Content-Length: {len(body)}",
+        "Connection: close",
+    ]
+    lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+
+async def serve_standby(handler: Handler, port: int, host: str = "0.0.0.0") -> None:
+    """Serve research requests over HTTP until the Actor is stopped.
+
+    GET requests take their parameters from the query string, POST requests from a JSON body.
+    The handler receives the parameters and returns a status code, a JSON-serializable payload
+    and extra response headers.
+
+    Args:
+        handler: Coroutine that answers one research request.
+        port: Port to listen on, usually Actor.config.web_server_port.
+        host: Interface to listen on.
+    """
+    async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                method, target, headers, body = await _read_request(reader)
+            except OverflowError as e:
+                _write_response(writer, 413, {"error": str(e)})
+                return
+            except (ValueError, asyncio.IncompleteReadError):
+                _write_response(writer, 400, {"error": "Malformed HTTP request"})
+                return
+
+            if READINESS_PROBE_HEADER in headers:
+                _write_response(writer, 200, b"ok")
+                return
+
+            url = urlsplit(target)
+            if url.path not in ("", "/"):
+                _write_response(writer, 404, {"error": f"Unknown path {url.path}"})
+                return
+            if method not in ("GET", "POST"):
+                _write_response(writer, 405, {"error": f"Method {method} is not allowed"})
+                return
+
+            params: Dict[str, Any] = dict(parse_qsl(url.query))
+            if method == "POST" and body:
+                try:
+                    params.update(json.loads(body))
+                except (ValueError, TypeError):
+                    _write_response(writer, 400, {"error": "Request body must be a JSON object"})
+                    return
+
+            try:
+                status, payload, extra_headers = await handler(params)
+            except Exception as e:
+                Actor.log.error(f"Error handling standby request: {str(e)}")
+                status, payload, extra_headers = 500, {"error": str(e)}, {}
+            _write_response(writer, status, payload, extra_headers)
+        finally:
+            try:
+                await writer.drain()
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    server = await asyncio.start_server(handle_connection, host, port)
+    Actor.log.info(f"Standby server listening on port {port}")
+    async with server:
+        await server.serve_forever()
+
+class QueueFullError(Exception):
+    """Raised when a research job is not admitted because the queue of its priority is full."""
+
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__(f"The research queue is full, retry in {retry_after}s")
+
+def request_key(company_name: str, additional_context: Optional[str], competitor_count: Optional[int]) -> Tuple[str, str, int]:
+    """Key under which requests for the same research share a job, ignoring case and whitespace.
+
+    A missing competitor_count is the same research as 0.
+    """
+    def normalize(text: Optional[str]) -> str:
+        return " ".join((text or "").split()).casefold()
+    return normalize(company_name), normalize(additional_context), competitor_count or 0
+
+class StandbyScheduler:
+    """Admission control, request coalescing and result cache of the standby server.
+
+    Requests for a research that is already running join that job instead of starting another,
+    and results are served from memory for cache_ttl_secs after a job finishes. Other requests
+    become jobs: at most max_running run at once and the rest wait in a queue, highest priority
+    first. The queue holds max_queued jobs, of which normal priority may fill three quarters and
+    low priority half; beyond that a job is rejected with the expected wait, so a burst is
+    answered with 429s instead of oversubscribing the scrapers and the model quota.
+
+    Args:
+        max_running: Research jobs running at the same time.
+        max_queued: Research jobs waiting for a slot.
+        cache_ttl_secs: How long finished results are served from memory (0 = off).
+        cache_size: Most results kept in memory.
+    """
+
+    def __init__(self, max_running: int = 3, max_queued: int = 20, cache_ttl_secs: float = 600, cache_size: int = 200):
+        self.max_running = max(max_running, 1)
+        self.max_queued = max(max_queued, 0)
+        self.cache_ttl_secs = cache_ttl_secs
+        self.cache_size = cache_size
+        self.running = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self._jobs: Dict[Tuple, asyncio.Task] = {}
+        self._cache: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._job_secs = 60.0
+        self.counts = {"jobs": 0, "coalesced": 0, "cache_hits": 0, "rejected": 0, "failed": 0}
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, waiter in self._waiters if not waiter.done())
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is expected to free up for a new job."""
+        return max(math.ceil(self._job_secs * (self.queued + 1) / self.max_running), 1)
+
+    def _admit(self, priority: str) -> asyncio.Future:
+        slot = asyncio.get_running_loop().create_future()
+        if self.running < self.max_running and not self.queued:
+            self.running += 1
+            slot.set_result(None)
+            return slot
+        if self.queued >= int(self.max_queued * QUEUE_SHARE[priority]):
+            self.counts["rejected"] += 1
+            raise QueueFullError(self.retry_after())
+        heapq.heappush(self._waiters, (PRIORITIES[priority], next(self._order), slot))
+        return slot
+
+    def _release(self) -> None:
+        # Hand the slot straight to the next waiter, so a new request cannot take it first
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.running -= 1
+
+    def _cached(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() > entry[0]:
+            del self._cache[key]
+            return None
+        return entry[1]
+
+    def _store(self, key: Tuple, data: Dict[str, Any]) -> None:
+        if self.cache_ttl_secs <= 0:
+            return
+        self._cache[key] = (time.monotonic() + self.cache_ttl_secs, data)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _run_job(self, key: Tuple, slot: asyncio.Future, job: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        try:
+            await slot
+            started = time.monotonic()
+            try:
+                data = await job()
+            except Exception:
+                self.counts["failed"] += 1
+                raise
+            finally:
+                self._job_secs = 0.8 * self._job_secs + 0.2 * (time.monotonic() - started)
+                self._release()
+            self._store(key, data)
+            return data
+        finally:
+            self._jobs.pop(key, None)
+
+    async def submit(self, key: Tuple, job: Callable[[], Awaitable[Dict[str, Any]]], priority: str = "normal") -> Tuple[Dict[str, Any], str]:
+        """Answer a request from the cache, by joining the running job with the same key, or by queueing a new job.
+
+        Returns:
+            The result and how it was served ("cache", "coalesced" or "new").
+
+        Raises:
+            QueueFullError: The queue of the priority is full.
+        """
+        data = self._cached(key)
+        if data is not None:
+            self.counts["cache_hits"] += 1
+            return data, "cache"
+        task = self._jobs.get(key)
+        if task is not None:
+            self.counts["coalesced"] += 1
+            return await asyncio.shield(task), "coalesced"
+
+        slot = self._admit(priority)
+        self.counts["jobs"] += 1
+        task = self._jobs[key] = asyncio.create_task(self._run_job(key, slot, job))
+        # Requests that disconnect do not cancel the job other requests may have joined
+        return await asyncio.shield(task), "new"
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counts, "running": self.running, "queued": self.queued, "cached": len(self._cache)}
+
+def create_research_handler(research: Research, scheduler: Optional[StandbyScheduler] = None, default_competitor_count: int = 0) -> Handler:
+    """Create the standby request handler that answers with the research result of the requested company.
+
+    Requests may set a priority of high, normal (default) or low. competitor_count must be a
+    non-negative integer and is capped at MAX_COMPETITOR_COUNT.
+
+    Args:
+        research: Coroutine taking company_name, additional_context and competitor_count.
+        scheduler: Admission control, coalescing and cache of the requests (defaults to a new StandbyScheduler).
+        default_competitor_count: Competitors to benchmark for requests that don't set competitor_count.
+
+    Returns:
+        A handler for serve_standby.
+    """
+    scheduler = scheduler or StandbyScheduler()
+
+    async def handle_request(params: Dict[str, Any]) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        company_name = params.get("company_name")
+        if not isinstance(company_name, str) or not company_name.strip():
+            return 400, {"error": "company_name is required and must be a string"}, {}
+        additional_context = params.get("additional_context")
+        if additional_context is not None and not isinstance(additional_context, str):
+            return 400, {"error": "additional_context must be a string"}, {}
+        priority = str(params.get("priority") or "normal").lower()
+        if priority not in PRIORITIES:
+            return 400, {"error": f"priority must be one of {', '.join(PRIORITIES)}"}, {}
+        raw_count = params.get("competitor_count")
+        if raw_count in (None, ""):
+            competitor_count = default_competitor_count
+        elif isinstance(raw_count, bool) or (isinstance(raw_count, float) and not raw_count.is_integer()):
+            # int() would turn true into 1 and truncate 2.9 to 2
+            competitor_count = -1
+        else:
+            try:
+                competitor_count = int(raw_count)
+            except (TypeError, ValueError, OverflowError):
+                competitor_count = -1
+        if competitor_count < 0:
+            return 400, {"error": "competitor_count must be a non-negative integer"}, {}
+        competitor_count = min(competitor_count, MAX_COMPETITOR_COUNT)
+
+        try:
+            data, served = await scheduler.submit(
+                request_key(company_name, additional_context, competitor_count),
+                lambda: research(company_name, additional_context, competitor_count),
+                priority,
+            )
+        except QueueFullError as e:
+            return 429, {"error": str(e), "retry_after_secs": e.retry_after}, {"Retry-After": str(e.retry_after)}
+        return 200, data, {"X-Research-Source": served}
+
+    return handle_request
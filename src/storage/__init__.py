@@ -0,0 +1,24 @@
+from .evidence_bundle import EvidenceRecorder, list_evidence_bundles, load_evidence_bundle
+from .checkpoint import RunCheckpoint, checkpoint_key
+from .content_store import PageContentStore, page_url_key, pop_store_hits
+from .spill_store import SpillStore
+from .columnar_export import ColumnarExporter, EXPORT_MANIFEST_KEY
+from .watchlist import load_fingerprint, save_fingerprint, WATCHLIST_STORE_NAME, CHANGE_FEED_DATASET_NAME
+
+__all__ = [
+    'EvidenceRecorder',
+    'list_evidence_bundles',
+    'load_evidence_bundle',
+    'RunCheckpoint',
+    'checkpoint_key',
+    'load_fingerprint',
+    'save_fingerprint',
+    'WATCHLIST_STORE_NAME',
+    'CHANGE_FEED_DATASET_NAME',
+    'PageContentStore',
+    'page_url_key',
+    'pop_store_hits',
+    'SpillStore',
+    'ColumnarExporter',
+    'EXPORT_MANIFEST_KEY'
+]
@@ -0,0 +1,95 @@
+import gzip
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from apify import Actor, Event
+from pydantic_ai.messages import ModelMessage, ModelMessagesTypeAdapter
+
+from .evidence_bundle import EvidenceRecorder
+
+CHECKPOINT_KEY = "CHECKPOINT"
+
+def checkpoint_key(company_name: str, additional_context: Optional[str] = None, competitor_count: int = 0) -> str:
+    """Build the checkpoint key of one research request within the current run.
+
+    The key covers everything that shapes the conversation (company, additional context and
+    competitor count) plus the run id, so a request never resumes the conversation of a
+    different request or of another run sharing the key-value store.
+    """
+    request = json.dumps([company_name.strip().lower(), (additional_context or "").strip(), competitor_count or 0])
+    digest = hashlib.sha256(request.encode("utf-8")).hexdigest()[:24]
+    return f"{CHECKPOINT_KEY}-{Actor.config.actor_run_id or 'local'}-{digest}"
+
+class RunCheckpoint:
+    """Persist the completed tool calls and the agent's message history of a run.
+
+    The checkpoint is written to the run's default key-value store after every agent step and on
+    Apify's persistState and migrating events, so a run restarted after a migration or crash can
+    resume the conversation and serve already completed scraper runs from the checkpoint.
+    """
+
+    def __init__(self, evidence: EvidenceRecorder, key: str = CHECKPOINT_KEY):
+        self.evidence = evidence
+        self.key = key
+        self.messages: List[ModelMessage] = []
+        self._registered = False
+
+    async def load(self) -> Optional[Dict[str, Any]]:
+        """Load the checkpoint of a previous attempt of this run into the evidence recorder.
+
+        Returns:
+            The checkpoint metadata with the restored "messages", or None if there is no checkpoint.
+        """
+        store = await Actor.open_key_value_store()
+        raw = await store.get_value(self.key)
+        if raw is None:
+            return None
+        state = json.loads(gzip.decompress(raw))
+
+        restored = EvidenceRecorder.from_state(state["evidence"])
+        self.evidence.calls, self.evidence.blobs = restored.calls, restored.blobs
+        self.messages = ModelMessagesTypeAdapter.validate_python(state["messages"])
+        Actor.log.info(
+            f"Resuming from checkpoint saved at {state['saved_at']}: "
+            f"{len(self.evidence.calls)} completed tool calls, {len(self.messages)} messages")
+        return {**state, "messages": self.messages}
+
+    async def save(self, messages: Optional[List[ModelMessage]] = None) -> None:
+        """Write the current evidence and message history to the key-value store."""
+        if messages is not None:
+            self.messages = messages
+        state = {
+            "saved_at": datetime.now(timezone.utc).isoformat(),
+            "evidence": self.evidence.to_state(),
+            "messages": ModelMessagesTypeAdapter.dump_python(self.messages, mode="json"),
+        }
+        store = await Actor.open_key_value_store()
+        await store.set_value(self.key, gzip.compress(json.dumps(state, default=str).encode("utf-8")), content_type="application/gzip")
+
+    async def _on_persist_state(self, event_data=None) -> None:
+        try:
+            await self.save()
+        except Exception as e:
+            Actor.log.error(f"Error saving checkpoint: {str(e)}")
+
+    def register_events(self) -> None:
+        """Save the checkpoint whenever the platform asks to persist state or migrates the run."""
+        if not self._registered:
+            Actor.on(Event.PERSIST_STATE, self._on_persist_state)
+            Actor.on(Event.MIGRATING, self._on_persist_state)
+            self._registered = True
+
+    def unregister_events(self) -> None:
+        """Stop saving the checkpoint on platform events, e.g. once the research has ended."""
+        if self._registered:
+            Actor.off(Event.PERSIST_STATE, self._on_persist_state)
+            Actor.off(Event.MIGRATING, self._on_persist_state)
+            self._registered = False
+
+    async def clear(self) -> None:
+        """Remove the checkpoint once the research has completed or failed."""
+        self.unregister_events()
+        store = await Actor.open_key_value_store()
+        await store.set_value(self.key, None)
@@ -0,0 +1,188 @@
+import asyncio
+import gzip
+import importlib.util
+import io
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+from apify import Actor
+
+from ..models import analyze_report_structure
+from ..validators import report_quality_score
+
+EXPORT_PREFIX = "EXPORT"
+EXPORT_MANIFEST_KEY = "EXPORT-MANIFEST"
+
+# Columns of every exported table and their types ("int", "float", "str" or "list" of strings)
+EXPORT_TABLES: Dict[str, List[Tuple[str, str]]] = {
+    "companies": [
+        ("company_id", "int"), ("company_name", "str"), ("researched_at", "str"),
+        ("name", "str"), ("description", "str"), ("industries", "list"), ("annual_revenue", "int"),
+        ("employees", "int"), ("funding", "str"), ("founded_year", "int"), ("website", "str"),
+        ("phone", "str"), ("email", "str"), ("address", "str"), ("facebook", "str"), ("instagram", "str"),
+        ("twitter", "str"), ("linkedin", "str"), ("youtube", "str"), ("tiktok", "str"), ("pinterest", "str"),
+        ("reddit", "str"), ("github", "str"), ("indeed", "str"), ("competitors", "list"),
+    ],
+    "key_personnel": [("company_id", "int"), ("company_name", "str"), ("position", "int"), ("name", "str"), ("role", "str")],
+    "recent_news": [("company_id", "int"), ("company_name", "str"), ("position", "int"), ("headline", "str"), ("date", "str"), ("link", "str")],
+    "job_openings": [("company_id", "int"), ("company_name", "str"), ("position", "int"), ("title", "str"), ("description", "str"), ("link", "str")],
+    "report_metrics": [
+        ("company_id", "int"), ("company_name", "str"), ("total_length", "int"), ("sections_count", "int"),
+        ("shallow_sections", "list"), ("missing_sections", "list"), ("data_point_count", "int"),
+        ("sources_count", "int"), ("quality_score", "float"),
+    ],
+}
+
+# Columns of the reports, which are always written as gzipped JSON lines
+REPORT_COLUMNS: List[Tuple[str, str]] = [("company_id", "int"), ("company_name", "str"), ("report", "str")]
+
+# File extension and content type of the exported parts per format
+EXPORT_FORMATS = {
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "arrow": ("arrow", "application/vnd.apache.arrow.file"),
+    "jsonl": ("jsonl.gz", "application/gzip"),
+}
+
+def _cast(value: Any, kind: str) -> Any:
+    if value is None:
+        return None
+    try:
+        if kind == "int":
+            return int(value)
+        if kind == "float":
+            return float(value)
+        if kind == "list":
+            return [str(item) for item in value]
+    except (TypeError, ValueError):
+        return None
+    return str(value)
+
+def flatten_result(company_id: int, data: Dict[str, Any], researched_at: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Flatten one research result into rows of the export tables, keyed by company_id.
+
+    Returns:
+        The rows per table name.
+    """
+    company = {"company_id": company_id, "company_name": data.get("name", ""), "researched_at": researched_at}
+    metrics, _ = analyze_report_structure(data.get("report") or "")
+    sources = {
+        "companies": [{**data, **company}],
+        "key_personnel": data.get("key_personnel") or [],
+        "recent_news": data.get("recent_news") or [],
+        "job_openings": data.get("job_openings") or [],
+        "report_metrics": [{**metrics.model_dump(), "quality_score": round(report_quality_score(metrics), 4)}],
+    }
+    rows = {}
+    for table, items in sources.items():
+        rows[table] = [
+            {column: _cast({**item, **company, "position": position}.get(column), kind) for column, kind in EXPORT_TABLES[table]}
+            for position, item in enumerate(items)
+        ]
+    return rows
+
+def _encode(table: str, rows: List[Dict[str, Any]], export_format: str) -> bytes:
+    """Serialize the rows of one table part (CPU bound, run off the event loop)."""
+    if export_format == "jsonl":
+        return gzip.compress("".join(json.dumps(row, default=str) + "\n" for row in rows).encode("utf-8"))
+
+    import pyarrow as pa
+
+    types = {"int": pa.int64(), "float": pa.float64(), "str": pa.string(), "list": pa.list_(pa.string())}
+    schema = pa.schema([(column, types[kind]) for column, kind in EXPORT_TABLES[table]])
+    arrow_table = pa.Table.from_pylist(rows, schema=schema)
+    sink = io.BytesIO()
+    if export_format == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(arrow_table, sink, compression="zstd")
+    else:
+        with pa.ipc.new_file(sink, schema, options=pa.ipc.IpcWriteOptions(compression="zstd")) as writer:
+            writer.write_table(arrow_table)
+    return sink.getvalue()
+
+class ColumnarExporter:
+    """Buffers research results and writes them in bulk as flattened columnar tables.
+
+    Every part_size companies, the buffered rows are written to the run's default key-value store
+    as one part per table (companies, key_personnel, recent_news, job_openings, report_metrics),
+    plus the reports as gzipped JSON lines. Tables share the company_id column, and the
+    EXPORT-MANIFEST record lists the parts, so a whole batch loads with one read per table.
+    Parquet and Arrow IPC need the pyarrow package (listed in requirements.txt); without it
+    the exporter refuses those formats instead of writing something else.
+
+    Args:
+        export_format: "parquet", "arrow" or "jsonl".
+        part_size: Companies buffered before a part is written.
+
+    Raises:
+        ValueError: If the format is unknown, or is parquet or arrow and pyarrow is not installed.
+    """
+
+    def __init__(self, export_format: str = "parquet", part_size: int = 500):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format {export_format}, use one of {', '.join(EXPORT_FORMATS)}")
+        if export_format != "jsonl" and importlib.util.find_spec("pyarrow") is None:
+            raise ValueError(f"{export_format} export needs the pyarrow package, install it or use the jsonl format")
+        self.export_format = export_format
+        self.part_size = max(part_size, 1)
+        self._rows: Dict[str, List[Dict[str, Any]]] = {table: [] for table in EXPORT_TABLES}
+        self._reports: List[Dict[str, Any]] = []
+        self._parts: Dict[str, List[Dict[str, Any]]] = {table: [] for table in [*EXPORT_TABLES, "reports"]}
+        self._lock = asyncio.Lock()
+        self.stats = {"companies": 0, "parts": 0, "bytes": 0}
+
+    async def add(self, data: Dict[str, Any]) -> None:
+        """Buffer one research result, writing a part once part_size companies are buffered."""
+        company_id = self.stats["companies"]
+        researched_at = datetime.now(timezone.utc).isoformat()
+        for table, rows in flatten_result(company_id, data, researched_at).items():
+            self._rows[table].extend(rows)
+        self._reports.append({"company_id": company_id, "company_name": data.get("name", ""), "report": data.get("report", "")})
+        self.stats["companies"] += 1
+        if len(self._reports) >= self.part_size:
+            await self.flush()
+
+    async def _write(self, store, table: str, rows: List[Dict[str, Any]], export_format: str) -> None:
+        part = len(self._parts[table]) + 1
+        extension, content_type = EXPORT_FORMATS[export_format]
+        key = f"{EXPORT_PREFIX}-{table}-{part:04d}.{extension}"
+        body = await asyncio.to_thread(_encode, table, rows, export_format)
+        await store.set_value(key, body, content_type=content_type)
+        self._parts[table].append({"key": key, "rows": len(rows), "bytes": len(body)})
+        self.stats["parts"] += 1
+        self.stats["bytes"] += len(body)
+
+    async def flush(self) -> None:
+        """Write the buffered rows as one part per table."""
+        async with self._lock:
+            if not self._reports:
+                return
+            rows, reports = self._rows, self._reports
+            self._rows, self._reports = {table: [] for table in EXPORT_TABLES}, []
+            store = await Actor.open_key_value_store()
+            for table, table_rows in rows.items():
+                if table_rows:
+                    await self._write(store, table, table_rows, self.export_format)
+            await self._write(store, "reports", reports, "jsonl")
+            Actor.log.info(f"Exported {len(reports)} companies as {self.export_format}")
+
+    async def close(self) -> Dict[str, Any]:
+        """Write the remaining rows and the manifest.
+
+        Returns:
+            The manifest: format, column types and parts of every table.
+        """
+        await self.flush()
+        manifest = {
+            "format": self.export_format,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "companies": self.stats["companies"],
+            "tables": {
+                table: {"columns": dict(columns), "parts": self._parts[table]}
+                for table, columns in {**EXPORT_TABLES, "reports": REPORT_COLUMNS}.items()
+            },
+        }
+        if self.stats["companies"]:
+            store = await Actor.open_key_value_store()
+            await store.set_value(EXPORT_MANIFEST_KEY, manifest)
+        return manifest
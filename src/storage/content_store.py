@@ -0,0 +1,142 @@
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from apify import Actor
+
+PAGE_STORE_NAME = "company-research-pages"
+
+# Query parameters that only track the visitor and never change the page content
+TRACKING_PARAMS = ("utm_", "gclid", "fbclid", "mc_cid", "mc_eid", "ref", "ref_src")
+
+# Marks pages served from the store, so they are neither charged nor counted as scraping cost
+STORE_HIT_FIELD = "from_page_store"
+
+def page_url_key(url: str) -> str:
+    """Canonicalize a URL for content lookups: ignore scheme, www., fragment, trailing slash and tracking parameters."""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not k.lower().startswith(TRACKING_PARAMS))
+    path = parts.path.rstrip("/") or ""
+    return f"{host}{path}" + (f"?{urlencode(query)}" if query else "")
+
+def pop_store_hits(output: Any) -> Tuple[Any, int]:
+    """Remove the page store marker from the pages of a tool output, in place.
+
+    Returns:
+        The freshly fetched part of the output (without the pages served from the store), and the number of served pages.
+    """
+    if not isinstance(output, list):
+        return output, 0
+    fetched = [page for page in output if not (isinstance(page, dict) and page.pop(STORE_HIT_FIELD, False))]
+    return fetched, len(output) - len(fetched)
+
+class PageContentStore:
+    """URL-keyed store of page markdown shared by the crawler and the search browser.
+
+    Pages fetched by either tool are written here with their fetch time and content hash, and
+    both tools serve pages that are still fresh from the store instead of scraping them again.
+    The store is a named key-value store, so pages are shared across runs; an in-memory copy of
+    the most recently used pages (up to max_memory_chars of markdown) serves repeated lookups
+    of the same process. Served pages carry STORE_HIT_FIELD until pop_store_hits removes it.
+
+    Args:
+        max_age_secs: Pages older than this are fetched again.
+        max_memory_chars: Markdown characters kept in memory before the least recently used pages are dropped.
+    """
+
+    def __init__(self, max_age_secs: float = 24 * 3600, max_memory_chars: int = 50_000_000):
+        self.max_age_secs = max_age_secs
+        self.max_memory_chars = max_memory_chars
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._memory_chars = 0
+        self._store = None
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evicted": 0}
+
+    async def _open(self):
+        if self._store is None:
+            self._store = await Actor.open_key_value_store(name=PAGE_STORE_NAME)
+        return self._store
+
+    @staticmethod
+    def _record_key(url: str) -> str:
+        return "page-" + hashlib.sha256(page_url_key(url).encode("utf-8")).hexdigest()[:40]
+
+    def _is_fresh(self, record: Optional[Dict[str, Any]]) -> bool:
+        return bool(record) and time.time() - record.get("fetched_at_ts", 0) < self.max_age_secs
+
+    def _forget(self, key: str) -> None:
+        record = self._memory.pop(key, None)
+        if record is not None:
+            self._memory_chars -= len(record["markdown"])
+
+    def _remember(self, key: str, record: Dict[str, Any]) -> None:
+        """Keep a record in memory as the most recently used, dropping the least recently used ones over the size bound."""
+        self._forget(key)
+        self._memory[key] = record
+        self._memory_chars += len(record["markdown"])
+        while self._memory_chars > self.max_memory_chars and len(self._memory) > 1:
+            self._forget(next(iter(self._memory)))
+            self.stats["evicted"] += 1
+
+    async def get(self, url: str) -> Optional[Dict[str, str]]:
+        """Return the fresh page stored for a URL as {url, title, markdown}, or None."""
+        key = self._record_key(url)
+        record = self._memory.get(key)
+        if record is None:
+            try:
+                record = await (await self._open()).get_value(key)
+            except Exception as e:
+                Actor.log.warning(f"Could not read page store: {str(e)}")
+                record = None
+        if not self._is_fresh(record):
+            self._forget(key)
+            self.stats["misses"] += 1
+            return None
+        self._remember(key, record)
+        self.stats["hits"] += 1
+        return {"url": record["url"], "title": record["title"], "markdown": record["markdown"], STORE_HIT_FIELD: True}
+
+    async def get_many(self, urls: List[str]) -> Dict[str, Dict[str, str]]:
+        """Return the fresh pages stored for the given URLs, keyed by the requested URL."""
+        pages = {}
+        for url in urls:
+            page = await self.get(url)
+            if page is not None:
+                pages[url] = page
+        return pages
+
+    async def put(self, page: Dict[str, str], source: str) -> None:
+        """Store a page ({url, title, markdown}) fetched by the given source tool."""
+        if not page.get("url") or not page.get("markdown"):
+            return
+        content_hash = hashlib.sha256(page["markdown"].encode("utf-8")).hexdigest()
+        key = self._record_key(page["url"])
+        previous = self._memory.get(key)
+        if previous and previous["content_hash"] == content_hash and self._is_fresh(previous):
+            return
+        record = {
+            "url": page["url"],
+            "canonical_url": page_url_key(page["url"]),
+            "title": page.get("title") or "",
+            "markdown": page["markdown"],
+            "content_hash": content_hash,
+            "source": source,
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+            "fetched_at_ts": time.time(),
+        }
+        self._remember(key, record)
+        self.stats["writes"] += 1
+        try:
+            await (await self._open()).set_value(key, record)
+        except Exception as e:
+            Actor.log.warning(f"Could not write page store: {str(e)}")
+
+    async def put_many(self, pages: List[Dict[str, str]], source: str) -> None:
+        for page in pages:
+            await self.put(page, source)
@@ -0,0 +1,235 @@
+import asyncio
+import gzip
+import hashlib
+import json
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from apify import Actor
+
+EVIDENCE_STORE_NAME = "company-research-evidence"
+# Each bundle has its own index entry, so concurrent runs never rewrite a shared record
+INDEX_KEY_PREFIX = "index-"
+# Single index record written by earlier versions, still read when listing bundles
+LEGACY_INDEX_KEY = "INDEX"
+
+# Most recently written blob hashes of this process, so long-lived (standby) processes skip rewrites
+MAX_WRITTEN_BLOBS = 50_000
+_written_blobs: "OrderedDict[str, None]" = OrderedDict()
+
+# Blobs uploaded at the same time by one save
+UPLOAD_CONCURRENCY = 16
+
+def _mark_written(digest: str) -> None:
+    _written_blobs[digest] = None
+    _written_blobs.move_to_end(digest)
+    while len(_written_blobs) > MAX_WRITTEN_BLOBS:
+        _written_blobs.popitem(last=False)
+
+def _canonical_json(value: Any) -> bytes:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+def _blob_key(digest: str) -> str:
+    return f"blob-{digest}"
+
+class EvidenceRecorder:
+    """Collect every tool call of a run with its normalized output, content-addressed by hash.
+
+    Each output item (a page, a place, a profile) is stored once as a blob keyed by the SHA-256 of
+    its canonical JSON, so the same page returned by the crawler and the search browser, or by
+    two different runs, is only kept once. Calls reference their items by hash.
+    """
+
+    def __init__(self):
+        self.calls: List[Dict[str, Any]] = []
+        self.blobs: Dict[str, Any] = {}
+        # Calls already answered by replay_lookup
+        self._replayed: set = set()
+
+    def _add_blob(self, item: Any) -> str:
+        digest = hashlib.sha256(_canonical_json(item)).hexdigest()
+        self.blobs.setdefault(digest, item)
+        return digest
+
+    def record(
+        self,
+        tool: str,
+        arguments: Dict[str, Any],
+        output: Any,
+        purpose: Optional[str] = None,
+        requested: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Record a tool call and its normalized output (a list of items or a single dictionary).
+
+        Args:
+            tool: Name of the tool.
+            arguments: Arguments of the call, as sent to the tool.
+            output: Output of the call.
+            purpose: What the call was made for if not the researched company itself, e.g. "competitor".
+            requested: Arguments the model asked for, if the budget clamped them.
+        """
+        is_list = isinstance(output, list)
+        items = output if is_list else ([output] if output else [])
+        call = {
+            "tool": tool,
+            "arguments": arguments,
+            "output_type": "list" if is_list else "dict",
+            "items": [self._add_blob(item) for item in items],
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+        }
+        if purpose:
+            call["purpose"] = purpose
+        if requested and requested != arguments:
+            call["requested_arguments"] = requested
+        self.calls.append(call)
+
+    def _output(self, call: Dict[str, Any]) -> Any:
+        items = [self.blobs[digest] for digest in call["items"]]
+        if call["output_type"] == "list":
+            return items
+        return items[0] if items else {}
+
+    def lookup(self, tool: str, arguments: Dict[str, Any]) -> Optional[Any]:
+        """Return the output of an earlier identical call, or None if the call has not been made yet."""
+        for call in reversed(self.calls):
+            if call["tool"] == tool and call["arguments"] == arguments:
+                return self._output(call)
+        return None
+
+    def replay_lookup(
+        self,
+        tool: str,
+        arguments: Dict[str, Any],
+        requested: Optional[Dict[str, Any]] = None,
+        size_arguments: Iterable[str] = (),
+    ) -> Optional[Any]:
+        """Return the recorded output that best answers a call when replaying this evidence.
+
+        A replay clamps arguments with a different budget than the recorded run, and a model may
+        word its calls slightly differently, so the match is relaxed step by step: the same
+        arguments (as sent or as requested by the model), then the same arguments apart from the
+        size arguments, then the first call of the same tool that has not been replayed yet, and
+        finally any call of the same tool.
+
+        Returns:
+            The recorded output, or None if the tool was never called.
+        """
+        wanted = [a for a in (requested, arguments) if a]
+
+        def without_sizes(args: Dict[str, Any]) -> Dict[str, Any]:
+            return {k: v for k, v in args.items() if k not in size_arguments}
+
+        matches = [
+            lambda call: call["arguments"] in wanted or call.get("requested_arguments") in wanted,
+            lambda call: without_sizes(call["arguments"]) in [without_sizes(a) for a in wanted],
+            lambda call: id(call) not in self._replayed,
+            lambda call: True,
+        ]
+        calls = [call for call in self.calls if call["tool"] == tool]
+        for step, matches_call in enumerate(matches):
+            call = next((call for call in calls if matches_call(call)), None)
+            if call is not None:
+                if step >= 2:
+                    Actor.log.warning(f"Replaying the recorded {tool} call for {call['arguments']} instead of {arguments}")
+                self._replayed.add(id(call))
+                return self._output(call)
+        return None
+
+    def to_state(self) -> Dict[str, Any]:
+        """Serializable state of the recorder, used for checkpoints."""
+        return {"calls": self.calls, "blobs": self.blobs}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "EvidenceRecorder":
+        recorder = cls()
+        recorder.calls = list(state.get("calls", []))
+        recorder.blobs = dict(state.get("blobs", {}))
+        return recorder
+
+    async def save(self, bundle_key: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Persist the bundle to the shared evidence key-value store and register it in the index.
+
+        Args:
+            bundle_key: Key of the bundle manifest, e.g. "bundle-tesla-20250101T120000".
+            metadata: Extra information stored with the manifest and the index entry (company, date, ...).
+
+        Returns:
+            The index entry of the bundle.
+        """
+        store = await Actor.open_key_value_store(name=EVIDENCE_STORE_NAME)
+
+        semaphore = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+
+        async def upload(digest: str, item: Any) -> int:
+            compressed = gzip.compress(_canonical_json(item))
+            async with semaphore:
+                await store.set_value(_blob_key(digest), compressed, content_type="application/gzip")
+            _mark_written(digest)
+            return len(compressed)
+
+        sizes = await asyncio.gather(*(upload(digest, item) for digest, item in self.blobs.items() if digest not in _written_blobs))
+        stored_bytes = sum(sizes)
+        new_blobs = len(sizes)
+
+        manifest = {
+            "metadata": metadata or {},
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "calls": self.calls,
+        }
+        compressed_manifest = gzip.compress(_canonical_json(manifest))
+        await store.set_value(bundle_key, compressed_manifest, content_type="application/gzip")
+        stored_bytes += len(compressed_manifest)
+
+        entry = {
+            **(metadata or {}),
+            "bundle_key": bundle_key,
+            "created_at": manifest["created_at"],
+            "calls": len(self.calls),
+            "blobs": len(self.blobs),
+            "stored_bytes": stored_bytes,
+        }
+        await store.set_value(f"{INDEX_KEY_PREFIX}{bundle_key}", entry)
+
+        Actor.log.info(
+            f"Saved evidence bundle {bundle_key}: {len(self.calls)} calls, {len(self.blobs)} blobs "
+            f"({new_blobs} new), {stored_bytes} compressed bytes")
+        return entry
+
+async def list_evidence_bundles(company: Optional[str] = None) -> List[Dict[str, Any]]:
+    """List the stored evidence bundles, newest first, optionally filtered by company name."""
+    store = await Actor.open_key_value_store(name=EVIDENCE_STORE_NAME)
+    index = await store.get_value(LEGACY_INDEX_KEY) or {}
+    async for key_info in store.iterate_keys():
+        if key_info.key.startswith(INDEX_KEY_PREFIX):
+            entry = await store.get_value(key_info.key)
+            if entry:
+                index[entry["bundle_key"]] = entry
+    entries = [e for e in index.values() if company is None or str(e.get("company", "")).lower() == company.lower()]
+    return sorted(entries, key=lambda e: e.get("created_at", ""), reverse=True)
+
+async def load_evidence_bundle(bundle_key: str) -> Optional[Dict[str, Any]]:
+    """Load a bundle and rehydrate every call's output from the shared blobs.
+
+    Returns:
+        The manifest with each call's "output" restored, or None if the bundle does not exist.
+    """
+    store = await Actor.open_key_value_store(name=EVIDENCE_STORE_NAME)
+    raw_manifest = await store.get_value(bundle_key)
+    if raw_manifest is None:
+        return None
+    manifest = json.loads(gzip.decompress(raw_manifest))
+
+    cache: Dict[str, Any] = {}
+    for call in manifest["calls"]:
+        items = []
+        for digest in call["items"]:
+            if digest not in cache:
+                raw_blob = await store.get_value(_blob_key(digest))
+                cache[digest] = json.loads(gzip.decompress(raw_blob)) if raw_blob is not None else None
+            items.append(cache[digest])
+        if call["output_type"] == "list":
+            call["output"] = items
+        else:
+            call["output"] = items[0] if items else {}
+    return manifest
@@ -0,0 +1,134 @@
+import hashlib
+import uuid
+from typing import Any, Dict, List, Optional
+
+from apify import Actor
+
+# Characters of each spilled page shown in the manifest
+PREVIEW_CHARS = 300
+
+class SpillStore:
+    """In-run store for large page results, which the model reads back by handle.
+
+    Results whose markdown exceeds inline_limit characters are replaced by a manifest with the
+    URL, title, size and a short preview of each page. The pages are kept in memory up to
+    memory_limit characters; beyond that they overflow to the run's default key-value store.
+    Call clear() when the run ends to delete the overflow records.
+
+    Handles are derived from the page URL and content, so the same page always gets the same
+    handle. The store itself is not checkpointed: after a restart, the model is asked to repeat
+    the tool call, which is served from the checkpointed evidence and spills the page under the
+    same handle again.
+
+    Args:
+        inline_limit: Largest total markdown size (in characters) returned inline.
+        memory_limit: Largest total size of spilled pages kept in memory.
+    """
+
+    def __init__(self, inline_limit: int = 40_000, memory_limit: int = 2_000_000):
+        self.inline_limit = inline_limit
+        self.memory_limit = memory_limit
+        self._prefix = f"SPILL-{uuid.uuid4().hex[:8]}"
+        self._memory: Dict[str, Dict[str, str]] = {}
+        self._memory_size = 0
+        self._overflow: Dict[str, str] = {}
+        self.stats = {"spilled_results": 0, "spilled_chars": 0, "overflow_pages": 0, "reads": 0}
+
+    @staticmethod
+    def _handle(page: Dict[str, str]) -> str:
+        content = f"{page.get('url', '')}\n{page.get('markdown') or ''}"
+        return "p" + hashlib.sha256(content.encode("utf-8")).hexdigest()[:12]
+
+    async def _put(self, page: Dict[str, str]) -> str:
+        handle = self._handle(page)
+        if handle in self._memory or handle in self._overflow:
+            return handle
+        size = len(page.get("markdown") or "")
+        if self._memory_size + size <= self.memory_limit:
+            self._memory[handle] = page
+            self._memory_size += size
+            return handle
+        key = f"{self._prefix}-{handle}"
+        try:
+            store = await Actor.open_key_value_store()
+            await store.set_value(key, page)
+            self._overflow[handle] = key
+            self.stats["overflow_pages"] += 1
+        except Exception as e:
+            Actor.log.warning(f"Could not spill page to the key-value store, keeping it in memory: {str(e)}")
+            self._memory[handle] = page
+            self._memory_size += size
+        return handle
+
+    async def get(self, handle: str) -> Optional[Dict[str, str]]:
+        if handle in self._memory:
+            return self._memory[handle]
+        if handle in self._overflow:
+            store = await Actor.open_key_value_store()
+            return await store.get_value(self._overflow[handle])
+        return None
+
+    async def spill(self, pages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Return the pages inline if they are small enough, otherwise spill them and return their manifest.
+
+        Returns:
+            {"results": pages}, or {"manifest": [...], "note": ...} where each entry has handle, url,
+            title, size and preview. Near-duplicate entries (without markdown) are listed as they are.
+        """
+        total = sum(len(page.get("markdown") or "") for page in pages)
+        if total <= self.inline_limit:
+            return {"results": pages}
+
+        manifest = []
+        for page in pages:
+            markdown = page.get("markdown")
+            if not markdown:
+                manifest.append(page)
+                continue
+            handle = await self._put(page)
+            manifest.append({
+                "handle": handle,
+                "url": page.get("url", ""),
+                "title": page.get("title", ""),
+                "size": len(markdown),
+                "preview": markdown[:PREVIEW_CHARS],
+            })
+        self.stats["spilled_results"] += 1
+        self.stats["spilled_chars"] += total
+        return {
+            "manifest": manifest,
+            "note": f"{total} characters of page content were not returned inline. Read the pages you need with tool_read_page(handle).",
+        }
+
+    async def read(self, handle: str, offset: int = 0, max_chars: int = 20_000) -> Dict[str, Any]:
+        """Return a character range of a spilled page."""
+        page = await self.get(handle)
+        if page is None:
+            return {"error": (
+                f"No page with handle {handle}. Handles expire when the run is restarted: "
+                f"call the tool that returned it again to refetch the page, then read it by handle."
+            )}
+        self.stats["reads"] += 1
+        markdown = page.get("markdown") or ""
+        offset = max(offset, 0)
+        end = min(offset + max(max_chars, 1), len(markdown))
+        return {"result": {
+            "url": page.get("url", ""),
+            "title": page.get("title", ""),
+            "markdown": markdown[offset:end],
+            "offset": offset,
+            "size": len(markdown),
+            "next_offset": end if end < len(markdown) else None,
+        }}
+
+    async def clear(self) -> None:
+        """Delete the pages that overflowed to the key-value store."""
+        if not self._overflow:
+            return
+        try:
+            store = await Actor.open_key_value_store()
+            for key in self._overflow.values():
+                await store.set_value(key, None)
+        except Exception as e:
+            Actor.log.warning(f"Could not delete spilled pages: {str(e)}")
+        self._overflow.clear()
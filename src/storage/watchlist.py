@@ -0,0 +1,74 @@
+import hashlib
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from apify import Actor
+
+WATCHLIST_STORE_NAME = "company-research-watchlist"
+CHANGE_FEED_DATASET_NAME = "company-research-change-feed"
+
+def _legacy_fingerprint_key(company_name: str) -> str:
+    return "fp-" + re.sub(r"[^a-z0-9_.-]+", "_", company_name.lower()).strip("_")[:200]
+
+def _fingerprint_key(company_name: str) -> str:
+    # The hash keeps names without ASCII letters or digits (e.g. "日本電気") from sharing one key
+    normalized = company_name.strip().lower()
+    digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:12]
+    slug = re.sub(r"[^a-z0-9_.-]+", "_", normalized).strip("_")[:180]
+    return f"fp-{slug}-{digest}" if slug else f"fp-{digest}"
+
+async def load_fingerprint(company_name: str) -> Optional[Dict[str, Any]]:
+    """Load the stored fingerprint of a watchlist company.
+
+    Returns:
+        A dictionary with company, website, indeed_url, signals (the baseline of the last report),
+        last_signals, last_report_at and checked_at, or None if the company was never checked.
+    """
+    store = await Actor.open_key_value_store(name=WATCHLIST_STORE_NAME)
+    fingerprint = await store.get_value(_fingerprint_key(company_name))
+    if fingerprint is None:
+        # Stored before keys had a hash, only trusted if it belongs to the same company
+        legacy = await store.get_value(_legacy_fingerprint_key(company_name))
+        if legacy and str(legacy.get("company", "")).strip().lower() == company_name.strip().lower():
+            fingerprint = legacy
+    return fingerprint
+
+async def save_fingerprint(
+    company_name: str,
+    signals: Dict[str, Any],
+    previous: Optional[Dict[str, Any]] = None,
+    report: Optional[Dict[str, Any]] = None,
+    website: Optional[str] = None,
+    indeed_url: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Store the latest signals of a watchlist company.
+
+    The signals only become the new baseline when a report was generated for them, so slow drift
+    keeps accumulating until it crosses a threshold.
+
+    Args:
+        company_name: The name of the company.
+        signals: The freshly collected signals.
+        previous: The fingerprint loaded before the check, if any.
+        report: The regenerated research result, if the report was regenerated.
+        website: Website of the company, kept for the next check.
+        indeed_url: Indeed company page URL, kept for the next check.
+
+    Returns:
+        The stored fingerprint.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    previous = previous or {}
+    fingerprint = {
+        "company": company_name,
+        "website": website or previous.get("website"),
+        "indeed_url": indeed_url or previous.get("indeed_url"),
+        "signals": signals if report is not None else previous.get("signals", signals),
+        "last_signals": signals,
+        "last_report_at": now if report is not None else previous.get("last_report_at"),
+        "checked_at": now,
+    }
+    store = await Actor.open_key_value_store(name=WATCHLIST_STORE_NAME)
+    await store.set_value(_fingerprint_key(company_name), fingerprint)
+    return fingerprint
@@ -1,16 +1,19 @@
-from .crawl_tools import crawl_website
+from .crawl_tools import crawl_website, crawl_key_pages
 from .search_tools import search_google, search_google_maps
 from .social_tools import get_linkedin_company_profile
 from .job_tools import get_indeed_jobs
 from .review_tools import get_trustpilot_reviews
 from .analytics_tools import get_similarweb_results
+from .monitor_tools import collect_signals
 
 __all__ = [
     'crawl_website',
+    'crawl_key_pages',
     'search_google',
     'search_google_maps',
     'get_linkedin_company_profile',
     'get_indeed_jobs', 
     'get_trustpilot_reviews',
-    'get_similarweb_results'
+    'get_similarweb_results',
+    'collect_signals'
 ] 
\ No newline at end of file
@@ -1,5 +1,6 @@
 from apify import Actor
 from typing import Dict, Union, List, Any
+from ..utils import SourceUnavailableError
 
 async def get_similarweb_results(
     client,
@@ -100,6 +101,8 @@ async def get_similarweb_results(
             Actor.log.warning(f"No Similarweb data retrieved for {website}")
             return {}
         
+    except SourceUnavailableError:
+        raise
     except Exception as e:
         Actor.log.error(f"Error fetching Similarweb data for {website}: {str(e)}")
         return {} 
\ No newline at end of file
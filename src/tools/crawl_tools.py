@@ -1,10 +1,45 @@
+import re
+from typing import Dict, List, Tuple
+from urllib.parse import urljoin, urlparse
+
+import httpx
 from apify import Actor
+from ..utils import SourceUnavailableError
+
+# Path keywords that point at pages feeding ResponseModel fields and report sections
+PATH_KEYWORD_SCORES: List[Tuple[Tuple[str, ...], int]] = [
+    (("about", "company", "who-we-are", "our-story", "mission"), 10),
+    (("team", "leadership", "management", "founders", "people", "executives", "board"), 10),
+    (("pricing", "plans"), 9),
+    (("careers", "jobs", "join-us", "work-with-us"), 8),
+    (("investors", "investor-relations", "ir", "funding", "annual-report"), 8),
+    (("contact", "locations", "offices"), 7),
+    (("press", "news", "newsroom", "media"), 6),
+    (("products", "product", "solutions", "services", "platform", "features"), 6),
+    (("customers", "case-studies", "clients", "testimonials"), 5),
+    (("partners", "integrations"), 4),
+    (("technology", "security", "research"), 3),
+]
+
+# Path segments that rarely carry company-level facts
+PATH_PENALTIES: List[Tuple[Tuple[str, ...], int]] = [
+    (("tag", "tags", "category", "categories", "author", "page", "feed", "search"), 8),
+    (("login", "signin", "signup", "register", "cart", "checkout", "account"), 10),
+    (("privacy", "terms", "cookies", "legal", "imprint", "gdpr"), 6),
+    (("blog", "article", "articles", "post", "posts"), 3),
+]
+
+SKIPPED_EXTENSIONS = (".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".zip", ".xml", ".css", ".js", ".mp4")
+LOCALE_SEGMENT_PATTERN = re.compile(r"^[a-z]{2}(?:[-_][a-z]{2})?$")
+LOC_PATTERN = re.compile(r"<loc>\s*(.*?)\s*</loc>", re.IGNORECASE | re.DOTALL)
+HREF_PATTERN = re.compile(r"""href=["']([^"'#]+)["']""", re.IGNORECASE)
 
 async def crawl_website(
     client,
     url: str,
     max_crawl_depth: int = 1,
     max_crawl_pages: int = 10,
+    pages=None,
 ) -> list[dict[str, str]]:
     """Crawl a website and return the content.
 
@@ -13,6 +48,8 @@ async def crawl_website(
         url: The URL of the website to crawl.
         max_crawl_depth: Maximum depth of links to follow (0 = only start URLs).
         max_crawl_pages: Maximum number of pages to crawl.
+        pages: Optional PageContentStore. Single-page crawls are served from it when the page
+            is fresh, and crawled pages are written to it.
 
     Returns:
         A list of dictionaries containing url, title, and markdown content for each crawled page.
@@ -26,6 +63,12 @@ async def crawl_website(
 
     Actor.log.info(f"Crawling website: {url}, max depth: {max_crawl_depth}, max pages: {max_crawl_pages}")
 
+    if pages is not None and (max_crawl_depth == 0 or max_crawl_pages == 1):
+        cached = await pages.get(url)
+        if cached is not None:
+            Actor.log.info(f"Serving {url} from the page store")
+            return [cached]
+
     try:
         run = await client.actor("apify/website-content-crawler").call(run_input=run_input, memory_mbytes=1024)
         dataset = await client.dataset(run["defaultDatasetId"]).list_items()
@@ -39,8 +82,172 @@ async def crawl_website(
                     "markdown": item['markdown']
                 })
 
+        if pages is not None:
+            await pages.put_many(results, "crawl_website")
         return results if results else []
 
+    except SourceUnavailableError:
+        raise
     except Exception as e:
         Actor.log.error(f"Error crawling website: {str(e)}")
-        return [] 
\ No newline at end of file
+        return [] 
+
+def _host(url: str) -> str:
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+def _on_site(url: str, host: str) -> bool:
+    """Whether the URL is on the given host (without www) or one of its subdomains."""
+    url_host = _host(url)
+    return url_host == host or url_host.endswith(f".{host}")
+
+def _candidate_key(url: str) -> str:
+    """Key under which scheme, www and trailing-slash variants of the same page are collected once."""
+    return _host(url) + (urlparse(url).path.rstrip("/") or "/")
+
+def score_url(url: str) -> int:
+    """Score a URL by how likely it is to hold company-level facts, based on its path."""
+    path = urlparse(url).path.lower().strip("/")
+    if path.endswith(SKIPPED_EXTENSIONS):
+        return -100
+    segments = [s for s in re.split(r"[/]", path) if s]
+    if not segments:
+        return 12  # The homepage is always worth crawling
+
+    score = 0
+    if LOCALE_SEGMENT_PATTERN.match(segments[0]) and segments[0] not in ("ir",):
+        # Localized variants duplicate the default language pages
+        score -= 6
+        segments = segments[1:]
+
+    words = set()
+    for segment in segments:
+        words.add(segment)
+        words.update(w for w in re.split(r"[-_.]", segment) if w)
+    for keywords, value in PATH_KEYWORD_SCORES:
+        if words.intersection(keywords):
+            score += value
+    for keywords, value in PATH_PENALTIES:
+        if words.intersection(keywords):
+            score -= value
+    if any(segment.isdigit() for segment in segments):
+        score -= 4
+
+    # Prefer top-level pages over deep ones
+    score -= 2 * max(len(segments) - 1, 0)
+    return score
+
+async def discover_candidate_urls(url: str, max_sitemaps: int = 3, timeout: float = 10.0) -> List[str]:
+    """Collect same-site URLs from the sitemap and the homepage links.
+
+    Args:
+        url: The website URL.
+        max_sitemaps: Maximum number of nested sitemaps to follow from a sitemap index.
+        timeout: Timeout in seconds for each HTTP request.
+
+    Returns:
+        A de-duplicated list of absolute URLs on the same host, starting with the homepage.
+        Variants of a URL (http/https, www, trailing slash, query, fragment) are listed once,
+        with the homepage's scheme.
+    """
+    if not url.startswith(("http://", "https://")):
+        url = f"https://{url}"
+    parsed = urlparse(url)
+    homepage = f"{parsed.scheme}://{parsed.netloc}/"
+    host = _host(url)
+    found: Dict[str, str] = {_candidate_key(homepage): homepage}
+
+    def add(link: str) -> None:
+        link_url = urlparse(link)
+        path = link_url.path.rstrip("/") or "/"
+        found.setdefault(_candidate_key(link), f"{parsed.scheme}://{link_url.netloc}{path}")
+
+    async with httpx.AsyncClient(follow_redirects=True, timeout=timeout, headers={"User-Agent": "Mozilla/5.0"}) as http:
+        sitemaps = [urljoin(homepage, "sitemap.xml")]
+        visited = 0
+        while sitemaps and visited <= max_sitemaps:
+            sitemap_url = sitemaps.pop(0)
+            visited += 1
+            try:
+                response = await http.get(sitemap_url)
+                if response.status_code != 200:
+                    continue
+            except httpx.HTTPError as e:
+                Actor.log.debug(f"Could not fetch sitemap {sitemap_url}: {str(e)}")
+                continue
+            for loc in LOC_PATTERN.findall(response.text):
+                if loc.lower().endswith(".xml") or "sitemap" in loc.lower():
+                    # A sitemap index can point anywhere, only follow the company's own sitemaps
+                    if _on_site(loc, host):
+                        sitemaps.append(loc)
+                elif _host(loc) == host:
+                    add(loc)
+
+        try:
+            response = await http.get(homepage)
+            for href in HREF_PATTERN.findall(response.text):
+                link = urljoin(str(response.url), href.strip())
+                if link.startswith("http") and _host(link) == host:
+                    add(link)
+        except httpx.HTTPError as e:
+            Actor.log.warning(f"Could not fetch homepage {homepage}: {str(e)}")
+
+    return list(found.values())
+
+async def crawl_key_pages(
+    client,
+    url: str,
+    max_pages: int = 10,
+    pages=None,
+) -> list[dict[str, str]]:
+    """Crawl only the highest-value pages of a website (About, Team, Pricing, Careers, Investors, Contact, ...).
+
+    Args:
+        client: The Apify client for making API calls.
+        url: The URL of the website.
+        max_pages: Maximum number of pages to crawl.
+        pages: Optional PageContentStore. Selected pages that are still fresh in it are not
+            crawled again, and crawled pages are written to it.
+
+    Returns:
+        A list of dictionaries containing url, title, and markdown content for each crawled page.
+    """
+    candidates = await discover_candidate_urls(url)
+    ranked = sorted(candidates, key=score_url, reverse=True)
+    selected = [u for u in ranked if score_url(u) > 0][:max_pages] or ranked[:1]
+
+    cached = await pages.get_many(selected) if pages is not None else {}
+    to_crawl = [u for u in selected if u not in cached]
+    Actor.log.info(f"Crawling {len(to_crawl)} of {len(candidates)} discovered pages for {url} ({len(cached)} served from the page store): {to_crawl}")
+    if not to_crawl:
+        return list(cached.values())
+
+    run_input = {
+        "startUrls": [{"url": u} for u in to_crawl],
+        "crawlerType": "cheerio",
+        "maxCrawlDepth": 0,
+        "maxCrawlPages": len(to_crawl),
+    }
+
+    try:
+        run = await client.actor("apify/website-content-crawler").call(run_input=run_input, memory_mbytes=1024)
+        dataset = await client.dataset(run["defaultDatasetId"]).list_items()
+
+        results = []
+        for item in dataset.items:
+            if 'url' in item and 'metadata' in item and 'markdown' in item:
+                results.append({
+                    "url": item['url'],
+                    "title": item['metadata']['title'],
+                    "markdown": item['markdown']
+                })
+
+        if pages is not None:
+            await pages.put_many(results, "crawl_key_pages")
+        return list(cached.values()) + results
+
+    except SourceUnavailableError:
+        raise
+    except Exception as e:
+        Actor.log.error(f"Error crawling key pages: {str(e)}")
+        return list(cached.values())
@@ -1,5 +1,6 @@
 from apify import Actor
 from typing import List, Dict, Union, Optional
+from ..utils import SourceUnavailableError
 
 async def get_indeed_jobs(
     client,
@@ -59,6 +60,8 @@ async def get_indeed_jobs(
             return jobs
         return []
 
+    except SourceUnavailableError:
+        raise
     except Exception as e:
         Actor.log.error(f"Error fetching Indeed jobs: {str(e)}")
         return [] 
\ No newline at end of file
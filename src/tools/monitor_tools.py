@@ -0,0 +1,73 @@
+import asyncio
+from apify import Actor
+from typing import Any, Dict, Optional
+
+from .crawl_tools import crawl_website
+from .search_tools import search_google
+from .job_tools import get_indeed_jobs
+from .review_tools import get_trustpilot_reviews
+from .analytics_tools import get_similarweb_results
+from ..analysis.change_detection import content_hash
+from ..analysis.competitor_analysis import domain_of
+from ..utils import SourceUnavailableError
+
+async def collect_signals(
+    client,
+    company_name: str,
+    website: Optional[str] = None,
+    indeed_url: Optional[str] = None,
+    max_jobs: int = 50,
+    max_reviews: int = 20,
+) -> Dict[str, Any]:
+    """Fetch cheap signals that indicate whether a company changed since its last report.
+
+    All signals are fetched concurrently. A signal that cannot be fetched (no website, no Indeed
+    page, scraper error or open circuit breaker) is None, so it never registers as a change.
+
+    Args:
+        client: The Apify client for making API calls.
+        company_name: The name of the company.
+        website: The company website, needed for the homepage, Trustpilot and Similarweb signals.
+        indeed_url: The Indeed company page URL, needed for the job count.
+        max_jobs: Maximum number of job listings to count.
+        max_reviews: Number of recent Trustpilot reviews to average.
+
+    Returns:
+        A dictionary containing:
+        - homepage_hash: Hash of the homepage content
+        - news_urls: URLs of the top news search results
+        - job_count: Number of open positions on Indeed (capped at max_jobs)
+        - trustpilot_rating: Average rating of the most recent Trustpilot reviews
+        - visits: Total visits according to Similarweb
+        - result_count: Number of scraped items, for charging
+    """
+    Actor.log.info(f"Collecting monitoring signals for {company_name}")
+    domain = domain_of(website) if website else ""
+
+    async def nothing():
+        return None
+
+    async def signal(fetch):
+        try:
+            return await fetch
+        except SourceUnavailableError as e:
+            Actor.log.warning(str(e))
+            return None
+
+    homepage, news, jobs, reviews, similarweb = await asyncio.gather(
+        signal(crawl_website(client, website, 0, 1)) if website else nothing(),
+        signal(search_google(client, f"{company_name} news", 10)),
+        signal(get_indeed_jobs(client, indeed_url, max_jobs)) if indeed_url else nothing(),
+        signal(get_trustpilot_reviews(client, domain, max_reviews)) if domain else nothing(),
+        signal(get_similarweb_results(client, domain)) if domain else nothing(),
+    )
+
+    ratings = [r["ratingValue"] for r in reviews or [] if r.get("ratingValue")]
+    return {
+        "homepage_hash": content_hash(homepage[0]["markdown"]) if homepage else None,
+        "news_urls": [r["url"] for r in news] if news else None,
+        "job_count": len(jobs) if jobs else None,
+        "trustpilot_rating": round(sum(ratings) / len(ratings), 2) if ratings else None,
+        "visits": (similarweb or {}).get("totalVisits") or None,
+        "result_count": sum(len(r) for r in (homepage, news, jobs, reviews) if r) + int(bool(similarweb)),
+    }
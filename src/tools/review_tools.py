@@ -1,5 +1,6 @@
 from apify import Actor
 from typing import List, Dict, Union
+from ..utils import SourceUnavailableError
 
 async def get_trustpilot_reviews(
     client,
@@ -62,6 +63,8 @@ async def get_trustpilot_reviews(
             Actor.log.warning(f"No Trustpilot reviews retrieved for {company_domain}")
             return []
         
+    except SourceUnavailableError:
+        raise
     except Exception as e:
         Actor.log.error(f"Error fetching Trustpilot reviews for {company_domain}: {str(e)}")
         return [] 
\ No newline at end of file
@@ -1,10 +1,12 @@
 from apify import Actor
 from typing import List, Dict, Union, Any
+from ..utils import SourceUnavailableError
 
 async def search_google(
     client,
     query: str, 
-    max_results: int = 10
+    max_results: int = 10,
+    pages=None
 ) -> List[Dict[str, str]]:
     """Get Google search results.
 
@@ -16,12 +18,21 @@ async def search_google(
               - Advanced operators: "function calling site:openai.com"
         max_results: Maximum number of top organic search results to fetch (default: 10).
                     If query is a URL, this parameter is ignored.
+        pages: Optional PageContentStore. A URL query is served from it when the page is fresh,
+               and all result pages are written to it.
 
     Returns:
         A list of dictionaries containing url, title, and markdown content for each result.
     """
     Actor.log.info(
         f"Searching Google for: {query} (max results: {max_results})")
+
+    if pages is not None and query.strip().startswith(("http://", "https://")):
+        cached = await pages.get(query.strip())
+        if cached is not None:
+            Actor.log.info(f"Serving {query} from the page store")
+            return [cached]
+
     run_input = {
         "query": query,
         "maxResults": max_results,
@@ -41,8 +52,12 @@ async def search_google(
                     "markdown": item['markdown']
                 })
 
+        if pages is not None:
+            await pages.put_many(results, "search_google")
         return results
 
+    except SourceUnavailableError:
+        raise
     except Exception as e:
         Actor.log.error(f"Error fetching search results: {str(e)}")
         return []
@@ -125,6 +140,8 @@ async def search_google_maps(
 
         return results
 
+    except SourceUnavailableError:
+        raise
     except Exception as e:
         Actor.log.error(f"Error fetching Google Maps results: {str(e)}")
         return [] 
\ No newline at end of file
@@ -1,5 +1,6 @@
 from apify import Actor
 from typing import Dict, Any, List
+from ..utils import SourceUnavailableError
 
 async def get_linkedin_company_profile(
     client,
@@ -43,6 +44,8 @@ async def get_linkedin_company_profile(
             }
         return {}
 
+    except SourceUnavailableError:
+        raise
     except Exception as e:
         Actor.log.error(f"Error fetching LinkedIn company profile: {str(e)}")
         return {} 
\ No newline at end of file
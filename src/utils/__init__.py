@@ -1,5 +1,30 @@
 from .api_utils import fetch_api_key
+from .history_compaction import CompactingModel
+from .context_cache import CachingGeminiModel, GeminiContextCache, LocalContextCache
+from .http_client import SharedHttpPool
+from .batching import BatchingApifyClient
+from .plan_executor import execute_plan, validate_plan
+from .tool_budget import ToolBudget, ToolCostModel, BudgetExhaustedError, TOOL_LIMITS
+from .actor_profiles import ActorProfiles
+from .circuit_breaker import ActorRunError, CircuitBreaker, CircuitBreakerRegistry, SourceUnavailableError
 
 __all__ = [
-    'fetch_api_key'
+    'fetch_api_key',
+    'CompactingModel',
+    'CachingGeminiModel',
+    'GeminiContextCache',
+    'LocalContextCache',
+    'SharedHttpPool',
+    'CircuitBreaker',
+    'CircuitBreakerRegistry',
+    'SourceUnavailableError',
+    'ActorRunError',
+    'BatchingApifyClient',
+    'execute_plan',
+    'validate_plan',
+    'ToolBudget',
+    'ToolCostModel',
+    'BudgetExhaustedError',
+    'TOOL_LIMITS',
+    'ActorProfiles'
 ] 
\ No newline at end of file
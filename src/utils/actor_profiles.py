@@ -0,0 +1,198 @@
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from apify import Actor
+
+from .circuit_breaker import ACTOR_WAIT_SECS, ActorRunError
+from .tool_budget import ACTOR_CURVE_PREFIX, ToolCostCurve, ToolCostModel
+
+# Measured runs of an actor before its profile replaces the baseline memory and timeout
+MIN_MEASURED_RUNS = 5
+
+# Memory sizes Apify accepts for a run
+MEMORY_TIERS = (128, 256, 512, 1024, 2048, 4096, 8192)
+
+# Memory every run gets at least and at most, per actor
+MEMORY_RANGE: Dict[str, Tuple[int, int]] = {
+    "apify/website-content-crawler": (512, 4096),
+    "apify/rag-web-browser": (256, 2048),
+    "compass/crawler-google-places": (512, 4096),
+    "icypeas_official/linkedin-company-scraper": (128, 512),
+    "misceres/indeed-scraper": (256, 2048),
+    "nikita-sviridenko/trustpilot-reviews-scraper": (256, 2048),
+    "tri_angle/similarweb-scraper": (512, 2048),
+}
+
+# Size of a run's job, read from its input
+INPUT_SIZE: Dict[str, Callable[[Dict[str, Any]], int]] = {
+    "apify/website-content-crawler": lambda i: int(i.get("maxCrawlPages") or len(i.get("startUrls") or [])),
+    "apify/rag-web-browser": lambda i: int(i.get("maxResults") or 1),
+    "compass/crawler-google-places": lambda i: len(i.get("searchStringsArray") or []) * (1 + int(i.get("maxReviews") or 0) // 10),
+    "icypeas_official/linkedin-company-scraper": lambda i: len(i.get("linkedinUrls") or []),
+    "misceres/indeed-scraper": lambda i: int(i.get("maxItemsPerSearch") or 1),
+    "nikita-sviridenko/trustpilot-reviews-scraper": lambda i: int(i.get("count") or 1),
+    "tri_angle/similarweb-scraper": lambda i: len(i.get("websites") or []),
+}
+
+# Final statuses of runs that were stopped before finishing, so their run time is only a lower bound
+UNFINISHED_STATUSES = ("TIMED-OUT", "ABORTED", "READY", "RUNNING")
+
+# Starting profiles (start-up seconds, seconds per job item at 1024 MB) until runs have been measured
+PRIOR_PROFILES: Dict[str, Tuple[float, float]] = {
+    "apify/website-content-crawler": (15.0, 3.0),
+    "apify/rag-web-browser": (6.0, 0.5),
+    "compass/crawler-google-places": (20.0, 8.0),
+    "icypeas_official/linkedin-company-scraper": (10.0, 0.5),
+    "misceres/indeed-scraper": (15.0, 0.2),
+    "nikita-sviridenko/trustpilot-reviews-scraper": (10.0, 0.2),
+    "tri_angle/similarweb-scraper": (20.0, 4.0),
+}
+
+class ProfiledActorClient:
+    """Actor client whose call() picks memory and timeout from the actor's profile and records the run time."""
+
+    def __init__(self, profiles: "ActorProfiles", client, actor_id: str):
+        self._profiles = profiles
+        self._actor = client.actor(actor_id)
+        self._actor_id = actor_id
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._actor, name)
+
+    async def call(self, run_input: Optional[Dict[str, Any]] = None, memory_mbytes: Optional[int] = None, **kwargs) -> Optional[Dict[str, Any]]:
+        size = self._profiles.input_size(self._actor_id, run_input or {})
+        memory_mbytes, wait_secs = self._profiles.choose(self._actor_id, size, memory_mbytes)
+        kwargs.setdefault("wait_secs", wait_secs)
+        started = time.monotonic()
+        try:
+            run = await self._actor.call(run_input=run_input, memory_mbytes=memory_mbytes, **kwargs)
+        except ActorRunError as e:
+            if e.status in UNFINISHED_STATUSES:
+                self._profiles.record_unfinished(self._actor_id, size, memory_mbytes, self._run_seconds(e.run, started))
+            raise
+        status = (run or {}).get("status")
+        if status == "SUCCEEDED":
+            self._profiles.record(self._actor_id, size, memory_mbytes, self._run_seconds(run, started))
+        elif status in UNFINISHED_STATUSES:
+            self._profiles.record_unfinished(self._actor_id, size, memory_mbytes, self._run_seconds(run, started))
+        return run
+
+    @staticmethod
+    def _run_seconds(run: Optional[Dict[str, Any]], started: float) -> float:
+        return ((run or {}).get("stats") or {}).get("runTimeSecs") or time.monotonic() - started
+
+class ProfiledApifyClient:
+    """Apify client proxy that sizes every actor run with the learned actor profiles."""
+
+    def __init__(self, profiles: "ActorProfiles", client):
+        self._profiles = profiles
+        self._client = client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    def actor(self, actor_id: str) -> ProfiledActorClient:
+        return ProfiledActorClient(self._profiles, self._client, actor_id)
+
+class ActorProfiles:
+    """Learned memory and timeout profiles of the Apify actors, shared by every research run of the process.
+
+    Apify CPU scales with memory, so a run's time is modeled as a start-up time plus a per-item
+    time that shrinks in proportion to memory. Each run gets the smallest memory expected to
+    finish its job within target_secs, and a timeout of twice the expected time. The profiles
+    are fitted from measured runs, with timed out and aborted runs as lower bounds, and kept in
+    the shared ToolCostModel, which persists them. Until an actor has MIN_MEASURED_RUNS
+    measured runs, its runs keep the memory the tool asks for and the longest timeout.
+
+    Args:
+        costs: The shared cost model the run-time curves are kept in.
+        target_secs: Run time to size memory for.
+        max_wait_secs: Longest timeout of a run (actors with a longer fixed timeout keep theirs).
+        memory_overrides: Fixed memory per actor ID, taking precedence over the profiles.
+        wait_overrides: Fixed timeout in seconds per actor ID, taking precedence over the profiles.
+    """
+
+    def __init__(
+        self,
+        costs: Optional[ToolCostModel] = None,
+        target_secs: float = 120,
+        max_wait_secs: int = 300,
+        memory_overrides: Optional[Dict[str, int]] = None,
+        wait_overrides: Optional[Dict[str, int]] = None,
+    ):
+        self.costs = costs or ToolCostModel()
+        self.target_secs = target_secs
+        self.max_wait_secs = max_wait_secs
+        self.memory_overrides = memory_overrides or {}
+        self.wait_overrides = wait_overrides or {}
+        self.runs: Dict[str, int] = {}
+
+    def curve(self, actor_id: str) -> ToolCostCurve:
+        fixed, per_item = PRIOR_PROFILES.get(actor_id, (15.0, 1.0))
+        return self.costs.curve(ACTOR_CURVE_PREFIX + actor_id, (fixed, per_item, 0.0))
+
+    def measured(self, actor_id: str) -> bool:
+        """Whether the actor's profile is based on enough measured runs to size its runs."""
+        return self.curve(actor_id).observations >= MIN_MEASURED_RUNS
+
+    @staticmethod
+    def input_size(actor_id: str, run_input: Dict[str, Any]) -> int:
+        try:
+            return max(INPUT_SIZE[actor_id](run_input), 1) if actor_id in INPUT_SIZE else 1
+        except (TypeError, ValueError):
+            return 1
+
+    def predict(self, actor_id: str, size: int, memory_mbytes: int) -> float:
+        """Expected run time in seconds of a job of the given size."""
+        return self.curve(actor_id).seconds(size * 1024 / memory_mbytes)
+
+    def choose(self, actor_id: str, size: int, default_memory: Optional[int] = None) -> Tuple[int, int]:
+        """Pick the memory and timeout of a run.
+
+        Returns:
+            The memory in MB and the timeout in seconds.
+        """
+        ceiling = max(self.max_wait_secs, ACTOR_WAIT_SECS.get(actor_id, 0))
+        if not self.measured(actor_id):
+            # The priors are guesses: keep the baseline memory and wait as long as before
+            return self.memory_overrides.get(actor_id, default_memory or 1024), self.wait_overrides.get(actor_id, ceiling)
+
+        low, high = MEMORY_RANGE.get(actor_id, (default_memory or 1024, default_memory or 1024))
+        tiers = [m for m in MEMORY_TIERS if low <= m <= high] or [default_memory or 1024]
+        memory = next((m for m in tiers if self.predict(actor_id, size, m) <= self.target_secs), tiers[-1])
+        memory = self.memory_overrides.get(actor_id, memory)
+
+        wait_secs = int(min(max(2 * self.predict(actor_id, size, memory) + 30, 60), ceiling))
+        return memory, self.wait_overrides.get(actor_id, wait_secs)
+
+    def record(self, actor_id: str, size: int, memory_mbytes: int, seconds: float) -> None:
+        """Teach the actor's profile the run time of a finished run."""
+        self.curve(actor_id).observe(size * 1024 / memory_mbytes, seconds, 0, 0)
+        self.runs[actor_id] = self.runs.get(actor_id, 0) + 1
+
+    def record_unfinished(self, actor_id: str, size: int, memory_mbytes: int, seconds: float) -> None:
+        """Teach the actor's profile that a run stopped after seconds (timed out or aborted) would have taken longer.
+
+        The run time is a lower bound, so it is only learned when the profile predicts less,
+        which raises the predicted time and with it the timeout of the next runs.
+        """
+        if seconds > self.predict(actor_id, size, memory_mbytes):
+            Actor.log.info(f"Run of {actor_id} stopped after {seconds:.0f}s, longer than predicted, raising its profile")
+            self.record(actor_id, size, memory_mbytes, seconds)
+
+    def wrap(self, client) -> ProfiledApifyClient:
+        """Wrap an Apify client so its actor runs are sized by the profiles."""
+        return ProfiledApifyClient(self, client)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        stats = {}
+        for name, curve in self.costs.curves.items():
+            if not name.startswith(ACTOR_CURVE_PREFIX):
+                continue
+            actor_id = name[len(ACTOR_CURVE_PREFIX):]
+            fixed, per_item = curve.coefficients()
+            stats[actor_id] = {
+                "startup_secs": round(fixed, 1), "secs_per_item_at_1gb": round(per_item, 2),
+                "runs": self.runs.get(actor_id, 0), "measured": self.measured(actor_id),
+            }
+        return stats
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from apify import Actor
+
+from ..analysis.competitor_analysis import domain_of
+
+# Routed items that were never read through dataset() are dropped after this long, or once there are too many
+RESULT_TTL_SECS = 900
+MAX_RESULTS = 1000
+
+class BatchSpec:
+    """How to merge single-input runs of an actor into one multi-input run and split its items again.
+
+    Args:
+        array_field: Run input field that holds the list of inputs.
+        normalize: Normalizes an input value so it can be matched against the items.
+        item_fields: Item fields that may hold the input an item belongs to.
+    """
+
+    def __init__(self, array_field: str, normalize: Callable[[Any], str], item_fields: Tuple[str, ...]):
+        self.array_field = array_field
+        self.normalize = normalize
+        self.item_fields = item_fields
+
+# Actors whose dataset items can be traced back to the input they were scraped for.
+# The LinkedIn scraper, the crawlers and the Indeed scraper are not batched: their items
+# cannot be reliably attributed to one input, or their limits apply to the whole run.
+BATCH_SPECS = {
+    "compass/crawler-google-places": BatchSpec("searchStringsArray", lambda v: str(v).strip().lower(), ("searchString",)),
+    "tri_angle/similarweb-scraper": BatchSpec("websites", lambda v: domain_of(str(v)), ("url", "domain", "site", "name")),
+}
+
+class _ListPage:
+    """The part of the Apify client's ListPage the tools use."""
+
+    def __init__(self, items: List[Dict[str, Any]]):
+        self.items = items
+        self.count = self.total = len(items)
+        self.offset = 0
+
+class _BatchedDataset:
+    def __init__(self, items: List[Dict[str, Any]]):
+        self._items = items
+
+    async def list_items(self, **kwargs) -> _ListPage:
+        return _ListPage(self._items)
+
+class _PendingBatch:
+    def __init__(self, actor_id: str, run_input: Dict[str, Any], memory_mbytes: Optional[int]):
+        self.actor_id = actor_id
+        self.run_input = run_input
+        self.memory_mbytes = memory_mbytes
+        self.requests: List[Tuple[str, "asyncio.Future"]] = []
+        self.flush_task: Optional[asyncio.Task] = None
+
+class BatchingActorClient:
+    """Actor client whose call() joins a pending multi-input run of the same actor."""
+
+    def __init__(self, batcher: "BatchingApifyClient", actor_id: str):
+        self._batcher = batcher
+        self._actor_id = actor_id
+        self._actor = batcher._client.actor(actor_id)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._actor, name)
+
+    async def call(self, run_input: Optional[Dict[str, Any]] = None, memory_mbytes: Optional[int] = None, **kwargs) -> Optional[Dict[str, Any]]:
+        spec = BATCH_SPECS.get(self._actor_id)
+        values = (run_input or {}).get(spec.array_field) if spec else None
+        if not spec or kwargs or not isinstance(values, list) or len(values) != 1:
+            return await self._actor.call(run_input=run_input, memory_mbytes=memory_mbytes, **kwargs)
+        return await self._batcher.submit(self._actor_id, spec, run_input, memory_mbytes)
+
+class BatchingApifyClient:
+    """Apify client proxy that merges concurrent single-input actor calls into multi-input runs.
+
+    Calls to a batchable actor wait up to window_secs for other calls with the same run options
+    (everything except the input list). They are then sent as one run, so the actor start is
+    paid once per batch. Each caller gets a run whose dataset only holds the items of its own
+    input, so tool code reads results exactly as from an unbatched run. The proxy is shared by
+    all research runs of the process, so concurrent batch and standby requests are batched too.
+    """
+
+    def __init__(self, client, window_secs: float = 0.3, max_batch_size: int = 10):
+        self._client = client
+        self.window_secs = window_secs
+        self.max_batch_size = max_batch_size
+        self._pending: Dict[str, _PendingBatch] = {}
+        # Routed items per synthetic dataset id, with the time they expire, oldest first
+        self._results: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self.stats = {"calls": 0, "runs": 0, "runs_saved": 0}
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    def actor(self, actor_id: str) -> BatchingActorClient:
+        return BatchingActorClient(self, actor_id)
+
+    def dataset(self, dataset_id: str) -> Any:
+        if dataset_id in self._results:
+            return _BatchedDataset(self._results.pop(dataset_id)[1])
+        return self._client.dataset(dataset_id)
+
+    def _store_result(self, items: List[Dict[str, Any]]) -> str:
+        """Keep the routed items of one caller until it reads them, dropping expired and excess entries."""
+        now = time.monotonic()
+        while self._results and (len(self._results) >= MAX_RESULTS or next(iter(self._results.values()))[0] < now):
+            self._results.popitem(last=False)
+        dataset_id = f"batched-{uuid.uuid4().hex}"
+        self._results[dataset_id] = (now + RESULT_TTL_SECS, items)
+        return dataset_id
+
+    async def submit(self, actor_id: str, spec: BatchSpec, run_input: Dict[str, Any], memory_mbytes: Optional[int]) -> Dict[str, Any]:
+        """Add a single-input call to the pending batch of its actor and options, and wait for the batch run."""
+        options = {k: v for k, v in run_input.items() if k != spec.array_field}
+        group = f"{actor_id}|{memory_mbytes}|{json.dumps(options, sort_keys=True, default=str)}"
+        batch = self._pending.get(group)
+        if batch is None:
+            batch = self._pending[group] = _PendingBatch(actor_id, options, memory_mbytes)
+            batch.flush_task = asyncio.create_task(self._flush_after(group, batch, spec))
+
+        future = asyncio.get_running_loop().create_future()
+        batch.requests.append((run_input[spec.array_field][0], future))
+        self.stats["calls"] += 1
+        if len(batch.requests) >= self.max_batch_size:
+            batch.flush_task.cancel()
+            self._pending.pop(group, None)
+            asyncio.create_task(self._run(batch, spec))
+        return await future
+
+    async def _flush_after(self, group: str, batch: _PendingBatch, spec: BatchSpec) -> None:
+        await asyncio.sleep(self.window_secs)
+        if self._pending.get(group) is batch:
+            del self._pending[group]
+            await self._run(batch, spec)
+
+    async def _run(self, batch: _PendingBatch, spec: BatchSpec) -> None:
+        values = list(dict.fromkeys(value for value, _ in batch.requests))
+        self.stats["runs"] += 1
+        self.stats["runs_saved"] += len(batch.requests) - 1
+        if len(batch.requests) > 1:
+            Actor.log.info(f"Batching {len(batch.requests)} calls of {batch.actor_id} into one run")
+        try:
+            run = await self._client.actor(batch.actor_id).call(
+                run_input={**batch.run_input, spec.array_field: values},
+                memory_mbytes=batch.memory_mbytes,
+            )
+            if run is None:
+                raise RuntimeError(f"Batched run of {batch.actor_id} returned no run")
+            items = (await self._client.dataset(run["defaultDatasetId"]).list_items()).items
+
+            # Route every item to the input it was scraped for
+            routed: Dict[str, List[Dict[str, Any]]] = {spec.normalize(v): [] for v in values}
+            for item in items:
+                for field in spec.item_fields:
+                    key = spec.normalize(item.get(field) or "")
+                    if key in routed:
+                        routed[key].append(item)
+                        break
+                else:
+                    if len(routed) == 1:
+                        next(iter(routed.values())).append(item)
+
+            for value, future in batch.requests:
+                if not future.done():
+                    future.set_result({**run, "defaultDatasetId": self._store_result(routed[spec.normalize(value)])})
+        except Exception as e:
+            for _, future in batch.requests:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            # Never leave a caller waiting, e.g. when the batch run itself is cancelled
+            for _, future in batch.requests:
+                if not future.done():
+                    future.cancel()
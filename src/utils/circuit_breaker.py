@@ -0,0 +1,237 @@
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from apify import Actor
+
+BREAKER_STORE_NAME = "company-research-breakers"
+BREAKER_STATE_KEY = "BREAKERS"
+
+# Slower scrapers get more time before a run counts as timed out
+ACTOR_WAIT_SECS = {
+    "apify/website-content-crawler": 600,
+    "compass/crawler-google-places": 450,
+}
+
+class SourceUnavailableError(Exception):
+    """Raised instead of calling an Apify actor whose circuit breaker is open."""
+
+    def __init__(self, actor_id: str, retry_in: float):
+        self.actor_id = actor_id
+        self.retry_in = retry_in
+        super().__init__(f"Source {actor_id} is temporarily unavailable after repeated failures (retry in {retry_in:.0f}s). Do not call this tool again in this run.")
+
+class ActorRunError(RuntimeError):
+    """Raised when an actor run did not succeed, with the run and its final status.
+
+    A status of "TIMED-OUT" with timed_out_here set means the run was still going when its
+    wait_secs ran out and was aborted by this process.
+    """
+
+    def __init__(self, actor_id: str, status: Optional[str], run: Optional[Dict[str, Any]] = None, timed_out_here: bool = False):
+        self.actor_id = actor_id
+        self.status = status
+        self.run = run
+        self.timed_out_here = timed_out_here
+        super().__init__(f"Run of {actor_id} ended with status {status}")
+
+class CircuitBreaker:
+    """Failure counter of one Apify actor.
+
+    The breaker opens after failure_threshold consecutive failed or timed out runs and rejects
+    calls until cooldown_seconds have passed. Then it lets a single trial call through
+    (half-open): a success closes it again, a failure reopens it for another cooldown.
+    """
+
+    def __init__(self, actor_id: str, failure_threshold: int = 3, cooldown_seconds: float = 300):
+        self.actor_id = actor_id
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_running = False
+        self.last_error = ""
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "open" if time.time() - self.opened_at < self.cooldown_seconds else "half-open"
+
+    def retry_in(self) -> float:
+        return max(self.cooldown_seconds - (time.time() - (self.opened_at or 0)), 0)
+
+    def allow(self) -> Tuple[bool, bool]:
+        """Whether a call may go through now, and whether it claimed the trial call of a half-open breaker."""
+        state = self.state
+        if state == "closed":
+            return True, False
+        if state == "half-open" and not self.trial_running:
+            self.trial_running = True
+            return True, True
+        self.rejected += 1
+        return False, False
+
+    def record_success(self) -> bool:
+        """Reset the breaker. Returns whether it was open before."""
+        was_open = self.opened_at is not None
+        self.failures, self.opened_at, self.trial_running = 0, None, False
+        return was_open
+
+    def record_failure(self, error: str, trial: bool = False) -> bool:
+        """Count a failure. Returns whether the breaker opened because of it.
+
+        Only the failed trial call reopens a half-open breaker. A call that started before the
+        breaker opened and fails late does not restart the cooldown.
+        """
+        self.failures += 1
+        self.last_error = error
+        if trial:
+            self.trial_running = False
+        if trial or (self.opened_at is None and self.failures >= self.failure_threshold):
+            self.opened_at = time.time()
+            return True
+        return False
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"failures": self.failures, "opened_at": self.opened_at, "last_error": self.last_error}
+
+class GuardedActorClient:
+    """Actor client whose call() goes through the actor's circuit breaker."""
+
+    def __init__(self, registry: "CircuitBreakerRegistry", client, actor_id: str):
+        self._registry = registry
+        self._client = client
+        self._actor = client.actor(actor_id)
+        self._actor_id = actor_id
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._actor, name)
+
+    async def call(self, **kwargs) -> Optional[Dict[str, Any]]:
+        breaker, trial = self._registry.check(self._actor_id)
+        kwargs.setdefault("wait_secs", ACTOR_WAIT_SECS.get(self._actor_id, self._registry.wait_secs))
+        try:
+            try:
+                run = await self._actor.call(**kwargs)
+            except Exception as e:
+                await self._registry.record(breaker, f"{type(e).__name__}: {str(e)}", trial)
+                raise
+
+            status = (run or {}).get("status")
+            if status == "SUCCEEDED":
+                await self._registry.record(breaker)
+                return run
+            timed_out_here = bool(run) and status in ("READY", "RUNNING")
+            if timed_out_here:
+                # Still running after the wait limit: stop paying for it
+                try:
+                    await self._client.run(run["id"]).abort()
+                except Exception as e:
+                    Actor.log.warning(f"Could not abort run {run['id']} of {self._actor_id}: {str(e)}")
+                status = "TIMED-OUT"
+            # A hanging or slowed-down source counts as failing, so the breaker stops paying the full wait
+            await self._registry.record(breaker, f"run {status or 'missing'}", trial)
+            raise ActorRunError(self._actor_id, status, run, timed_out_here=timed_out_here)
+        finally:
+            if trial:
+                # A cancelled half-open trial records no outcome, let the next call be the trial
+                breaker.trial_running = False
+
+class GuardedApifyClient:
+    """Apify client proxy that guards actor calls with per-actor circuit breakers."""
+
+    def __init__(self, registry: "CircuitBreakerRegistry", client):
+        self._registry = registry
+        self._client = client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    def actor(self, actor_id: str) -> GuardedActorClient:
+        return GuardedActorClient(self._registry, self._client, actor_id)
+
+class CircuitBreakerRegistry:
+    """Circuit breakers of all Apify actors, shared by every research run of the process.
+
+    Open breakers are persisted to a named key-value store so runs started during the cooldown
+    skip the degraded source too.
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown_seconds: float = 300, wait_secs: int = 300):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.wait_secs = wait_secs
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, actor_id: str) -> CircuitBreaker:
+        if actor_id not in self.breakers:
+            self.breakers[actor_id] = CircuitBreaker(actor_id, self.failure_threshold, self.cooldown_seconds)
+        return self.breakers[actor_id]
+
+    def reject_if_open(self, actor_id: str) -> None:
+        """Raise SourceUnavailableError while the actor's breaker is open, without claiming a half-open trial."""
+        breaker = self.get(actor_id)
+        if breaker.state == "open":
+            breaker.rejected += 1
+            raise SourceUnavailableError(actor_id, breaker.retry_in())
+
+    def check(self, actor_id: str) -> Tuple[CircuitBreaker, bool]:
+        """Return the actor's breaker and whether the call claimed its half-open trial.
+
+        Raises:
+            SourceUnavailableError: If the breaker rejects the call.
+        """
+        breaker = self.get(actor_id)
+        allowed, trial = breaker.allow()
+        if not allowed:
+            raise SourceUnavailableError(actor_id, breaker.retry_in())
+        return breaker, trial
+
+    async def record(self, breaker: CircuitBreaker, error: Optional[str] = None, trial: bool = False) -> None:
+        """Record the outcome of a call and persist the breakers when one opened or closed.
+
+        Args:
+            breaker: Breaker of the called actor.
+            error: Description of the failure, or None if the call succeeded.
+            trial: Whether the call was the half-open trial claimed in check().
+        """
+        if error is None:
+            changed = breaker.record_success()
+            if changed:
+                Actor.log.info(f"Circuit breaker of {breaker.actor_id} closed")
+        else:
+            changed = breaker.record_failure(error, trial)
+            if changed:
+                Actor.log.warning(f"Circuit breaker of {breaker.actor_id} opened for {self.cooldown_seconds:.0f}s: {error}")
+        if changed:
+            await self.save()
+
+    def guard(self, client) -> GuardedApifyClient:
+        """Wrap an Apify client so its actor calls go through the breakers."""
+        return GuardedApifyClient(self, client)
+
+    async def load(self) -> None:
+        """Restore breakers that were opened by other runs and are still cooling down."""
+        try:
+            store = await Actor.open_key_value_store(name=BREAKER_STORE_NAME)
+            state = await store.get_value(BREAKER_STATE_KEY) or {}
+        except Exception as e:
+            Actor.log.warning(f"Could not load circuit breaker state: {str(e)}")
+            return
+        for actor_id, saved in state.items():
+            opened_at = saved.get("opened_at")
+            if opened_at and time.time() - opened_at < self.cooldown_seconds:
+                breaker = self.get(actor_id)
+                breaker.failures, breaker.opened_at, breaker.last_error = saved["failures"], opened_at, saved.get("last_error", "")
+                Actor.log.info(f"Source {actor_id} is unavailable for another {breaker.retry_in():.0f}s")
+
+    async def save(self) -> None:
+        try:
+            store = await Actor.open_key_value_store(name=BREAKER_STORE_NAME)
+            await store.set_value(BREAKER_STATE_KEY, {a: b.to_state() for a, b in self.breakers.items() if b.opened_at})
+        except Exception as e:
+            Actor.log.warning(f"Could not save circuit breaker state: {str(e)}")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {a: {"state": b.state, "failures": b.failures, "rejected": b.rejected} for a, b in self.breakers.items()}
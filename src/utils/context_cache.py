@@ -0,0 +1,239 @@
+import hashlib
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from apify import Actor
+from httpx import USE_CLIENT_DEFAULT, Response as HTTPResponse
+from pydantic_ai import ModelHTTPError, UnexpectedModelBehavior
+from pydantic_ai.messages import ModelMessage, ModelResponse
+from pydantic_ai.models import ModelRequestParameters, get_user_agent
+# _make_request mirrors GeminiModel._make_request of the pinned pydantic-ai version (see requirements.txt)
+from pydantic_ai.models.gemini import GeminiModel, GeminiModelSettings, _gemini_request_ta, _GeminiRequest, _GeminiTextContent
+from pydantic_ai.settings import ModelSettings
+from pydantic_ai.usage import Usage
+
+# Rough characters-per-token ratio used to decide whether a prefix is worth caching
+CHARS_PER_TOKEN = 4
+
+# Request fields that must live in the cache instead of the request when a cache is referenced
+STATIC_FIELDS = ("system_instruction", "tools", "tool_config")
+
+# Caches are no longer used this many seconds before their TTL ends, so a request never races the expiry
+EXPIRY_MARGIN_SECS = 60
+
+# Statuses of a request whose cache was not found or is no longer valid; other errors (e.g. 429) are raised
+CACHE_REJECTED_STATUSES = (400, 403, 404)
+
+class GeminiContextCache:
+    """Creates and deletes Gemini cachedContents resources through the REST API."""
+
+    def __init__(self, client, ttl_seconds: int = 600, base_url: str = "https://generativelanguage.googleapis.com/v1beta"):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.base_url = base_url
+
+    async def create(self, model_name: str, static: Dict[str, Any], contents: List[Dict[str, Any]]) -> Tuple[str, int]:
+        body = {"model": f"models/{model_name}", "contents": contents, "ttl": f"{self.ttl_seconds}s", **static}
+        response = await self.client.post(f"{self.base_url}/cachedContents", json=body)
+        if response.status_code != 200:
+            raise ModelHTTPError(status_code=response.status_code, model_name=model_name, body=response.text)
+        data = response.json()
+        return data["name"], int(data.get("usageMetadata", {}).get("totalTokenCount", 0))
+
+    async def delete(self, name: str) -> None:
+        await self.client.delete(f"{self.base_url}/{name}")
+
+class LocalContextCache:
+    """In-memory stand-in for GeminiContextCache, for tests and offline runs.
+
+    It keeps the cached payloads so tests can check what would have been cached, and
+    estimates the token count from the payload size.
+    """
+
+    def __init__(self, ttl_seconds: int = 600):
+        self.ttl_seconds = ttl_seconds
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+    async def create(self, model_name: str, static: Dict[str, Any], contents: List[Dict[str, Any]]) -> Tuple[str, int]:
+        name = f"cachedContents/local-{len(self.entries) + 1}"
+        self.entries[name] = {"model": model_name, "contents": contents, **static}
+        return name, len(json.dumps(self.entries[name])) // CHARS_PER_TOKEN
+
+    async def delete(self, name: str) -> None:
+        self.entries.pop(name, None)
+
+class CachingGeminiModel(GeminiModel):
+    """Gemini model that moves the stable prefix of each request into a provider-side context cache.
+
+    The system prompt, tool declarations and the frozen part of the conversation (everything except
+    the latest turn) are cached once and referenced by name on later requests, so retries and late
+    turns only send the new tail. A new, longer cache is only created once the uncached tail grows
+    past min_new_cache_tokens. Explicit caching needs a versioned model name such as
+    "gemini-2.0-flash-001" and a prefix of at least min_cache_tokens.
+
+    Caches are only used until shortly before their TTL ends, after which a new one is created.
+    If the provider still rejects a request that references a cache (e.g. it was deleted), the
+    cache is dropped and the request is sent once more with the full prompt.
+    """
+
+    def __init__(self, model_name: str, *, cache=None, min_cache_tokens: int = 4096, min_new_cache_tokens: int = 8192, **kwargs):
+        super().__init__(model_name, **kwargs)
+        self.cache = cache or GeminiContextCache(self.client)
+        self.min_cache_tokens = min_cache_tokens
+        self.min_new_cache_tokens = min_new_cache_tokens
+        self._caches: List[Dict[str, Any]] = []
+        self._failed_keys: set = set()
+        self._last_cache: Optional[Dict[str, Any]] = None
+        self.cache_stats = {
+            "requests": 0,
+            "cached_requests": 0,
+            "caches_created": 0,
+            "cached_input_tokens": 0,
+            "uncached_input_tokens": 0,
+        }
+
+    @staticmethod
+    def _prefix_key(static: Dict[str, Any], contents: List[Dict[str, Any]]) -> str:
+        payload = json.dumps([static, contents], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def _select_cache(self, static: Dict[str, Any], contents: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Return the longest usable cache for this request, creating a new one when the uncached tail is large."""
+        now = time.monotonic()
+        self._caches = [entry for entry in self._caches if entry["expires_at"] > now]
+        best = None
+        for entry in sorted(self._caches, key=lambda e: e["contents"], reverse=True):
+            if entry["contents"] < len(contents) and entry["key"] == self._prefix_key(static, contents[:entry["contents"]]):
+                best = entry
+                break
+
+        cached_count = best["contents"] if best else 0
+        tail_tokens = len(json.dumps(contents[cached_count:])) // CHARS_PER_TOKEN
+        if best is not None and tail_tokens < self.min_new_cache_tokens:
+            return best
+
+        # Cache everything except the latest turn, which is what changes between requests
+        count = len(contents) - 1
+        prefix_tokens = len(json.dumps([static, contents[:count]])) // CHARS_PER_TOKEN
+        key = self._prefix_key(static, contents[:count])
+        if count <= cached_count or prefix_tokens < self.min_cache_tokens or key in self._failed_keys:
+            return best
+
+        ttl_seconds = getattr(self.cache, "ttl_seconds", 600)
+        try:
+            name, token_count = await self.cache.create(self.model_name, static, contents[:count])
+        except Exception as e:
+            Actor.log.warning(f"Could not create context cache, sending the full prompt: {str(e)}")
+            self._failed_keys.add(key)
+            return best
+
+        entry = {
+            "name": name,
+            "key": key,
+            "contents": count,
+            "tokens": token_count or prefix_tokens,
+            "expires_at": now + ttl_seconds - min(EXPIRY_MARGIN_SECS, ttl_seconds / 2),
+        }
+        self._caches.append(entry)
+        self.cache_stats["caches_created"] += 1
+        Actor.log.info(f"Created context cache {name} covering {count} messages (~{entry['tokens']} tokens)")
+        return entry
+
+    @asynccontextmanager
+    async def _make_request(
+        self,
+        messages: List[ModelMessage],
+        streamed: bool,
+        model_settings: GeminiModelSettings,
+        model_request_parameters: ModelRequestParameters,
+    ) -> AsyncIterator[HTTPResponse]:
+        tools = self._get_tools(model_request_parameters)
+        tool_config = self._get_tool_config(model_request_parameters, tools)
+        sys_prompt_parts, contents = await self._message_to_gemini_content(messages)
+
+        request_data = _GeminiRequest(contents=contents)
+        if sys_prompt_parts:
+            request_data['system_instruction'] = _GeminiTextContent(role='user', parts=sys_prompt_parts)
+        if tools is not None:
+            request_data['tools'] = tools
+        if tool_config is not None:
+            request_data['tool_config'] = tool_config
+
+        generation_config = {}
+        if model_settings:
+            for setting, field in (("max_tokens", "max_output_tokens"), ("temperature", "temperature"), ("top_p", "top_p"),
+                                   ("presence_penalty", "presence_penalty"), ("frequency_penalty", "frequency_penalty")):
+                if (value := model_settings.get(setting)) is not None:
+                    generation_config[field] = value
+            if (gemini_safety_settings := model_settings.get('gemini_safety_settings')) != []:
+                request_data['safety_settings'] = gemini_safety_settings
+        if generation_config:
+            request_data['generation_config'] = generation_config
+
+        body = _gemini_request_ta.dump_python(request_data, by_alias=True, mode="json")
+        static = {field: body.pop(field) for field in STATIC_FIELDS if field in body}
+        cache = self._last_cache = await self._select_cache(static, body["contents"])
+        full_body = {**body, **static}
+        bodies = [full_body]
+        if cache is not None:
+            bodies.insert(0, {**body, "contents": body["contents"][cache["contents"]:], "cached_content": cache["name"]})
+
+        headers = {
+            'Content-Type': 'application/json',
+            'User-Agent': get_user_agent(),
+        }
+        if self._provider is None:
+            url = self.url + ('streamGenerateContent' if streamed else 'generateContent')
+            headers.update(await self.auth.headers())
+        else:
+            url = f'/{self._model_name}:{"streamGenerateContent" if streamed else "generateContent"}'
+
+        for body in bodies:
+            async with self.client.stream(
+                'POST',
+                url,
+                content=json.dumps(body),
+                headers=headers,
+                timeout=model_settings.get('timeout', USE_CLIENT_DEFAULT),
+            ) as r:
+                if (status_code := r.status_code) != 200:
+                    await r.aread()
+                    if status_code in CACHE_REJECTED_STATUSES and body is not full_body:
+                        # The cache expired or was deleted: drop it and send the full prompt once
+                        Actor.log.warning(f"Request with context cache {cache['name']} failed ({status_code}), retrying without the cache")
+                        self._caches = [entry for entry in self._caches if entry is not cache]
+                        self._last_cache = None
+                        continue
+                    if status_code >= 400:
+                        raise ModelHTTPError(status_code=status_code, model_name=self.model_name, body=r.text)
+                    raise UnexpectedModelBehavior(f'Unexpected response from gemini {status_code}', r.text)
+                yield r
+                return
+
+    async def request(
+        self,
+        messages: List[ModelMessage],
+        model_settings: Optional[ModelSettings],
+        model_request_parameters: ModelRequestParameters,
+    ) -> Tuple[ModelResponse, Usage]:
+        response, usage = await super().request(messages, model_settings, model_request_parameters)
+
+        cached_tokens = (usage.details or {}).get("cached_content_token_count", 0)
+        if not cached_tokens and self._last_cache is not None:
+            cached_tokens = self._last_cache["tokens"]
+        self.cache_stats["requests"] += 1
+        self.cache_stats["cached_requests"] += 1 if self._last_cache is not None else 0
+        self.cache_stats["cached_input_tokens"] += cached_tokens
+        self.cache_stats["uncached_input_tokens"] += max((usage.request_tokens or 0) - cached_tokens, 0)
+        return response, usage
+
+    async def clear_caches(self) -> None:
+        """Delete every cache created by this model."""
+        for entry in self._caches:
+            try:
+                await self.cache.delete(entry["name"])
+            except Exception as e:
+                Actor.log.warning(f"Could not delete context cache {entry['name']}: {str(e)}")
+        self._caches = []
@@ -0,0 +1,112 @@
+import json
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Tuple
+
+from apify import Actor
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, ToolCallPart, ToolReturnPart
+from pydantic_ai.models import Model, ModelRequestParameters
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.settings import ModelSettings
+from pydantic_ai.usage import Usage
+
+# Rough characters-per-token ratio used to report savings without a tokenizer
+CHARS_PER_TOKEN = 4
+
+def _size(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value)
+    return len(json.dumps(value, default=str, ensure_ascii=False))
+
+def digest_value(value: Any, max_string: int = 200, max_items: int = 8, depth: int = 0) -> Any:
+    """Shrink a tool result while keeping its shape: long strings are cut, long lists are sampled."""
+    if isinstance(value, str):
+        return value if len(value) <= max_string else value[:max_string].rstrip() + "..."
+    if isinstance(value, list):
+        items = [digest_value(v, max_string, max_items, depth + 1) for v in value[:max_items]]
+        if len(value) > max_items:
+            items.append(f"... {len(value) - max_items} more items")
+        return items
+    if isinstance(value, dict):
+        if depth >= 3:
+            return {k: v for k, v in value.items() if isinstance(v, (int, float, bool)) or v is None}
+        return {k: digest_value(v, max_string, max_items, depth + 1) for k, v in value.items()}
+    return value
+
+class CompactingModel(WrapperModel):
+    """Model wrapper that compacts bulky tool returns in the history once the evidence phase is over.
+
+    The evidence phase ends when the model submits its first result (a call to the result tool).
+    From then on, every request (in practice, every report retry) is sent with tool returns older
+    than the most recent requests replaced by digests, and superseded report drafts replaced by a
+    short note. The original tool returns stay available through recall().
+    """
+
+    def __init__(self, wrapped: Model, keep_recent: int = 2, min_chars: int = 2000):
+        super().__init__(wrapped)
+        self.keep_recent = keep_recent
+        self.min_chars = min_chars
+        self.originals: Dict[str, Any] = {}
+        self.savings: List[Dict[str, int]] = []
+
+    def recall(self, tool_call_id: str) -> Optional[Any]:
+        """Return the original content of a compacted tool return."""
+        return self.originals.get(tool_call_id)
+
+    def _compact(self, messages: List[ModelMessage], result_tool_names: set) -> Tuple[List[ModelMessage], int, int, int]:
+        draft_ids = [
+            part.tool_call_id
+            for message in messages if isinstance(message, ModelResponse)
+            for part in message.parts if isinstance(part, ToolCallPart) and part.tool_name in result_tool_names
+        ]
+        if not draft_ids:
+            return messages, 0, 0, 0
+        superseded = set(draft_ids[:-1])
+
+        request_indexes = [i for i, m in enumerate(messages) if isinstance(m, ModelRequest)]
+        recent = set(request_indexes[-self.keep_recent:]) if self.keep_recent else set()
+
+        compacted, before, after, count = [], 0, 0, 0
+        for index, message in enumerate(messages):
+            if isinstance(message, ModelRequest) and index not in recent:
+                parts = []
+                for part in message.parts:
+                    if isinstance(part, ToolReturnPart) and part.tool_name not in result_tool_names:
+                        size = _size(part.content)
+                        if size >= self.min_chars:
+                            if part.tool_call_id:
+                                self.originals[part.tool_call_id] = part.content
+                            content = {
+                                "compacted": True,
+                                "note": f"Digest of a {size} character result, recall it with tool_recall_tool_result('{part.tool_call_id}')",
+                                "digest": digest_value(part.content),
+                            }
+                            before, after, count = before + size, after + _size(content), count + 1
+                            part = replace(part, content=content)
+                    parts.append(part)
+                message = replace(message, parts=parts)
+            elif isinstance(message, ModelResponse):
+                parts = []
+                for part in message.parts:
+                    if isinstance(part, ToolCallPart) and part.tool_call_id in superseded:
+                        size = _size(part.args)
+                        args = {"note": "Superseded report draft omitted, see the retry feedback that follows"}
+                        before, after, count = before + size, after + _size(args), count + 1
+                        part = replace(part, args=args)
+                    parts.append(part)
+                message = replace(message, parts=parts)
+            compacted.append(message)
+        return compacted, before, after, count
+
+    async def request(
+        self,
+        messages: List[ModelMessage],
+        model_settings: Optional[ModelSettings],
+        model_request_parameters: ModelRequestParameters,
+    ) -> Tuple[ModelResponse, Usage]:
+        result_tool_names = {tool.name for tool in model_request_parameters.result_tools}
+        compacted, before, after, count = self._compact(messages, result_tool_names)
+        if count:
+            saved_tokens = (before - after) // CHARS_PER_TOKEN
+            self.savings.append({"parts": count, "chars_before": before, "chars_after": after, "tokens_saved": saved_tokens})
+            Actor.log.info(f"Compacted {count} history parts from {before} to {after} characters (~{saved_tokens} tokens saved this turn)")
+        return await self.wrapped.request(compacted, model_settings, model_request_parameters)
@@ -0,0 +1,111 @@
+import importlib.util
+import weakref
+from typing import Any, Dict, Optional
+
+import httpx
+from apify import Actor
+
+class SharedHttpPool(httpx.AsyncBaseTransport):
+    """Long-lived, pooled HTTP transport shared by the Apify client and the model provider.
+
+    Every client built with client() sends its requests through the same connection pool, so
+    concurrent research runs in batch and standby mode reuse open (TLS) connections instead of
+    opening new ones per run. Each client keeps its own headers and base URL, so credentials of
+    one API are never sent to another. The pool counts requests and newly opened connections,
+    from which the connection reuse rate in stats() is derived.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+    ):
+        if http2 and importlib.util.find_spec("h2") is None:
+            Actor.log.warning("HTTP/2 requested but the h2 package is not installed, using HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+        self._transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=http2,
+        )
+        self._seen_connections = weakref.WeakSet()
+        self.requests = 0
+        self.connections_opened = 0
+        self.errors = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            self.errors += 1
+            raise
+        self.requests += 1
+        self._count_new_connections()
+        return response
+
+    def _count_new_connections(self) -> None:
+        pool = getattr(self._transport, "_pool", None)
+        for connection in getattr(pool, "connections", []):
+            if connection not in self._seen_connections:
+                self._seen_connections.add(connection)
+                self.connections_opened += 1
+
+    async def aclose(self) -> None:
+        # Clients built on the pool close it when they are closed; the pool outlives them
+        pass
+
+    async def close(self) -> None:
+        """Close every pooled connection."""
+        await self._transport.aclose()
+
+    def client(self, timeout: Optional[float] = None, **kwargs) -> httpx.AsyncClient:
+        """Create an httpx client that sends its requests through the shared pool.
+
+        Args:
+            timeout: Request timeout in seconds, None for no timeout.
+            **kwargs: Other httpx.AsyncClient arguments, such as headers or base_url.
+
+        Returns:
+            An AsyncClient using the pooled transport.
+        """
+        return httpx.AsyncClient(transport=self, timeout=timeout, **kwargs)
+
+    def attach_apify_client(self, client: Any) -> bool:
+        """Route the requests of an Apify API client (actor starts, run polling, dataset reads) through the pool.
+
+        Args:
+            client: An ApifyClientAsync, e.g. from Actor.new_client().
+
+        Returns:
+            Whether the client's HTTP client could be replaced.
+        """
+        http_client = getattr(client, "http_client", None)
+        current = getattr(http_client, "httpx_async_client", None)
+        if not isinstance(current, httpx.AsyncClient):
+            Actor.log.warning("Apify client does not expose its httpx client, it keeps its own connections")
+            return False
+        http_client.httpx_async_client = self.client(
+            timeout=current.timeout,
+            headers=current.headers,
+            follow_redirects=current.follow_redirects,
+        )
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the request, connection and reuse counts of the pool."""
+        self._count_new_connections()
+        reused = max(self.requests - self.connections_opened, 0)
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "reused_requests": reused,
+            "reuse_rate": round(reused / self.requests, 3) if self.requests else 0.0,
+            "errors": self.errors,
+            "http2": self.http2,
+        }
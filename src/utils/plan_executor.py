@@ -0,0 +1,161 @@
+import asyncio
+import inspect
+import time
+import typing
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from apify import Actor
+
+from ..models import PlanArgument, PlannedToolCall
+from ..analysis.field_extraction import URL_PATTERN
+
+def _iter_strings(value: Any):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _iter_strings(v)
+    elif isinstance(value, list):
+        for v in value:
+            yield from _iter_strings(v)
+
+def _find_field(value: Any, field: str) -> Any:
+    if isinstance(value, dict):
+        if value.get(field):
+            return value[field]
+        children = value.values()
+    elif isinstance(value, list):
+        children = value
+    else:
+        return None
+    for child in children:
+        found = _find_field(child, field)
+        if found:
+            return found
+    return None
+
+def resolve_binding(argument: PlanArgument, output: Any) -> Any:
+    """Take an argument's value from the output of the step it depends on.
+
+    Returns:
+        The first URL containing argument.match, the first value of argument.field, or the literal
+        value; None if the output does not contain it.
+    """
+    if argument.match:
+        needle = argument.match.lower()
+        for text in _iter_strings(output):
+            for url in URL_PATTERN.findall(text):
+                if needle in url.lower():
+                    return url.rstrip(".,;")
+        return None
+    if argument.field:
+        return _find_field(output, argument.field)
+    return argument.value
+
+def _convert(value: Any, annotation: Any) -> Any:
+    """Convert a string plan value to the type of the tool parameter."""
+    if not isinstance(value, str):
+        return value
+    types = typing.get_args(annotation) if typing.get_origin(annotation) is typing.Union else (annotation,)
+    for t in types:
+        if t is int:
+            return int(float(value))
+        if t is float:
+            return float(value)
+        if t is bool:
+            return value.strip().lower() in ("true", "1", "yes")
+        if t is list or typing.get_origin(t) is list:
+            return [v.strip() for v in value.split(",") if v.strip()]
+    return value
+
+def validate_plan(steps: List[PlannedToolCall], tools: Dict[str, Callable]) -> List[str]:
+    """Check a plan for unknown tools and arguments, missing or later dependencies, and duplicate IDs."""
+    problems, seen = [], set()
+    for step in steps:
+        if step.id in seen:
+            problems.append(f"Duplicate step ID {step.id}")
+        if step.tool not in tools:
+            problems.append(f"Step {step.id} uses unknown tool {step.tool} (available: {', '.join(tools)})")
+        else:
+            parameters = inspect.signature(tools[step.tool]).parameters
+            for argument in step.arguments:
+                if argument.name not in parameters:
+                    problems.append(f"Step {step.id}: {step.tool} has no argument {argument.name}")
+                if argument.from_step and argument.from_step not in seen:
+                    problems.append(f"Step {step.id} depends on {argument.from_step}, which is not an earlier step")
+        seen.add(step.id)
+    return problems
+
+async def execute_plan(
+    steps: List[PlannedToolCall],
+    tools: Dict[str, Callable[..., Awaitable[Any]]],
+    max_concurrency: int = 8,
+) -> Dict[str, Any]:
+    """Run a research plan as a dependency graph, starting every step as soon as its inputs are ready.
+
+    Steps may only depend on earlier steps, so the plan is acyclic by construction. A step whose
+    dependency failed or did not yield the bound value is skipped.
+
+    Args:
+        steps: The planned tool calls.
+        tools: Tool functions by plan tool name.
+        max_concurrency: Maximum number of tool calls running at the same time.
+
+    Returns:
+        A dictionary containing:
+        - steps: Per step ID the tool, resolved arguments, seconds taken and output (or error)
+        - wall_seconds: Time taken by the whole plan
+        - max_parallel: Highest number of tool calls that ran at the same time
+    """
+    problems = validate_plan(steps, tools)
+    if problems:
+        return {"error": "Invalid plan: " + "; ".join(problems)}
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    tasks: Dict[str, asyncio.Task] = {}
+    results: Dict[str, Dict[str, Any]] = {}
+    running = {"now": 0, "max": 0}
+    started = time.monotonic()
+
+    async def run_step(step: PlannedToolCall) -> Optional[Any]:
+        parameters = inspect.signature(tools[step.tool]).parameters
+        arguments = {}
+        for argument in step.arguments:
+            if argument.from_step:
+                output = await tasks[argument.from_step]
+                value = resolve_binding(argument, output) if output is not None else None
+                if value is None:
+                    results[step.id] = {"tool": step.tool, "skipped": f"No value for {argument.name} in the output of step {argument.from_step}"}
+                    return None
+            else:
+                value = argument.value
+            try:
+                arguments[argument.name] = _convert(value, parameters[argument.name].annotation)
+            except ValueError:
+                results[step.id] = {"tool": step.tool, "error": f"Invalid value {value!r} for {argument.name}"}
+                return None
+
+        async with semaphore:
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+            step_started = time.monotonic()
+            try:
+                output = await tools[step.tool](**arguments)
+            except Exception as e:
+                output = {"error": str(e)}
+            finally:
+                running["now"] -= 1
+        results[step.id] = {"tool": step.tool, "arguments": arguments, "seconds": round(time.monotonic() - step_started, 2), "output": output}
+        return None if isinstance(output, dict) and "error" in output else output
+
+    for step in steps:
+        tasks[step.id] = asyncio.create_task(run_step(step))
+    await asyncio.gather(*tasks.values())
+
+    wall_seconds = round(time.monotonic() - started, 2)
+    Actor.log.info(f"Executed research plan of {len(steps)} steps in {wall_seconds}s (up to {running['max']} in parallel)")
+    return {
+        "steps": {step.id: results.get(step.id, {}) for step in steps},
+        "wall_seconds": wall_seconds,
+        "max_parallel": running["max"],
+    }
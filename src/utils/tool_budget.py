@@ -0,0 +1,262 @@
+import json
+import math
+from typing import Any, Dict, Optional, Tuple
+
+from apify import Actor
+
+COST_STORE_NAME = "company-research-costs"
+COST_STATE_KEY = "COSTS"
+
+# Prefix of the scraper actors' run-time curves (see ActorProfiles) in the cost model
+ACTOR_CURVE_PREFIX = "actor:"
+
+# Size arguments the model chooses, with the range each tool accepts
+TOOL_LIMITS: Dict[str, Dict[str, Tuple[int, int]]] = {
+    "crawl_website": {"max_crawl_depth": (0, 2), "max_crawl_pages": (1, 30)},
+    "crawl_key_pages": {"max_pages": (1, 20)},
+    "search_google": {"max_results": (1, 10)},
+    "search_google_maps": {"max_reviews": (0, 50)},
+    "get_indeed_jobs": {"max_items_per_search": (1, 50)},
+    "get_trustpilot_reviews": {"max_reviews": (1, 50)},
+}
+
+# The argument that sets how many items (pages, results, reviews, listings) a call fetches
+ITEM_ARGUMENTS = {
+    "crawl_website": "max_crawl_pages",
+    "crawl_key_pages": "max_pages",
+    "search_google": "max_results",
+    "search_google_maps": "max_reviews",
+    "get_indeed_jobs": "max_items_per_search",
+    "get_trustpilot_reviews": "max_reviews",
+}
+
+# Starting cost curves (fixed seconds, seconds per item, bytes per item) until runs have been measured
+PRIOR_COSTS: Dict[str, Tuple[float, float, float]] = {
+    "crawl_website": (20.0, 3.0, 8000.0),
+    "crawl_key_pages": (15.0, 2.0, 8000.0),
+    "search_google": (8.0, 2.0, 10000.0),
+    "search_google_maps": (30.0, 0.5, 3000.0),
+    "get_linkedin_company_profile": (20.0, 0.0, 5000.0),
+    "get_indeed_jobs": (20.0, 0.5, 4000.0),
+    "get_trustpilot_reviews": (15.0, 0.3, 1000.0),
+    "get_similarweb_results": (25.0, 0.0, 20000.0),
+}
+
+# Weight of older observations in the cost curves, so they follow recent actor performance
+COST_DECAY = 0.9
+
+# Largest share of the remaining budget a single call may take
+MAX_CALL_SHARE = 0.25
+
+class BudgetExhaustedError(Exception):
+    """Raised instead of calling a tool once the run's evidence budget is used up."""
+
+    def __init__(self, spent_secs: float, spent_bytes: int):
+        super().__init__(
+            f"The evidence budget of this run is used up ({spent_secs:.0f}s of tool time, {spent_bytes / 1e6:.1f} MB of results). "
+            "Do not call more tools; write the report with the evidence gathered so far."
+        )
+
+class ToolCostCurve:
+    """Linear cost curve of one tool: seconds = fixed + per_item * requested items.
+
+    Fitted by exponentially weighted least squares over measured calls, falling back to the
+    prior until calls with different sizes have been seen.
+    """
+
+    def __init__(self, prior: Tuple[float, float, float]):
+        self.prior = prior
+        self.n = self.sx = self.sy = self.sxx = self.sxy = 0.0
+        self.bytes_per_item = prior[2]
+        # Number of measured calls, without decay
+        self.observations = 0
+
+    def observe(self, items: int, seconds: float, result_bytes: int, result_items: int) -> None:
+        self.observations += 1
+        self.n = self.n * COST_DECAY + 1
+        self.sx = self.sx * COST_DECAY + items
+        self.sy = self.sy * COST_DECAY + seconds
+        self.sxx = self.sxx * COST_DECAY + items * items
+        self.sxy = self.sxy * COST_DECAY + items * seconds
+        if result_items:
+            self.bytes_per_item = COST_DECAY * self.bytes_per_item + (1 - COST_DECAY) * result_bytes / result_items
+
+    def coefficients(self) -> Tuple[float, float]:
+        """Return the fixed seconds and seconds per item."""
+        prior_fixed, prior_per_item, _ = self.prior
+        if self.n < 1:
+            return prior_fixed, prior_per_item
+        variance = self.n * self.sxx - self.sx * self.sx
+        if self.n < 3 or variance < 1e-6:
+            # All calls had the same size: keep the prior slope and fit the intercept
+            return max(self.sy / self.n - prior_per_item * self.sx / self.n, 0.0), prior_per_item
+        per_item = max((self.n * self.sxy - self.sx * self.sy) / variance, 0.0)
+        return max((self.sy - per_item * self.sx) / self.n, 0.0), per_item
+
+    def seconds(self, items: int) -> float:
+        fixed, per_item = self.coefficients()
+        return fixed + per_item * items
+
+    def to_state(self) -> Dict[str, float]:
+        return {
+            "n": self.n, "sx": self.sx, "sy": self.sy, "sxx": self.sxx, "sxy": self.sxy,
+            "bytes_per_item": self.bytes_per_item, "observations": self.observations,
+        }
+
+    def load_state(self, state: Dict[str, float]) -> None:
+        for name in ("n", "sx", "sy", "sxx", "sxy", "bytes_per_item"):
+            setattr(self, name, float(state.get(name, getattr(self, name))))
+        self.observations = int(state.get("observations", self.observations))
+
+class ToolCostModel:
+    """Cost curves of all tools, learned from past calls and shared by every research run of the process.
+
+    The curves are persisted to a named key-value store so later runs start from measured costs.
+    The run-time curves of the scraper actors (see ActorProfiles) are kept here too, so there is
+    a single run-time model.
+    """
+
+    def __init__(self):
+        self.curves: Dict[str, ToolCostCurve] = {}
+
+    def curve(self, tool: str, prior: Optional[Tuple[float, float, float]] = None) -> ToolCostCurve:
+        if tool not in self.curves:
+            self.curves[tool] = ToolCostCurve(prior or PRIOR_COSTS.get(tool, (20.0, 0.0, 5000.0)))
+        return self.curves[tool]
+
+    def estimate(self, tool: str, arguments: Dict[str, Any]) -> Tuple[float, float]:
+        """Predict the seconds and result bytes of a call."""
+        items = int(arguments.get(ITEM_ARGUMENTS.get(tool, ""), 1) or 1)
+        curve = self.curve(tool)
+        return curve.seconds(items), curve.bytes_per_item * items
+
+    async def load(self) -> None:
+        try:
+            store = await Actor.open_key_value_store(name=COST_STORE_NAME)
+            state = await store.get_value(COST_STATE_KEY) or {}
+        except Exception as e:
+            Actor.log.warning(f"Could not load tool cost curves: {str(e)}")
+            return
+        for tool, saved in state.items():
+            self.curve(tool).load_state(saved)
+
+    async def save(self) -> None:
+        try:
+            store = await Actor.open_key_value_store(name=COST_STORE_NAME)
+            await store.set_value(COST_STATE_KEY, {tool: curve.to_state() for tool, curve in self.curves.items()})
+        except Exception as e:
+            Actor.log.warning(f"Could not save tool cost curves: {str(e)}")
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        stats = {}
+        for tool, curve in self.curves.items():
+            if tool.startswith(ACTOR_CURVE_PREFIX):
+                continue
+            fixed, per_item = curve.coefficients()
+            stats[tool] = {"fixed_secs": round(fixed, 1), "secs_per_item": round(per_item, 2), "bytes_per_item": round(curve.bytes_per_item)}
+        return stats
+
+class ToolBudget:
+    """Per-run evidence budget that keeps the size arguments of tool calls within predictable bounds.
+
+    Every size argument is clamped to the tool's limits. With a budget, calls are further sized so
+    their predicted cost fits in a share of what is left, crawl depth drops as the budget is used
+    up, and calls are refused once it is gone. Calls running in parallel reserve their predicted
+    cost until they finish, so they cannot all claim the same remainder.
+
+    Args:
+        costs: The shared cost model, updated with every measured call.
+        max_seconds: Total tool time of the run, summed over calls (0 = unlimited).
+        max_bytes: Total size of the tool results of the run (0 = unlimited).
+    """
+
+    def __init__(self, costs: Optional[ToolCostModel] = None, max_seconds: float = 0, max_bytes: int = 0):
+        self.costs = costs or ToolCostModel()
+        self.max_seconds = max_seconds
+        self.max_bytes = max_bytes
+        self.spent_seconds = 0.0
+        self.spent_bytes = 0
+        self._reserved: Dict[str, Tuple[float, float]] = {}
+        self.clamped_calls = 0
+
+    @staticmethod
+    def _key(tool: str, arguments: Dict[str, Any]) -> str:
+        return tool + json.dumps(arguments, sort_keys=True, default=str)
+
+    def remaining(self) -> float:
+        """Share of the budget that is neither spent nor reserved (1.0 without a budget)."""
+        shares = []
+        if self.max_seconds:
+            reserved = sum(s for s, _ in self._reserved.values())
+            shares.append(1 - (self.spent_seconds + reserved) / self.max_seconds)
+        if self.max_bytes:
+            reserved = sum(b for _, b in self._reserved.values())
+            shares.append(1 - (self.spent_bytes + reserved) / self.max_bytes)
+        return max(min(shares), 0.0) if shares else 1.0
+
+    def check(self) -> None:
+        """Raise BudgetExhaustedError when nothing of the budget is left."""
+        if (self.max_seconds and self.spent_seconds >= self.max_seconds) or (self.max_bytes and self.spent_bytes >= self.max_bytes):
+            raise BudgetExhaustedError(self.spent_seconds, self.spent_bytes)
+
+    def _affordable_items(self, tool: str) -> Optional[int]:
+        """The number of items whose predicted cost fits in this call's share of the remaining budget."""
+        remaining = self.remaining()
+        curve = self.costs.curve(tool)
+        fixed, per_item = curve.coefficients()
+        affordable = math.inf
+        if self.max_seconds and per_item > 0:
+            affordable = min(affordable, (remaining * self.max_seconds * MAX_CALL_SHARE - fixed) / per_item)
+        if self.max_bytes and curve.bytes_per_item > 0:
+            affordable = min(affordable, remaining * self.max_bytes * MAX_CALL_SHARE / curve.bytes_per_item)
+        return None if affordable == math.inf else max(int(affordable), 0)
+
+    def clamp(self, tool: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the arguments with their sizes clamped, and reserve the call's predicted cost.
+
+        Raises:
+            BudgetExhaustedError: If the run's budget is used up.
+        """
+        self.check()
+        clamped = dict(arguments)
+        remaining = self.remaining()
+        for name, (low, high) in TOOL_LIMITS.get(tool, {}).items():
+            if name not in clamped:
+                continue
+            if name == "max_crawl_depth":
+                high = min(high, 2 if remaining > 0.5 else 1 if remaining > 0.25 else 0)
+            elif name == ITEM_ARGUMENTS.get(tool):
+                affordable = self._affordable_items(tool)
+                if affordable is not None:
+                    high = min(high, affordable)
+            clamped[name] = min(max(int(clamped[name]), low), max(high, low))
+
+        if clamped != arguments:
+            self.clamped_calls += 1
+            Actor.log.info(f"Clamped {tool} arguments from {arguments} to {clamped} ({remaining:.0%} of the budget left)")
+        self._reserved[self._key(tool, clamped)] = self.costs.estimate(tool, clamped)
+        return clamped
+
+    def release(self, tool: str, arguments: Dict[str, Any]) -> None:
+        """Drop the reservation of a call that did not fetch anything."""
+        self._reserved.pop(self._key(tool, arguments), None)
+
+    def record(self, tool: str, arguments: Dict[str, Any], seconds: float, output: Any, observe: bool = True) -> None:
+        """Charge a finished call to the budget and, if observe is set, teach the cost model its measured cost."""
+        self.release(tool, arguments)
+        result_bytes = len(json.dumps(output, default=str).encode("utf-8")) if output else 0
+        self.spent_seconds += seconds
+        self.spent_bytes += result_bytes
+        if not observe:
+            return
+        result_items = len(output) if isinstance(output, list) else int(bool(output))
+        items = int(arguments.get(ITEM_ARGUMENTS.get(tool, ""), 1) or 1)
+        self.costs.curve(tool).observe(items, seconds, result_bytes, result_items)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "spent_seconds": round(self.spent_seconds, 1),
+            "spent_bytes": self.spent_bytes,
+            "remaining": round(self.remaining(), 2),
+            "clamped_calls": self.clamped_calls,
+        }
@@ -1,5 +1,7 @@
-from .report_validators import validate_company_report
+from .report_validators import create_report_validator, collect_report_issues, report_quality_score
 
 __all__ = [
-    'validate_company_report'
+    'create_report_validator',
+    'collect_report_issues',
+    'report_quality_score'
 ] 
\ No newline at end of file
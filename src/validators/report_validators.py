@@ -1,31 +1,12 @@
+from typing import Any, Dict, List, Optional
+from apify import Actor
 from pydantic_ai import RunContext, ModelRetry
-from ..models import ResponseModel
+from ..models import ResponseModel, ReportMetrics, RetryPolicy, analyze_report_structure
+from ..analysis import CitationIndex, FieldExtractor
 import re
 
-async def validate_company_report(ctx: RunContext, result: ResponseModel) -> ResponseModel:
-    """Advanced validation of the company report with potential model retries for improvements."""
-    if not result.report:
-        raise ModelRetry("Please generate a comprehensive business report for the company.")
-        
-    # Get the report metrics
-    metrics = result.report_metrics
-    if not metrics:
-        # If metrics are missing, manually parse the report to create metrics
-        content_length = len(result.report)
-        headings = re.findall(r'^#+\s+.+$', result.report, re.MULTILINE)
-        data_points = re.findall(r'\d+%|\$\d+|\d+ million|\d+ billion|\d+\.\d+|approx\w* \d+', result.report, re.IGNORECASE)
-        sources = re.findall(r'\[.*?\]\(.*?\)', result.report) + re.findall(r'Source:.*?[\.,]', result.report, re.IGNORECASE)
-        
-        # Create minimal metrics for validation
-        metrics = {
-            "total_length": content_length,
-            "sections_count": len(headings),
-            "data_point_count": len(data_points),
-            "sources_count": len(sources),
-            "missing_sections": [],
-            "shallow_sections": []
-        }
-        
+def collect_report_issues(report: str, metrics: Dict[str, Any]) -> List[str]:
+    """Return the critical issues of a report that should trigger a retry."""
     # Check for critical issues that require a retry
     critical_issues = []
     
@@ -50,7 +31,7 @@ async def validate_company_report(ctx: RunContext, result: ResponseModel) -> Res
     # Count how many critical sections are found
     found_sections = 0
     for section in critical_sections:
-        if re.search(section, result.report.lower()):
+        if re.search(section, report.lower()):
             found_sections += 1
     
     # Require at least 15 of the critical sections (more than 65%)
@@ -74,23 +55,129 @@ async def validate_company_report(ctx: RunContext, result: ResponseModel) -> Res
         critical_issues.append(f"The report cites only {sources_count} sources. Please include at least 15 specific sources with links to support your findings.")
         
     # 7. Check for markdown formatting variety
-    heading_levels = re.findall(r'^(#+)\s+', result.report, re.MULTILINE)
+    heading_levels = re.findall(r'^(#+)\s+', report, re.MULTILINE)
     heading_level_variety = len(set([len(h) for h in heading_levels]))
     
     if heading_level_variety < 3:
         critical_issues.append("The report lacks structural depth. Please use at least 3 different heading levels (# for main sections, ## for subsections, ### for sub-subsections).")
     
-    list_patterns = re.findall(r'^\s*[\*\-\+]\s+|^\s*\d+\.\s+', result.report, re.MULTILINE)
+    list_patterns = re.findall(r'^\s*[\*\-\+]\s+|^\s*\d+\.\s+', report, re.MULTILINE)
     if len(list_patterns) < 10:
         critical_issues.append("The report lacks lists for organized information. Please use at least 10 bulleted or numbered lists to present information clearly.")
     
-    emphasis_patterns = re.findall(r'\*\*.*?\*\*|\*.*?\*|__.*?__|_.*?_', result.report)
+    emphasis_patterns = re.findall(r'\*\*.*?\*\*|\*.*?\*|__.*?__|_.*?_', report)
     if len(emphasis_patterns) < 15:
         critical_issues.append("The report lacks emphasis formatting. Please use bold and italic formatting to highlight at least 15 key points or important information.")
     
-    # If there are critical issues, request improvements
-    if critical_issues:
+    return critical_issues
+
+# Targets the quality score is measured against, matching the thresholds of collect_report_issues
+QUALITY_TARGETS = {
+    "total_length": 15000,
+    "sections_count": 15,
+    "data_point_count": 30,
+    "sources_count": 15,
+}
+
+def report_quality_score(metrics: ReportMetrics) -> float:
+    """Score a report between 0 and 1 by how close it gets to each quality target."""
+    values = metrics.model_dump()
+    return sum(min(values[key] / target, 1.0) for key, target in QUALITY_TARGETS.items()) / len(QUALITY_TARGETS)
+
+def create_report_validator(citations: CitationIndex, evidence, policy: Optional[RetryPolicy] = None, fields: Optional[FieldExtractor] = None):
+    """Create a result validator that builds the sources section from the URLs fetched during the run.
+
+    The validator also weighs the cost of another retry: it stops asking for improvements once the
+    policy's retry or token budget is spent, or when the previous retry barely improved the report
+    or made it worse. When it stops with open issues, the best-scoring attempt is returned, not
+    necessarily the latest. Each attempt's metrics are kept on the returned function's attempts
+    attribute, and the returned attempt is marked as accepted.
+
+    Args:
+        citations: The run's citation index.
+        evidence: The run's EvidenceRecorder the citation index is filled from.
+        policy: Limits on retries and tokens, defaults to RetryPolicy().
+        fields: Optional extractor whose confident contact details and social URLs fill empty
+            fields and replace values no tool output supports.
+
+    Returns:
+        An async result validator to register with agent.result_validator.
+    """
+    policy = policy or RetryPolicy()
+    attempts: List[Dict[str, Any]] = []
+    # Highest-scoring report so far, returned if retrying stops with open issues
+    best: Dict[str, Any] = {}
+
+    async def validate_report_with_citations(ctx: RunContext, result: ResponseModel) -> ResponseModel:
+        if not result.report:
+            raise ModelRetry("Please generate a comprehensive business report for the company.")
+
+        # Replace whatever the model wrote as sources with the list of pages actually fetched
+        citations.update_from_evidence(evidence)
+        result.report = citations.apply_sources_section(result.report)
+
+        if fields is not None:
+            # Contact details and social URLs are checked locally instead of with another model turn
+            fields.update_from_evidence(evidence)
+            for change in fields.apply(result):
+                Actor.log.info(f"Set {change['field']} to {change['value']} (confidence {change['confidence']}, was {change['previous']!r})")
+
+        metrics, _ = analyze_report_structure(result.report)
+        critical_issues = collect_report_issues(result.report, metrics.model_dump())
+
+        # Links that no tool returned are likely made up
+        unfetched = citations.unfetched_links(result.report)
+        if len(unfetched) > 3:
+            critical_issues.append(f"The report links to {len(unfetched)} URLs that were not returned by any research tool (e.g. {', '.join(unfetched[:5])}). Only cite pages from the list of fetched sources below.")
+
+        usage = getattr(ctx, 'usage', None)
+        total_tokens = (usage.total_tokens or 0) if usage else 0
+        attempt = {
+            "attempt": len(attempts),
+            "score": round(report_quality_score(metrics), 4),
+            "issues": len(critical_issues),
+            "total_tokens": total_tokens,
+            **{key: getattr(metrics, key) for key in QUALITY_TARGETS},
+        }
+        attempts.append(attempt)
+
+        if len(attempts) > 1:
+            previous = attempts[-2]
+            deltas = ", ".join(f"{key} {attempt[key] - previous[key]:+d}" for key in QUALITY_TARGETS)
+            Actor.log.info(
+                f"Report retry {attempt['attempt']}: {deltas}, score {attempt['score'] - previous['score']:+.3f}, "
+                f"issues {previous['issues']} -> {attempt['issues']}, tokens {attempt['total_tokens'] - previous['total_tokens']:+d}")
+
+        previous_best = dict(best)
+        if not best or attempt["score"] > best["score"]:
+            best.update(score=attempt["score"], attempt=attempt, result=result.model_copy(deep=True))
+
+        def accept_best(reason: str) -> ResponseModel:
+            best["attempt"]["accepted"] = True
+            if best["attempt"] is not attempt:
+                Actor.log.warning(f"Keeping report attempt {best['attempt']['attempt']} (score {best['score']}) over the latest (score {attempt['score']})")
+            Actor.log.warning(f"Accepting report with {best['attempt']['issues']} open issues, {reason}")
+            return best["result"]
+
+        if not critical_issues:
+            attempt["accepted"] = True
+            return result
+
+        retries_so_far = len(attempts) - 1
+        if retries_so_far >= policy.max_retries:
+            return accept_best(f"after {retries_so_far} retries (retry limit reached)")
+        if policy.max_tokens and total_tokens >= policy.max_tokens:
+            return accept_best(f"after using {total_tokens} tokens (token limit reached)")
+        if previous_best and attempt["score"] < previous_best["score"]:
+            return accept_best("the last retry lowered the quality score")
+        if retries_so_far >= 1 and attempt["score"] - attempts[-2]["score"] < policy.min_gain:
+            return accept_best(f"the last retry improved the quality score by less than {policy.min_gain}")
+
         improvement_request = "Please improve the company report by addressing these issues:\n\n" + "\n".join([f"- {issue}" for issue in critical_issues])
+        if len(citations):
+            improvement_request += "\n\nFetched sources you can cite with inline markdown links:\n" + "\n".join(
+                [f"- [{e['title']}]({e['url']})" for e in citations.as_list(40)])
         raise ModelRetry(improvement_request)
-        
-    return result 
\ No newline at end of file
+
+    validate_report_with_citations.attempts = attempts
+    return validate_report_with_citations
@@ -0,0 +1,77 @@
+import asyncio
+
+from src.analysis.competitor_analysis import domain_of
+from src.loadtest import local_apify
+from src.loadtest.local_apify import LocalApifyClient
+from src.utils import BatchingApifyClient, batching
+
+SIMILARWEB = "tri_angle/similarweb-scraper"
+
+async def call_similarweb(client: BatchingApifyClient, website: str):
+    run = await client.actor(SIMILARWEB).call(run_input={"websites": [website]})
+    return (await client.dataset(run["defaultDatasetId"]).list_items()).items
+
+def test_similarweb_items_are_routed_by_bare_domain(monkeypatch):
+    # The real scraper reports the bare domain in url and name, whatever URL it was given
+    def similarweb_items(run_input):
+        return [{"url": domain_of(w), "name": domain_of(w), "globalRank": i} for i, w in enumerate(run_input["websites"])]
+
+    monkeypatch.setitem(local_apify.ACTOR_ITEMS, SIMILARWEB, similarweb_items)
+    apify = LocalApifyClient(latency_secs=0.01, jitter=0)
+    client = BatchingApifyClient(apify, window_secs=0.05)
+
+    async def run():
+        return await asyncio.gather(
+            call_similarweb(client, "https://www.acme.com/about"),
+            call_similarweb(client, "beta.io"),
+            call_similarweb(client, "http://gamma.org"),
+        )
+
+    acme, beta, gamma = asyncio.run(run())
+
+    assert apify.stats["calls"] == 1
+    assert client.stats["runs_saved"] == 2
+    assert [item["name"] for item in acme] == ["acme.com"]
+    assert [item["name"] for item in beta] == ["beta.io"]
+    assert [item["name"] for item in gamma] == ["gamma.org"]
+
+def test_cancelled_batch_run_cancels_waiting_callers():
+    apify = LocalApifyClient(latency_secs=5, jitter=0)
+    client = BatchingApifyClient(apify, window_secs=0.01)
+
+    async def run():
+        callers = [asyncio.create_task(call_similarweb(client, site)) for site in ("acme.com", "beta.io")]
+        await asyncio.sleep(0)
+        batch = next(iter(client._pending.values()))
+        # Let the window pass so the batch run is under way, then cancel it
+        await asyncio.sleep(0.05)
+        batch.flush_task.cancel()
+        await asyncio.wait(callers, timeout=1)
+        return callers
+
+    callers = asyncio.run(run())
+
+    assert all(caller.done() and caller.cancelled() for caller in callers)
+
+def test_unread_results_expire(monkeypatch):
+    client = BatchingApifyClient(LocalApifyClient())
+
+    monkeypatch.setattr(batching, "MAX_RESULTS", 2)
+    first = client._store_result([{"n": 1}])
+    second = client._store_result([{"n": 2}])
+    third = client._store_result([{"n": 3}])
+    assert list(client._results) == [second, third]
+
+    monkeypatch.setattr(batching, "RESULT_TTL_SECS", -1)
+    expired = client._store_result([{"n": 4}])
+    latest = client._store_result([{"n": 5}])
+    assert list(client._results) == [latest]
+
+    async def items(dataset_id: str):
+        return (await client.dataset(dataset_id).list_items()).items
+
+    # Dropped results are no longer served, a read removes the entry
+    assert asyncio.run(items(first)) == []
+    assert asyncio.run(items(expired)) == []
+    assert asyncio.run(items(latest)) == [{"n": 5}]
+    assert not client._results
@@ -0,0 +1,107 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from pydantic_ai import ModelHTTPError
+from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, UserPromptPart
+from pydantic_ai.models import ModelRequestParameters
+from pydantic_ai.providers.google_gla import GoogleGLAProvider
+
+from src.utils import CachingGeminiModel, LocalContextCache
+
+GEMINI_RESPONSE = {
+    "candidates": [{"content": {"role": "model", "parts": [{"text": "ok"}]}, "finishReason": "STOP", "index": 0}],
+    "usageMetadata": {"promptTokenCount": 10, "candidatesTokenCount": 1, "totalTokenCount": 11},
+}
+
+PARAMETERS = ModelRequestParameters(function_tools=[], allow_text_result=True, result_tools=[])
+
+def conversation(turns: int):
+    messages = []
+    for turn in range(turns):
+        messages.append(ModelRequest(parts=[UserPromptPart(content=f"question {turn} " + "context " * 200)]))
+        messages.append(ModelResponse(parts=[TextPart(content=f"answer {turn}")]))
+    messages.append(ModelRequest(parts=[UserPromptPart(content="final question")]))
+    return messages
+
+def create_model(handler, cache: LocalContextCache) -> CachingGeminiModel:
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    provider = GoogleGLAProvider(api_key="test-key", http_client=http_client)
+    return CachingGeminiModel("gemini-2.0-flash-001", provider=provider, cache=cache, min_cache_tokens=100, min_new_cache_tokens=100)
+
+def test_prefix_is_cached_and_reused():
+    bodies = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(json.loads(request.content))
+        return httpx.Response(200, json=GEMINI_RESPONSE)
+
+    cache = LocalContextCache()
+    model = create_model(handler, cache)
+    messages = conversation(2)
+    asyncio.run(model.request(messages, None, PARAMETERS))
+    asyncio.run(model.request(messages, None, PARAMETERS))
+
+    assert len(cache.entries) == 1
+    name = next(iter(cache.entries))
+    assert all(body["cached_content"] == name for body in bodies)
+    # Only the latest turn is sent next to the cache, the system prompt and tools live in it
+    assert all(len(body["contents"]) == 1 and "tools" not in body for body in bodies)
+    assert model.cache_stats["caches_created"] == 1
+    assert model.cache_stats["cached_requests"] == 2
+
+def test_expired_cache_is_replaced():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=GEMINI_RESPONSE)
+
+    cache = LocalContextCache(ttl_seconds=600)
+    model = create_model(handler, cache)
+    messages = conversation(2)
+    asyncio.run(model.request(messages, None, PARAMETERS))
+    model._caches[0]["expires_at"] = 0
+    asyncio.run(model.request(messages, None, PARAMETERS))
+
+    assert model.cache_stats["caches_created"] == 2
+    assert model._last_cache["name"] == "cachedContents/local-2"
+
+def test_rejected_cache_falls_back_to_full_prompt():
+    bodies = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        bodies.append(body)
+        if "cached_content" in body:
+            return httpx.Response(404, json={"error": {"message": "CachedContent not found"}})
+        return httpx.Response(200, json=GEMINI_RESPONSE)
+
+    model = create_model(handler, LocalContextCache())
+    messages = conversation(2)
+    response, _ = asyncio.run(model.request(messages, None, PARAMETERS))
+
+    assert response.parts[0].content == "ok"
+    assert len(bodies) == 2
+    assert "cached_content" not in bodies[1]
+    assert len(bodies[1]["contents"]) == len(bodies[0]["contents"]) + 4
+    assert model._caches == []
+    assert model._last_cache is None
+
+def test_rate_limited_cached_request_is_raised():
+    bodies = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(json.loads(request.content))
+        if len(bodies) == 1:
+            return httpx.Response(200, json=GEMINI_RESPONSE)
+        return httpx.Response(429, json={"error": {"message": "Resource has been exhausted"}})
+
+    model = create_model(handler, LocalContextCache())
+    messages = conversation(2)
+    asyncio.run(model.request(messages, None, PARAMETERS))
+
+    with pytest.raises(ModelHTTPError) as error:
+        asyncio.run(model.request(messages, None, PARAMETERS))
+    assert error.value.status_code == 429
+    # The full prompt is not resent and the cache is kept
+    assert len(bodies) == 2
+    assert len(model._caches) == 1